@@ -1,9 +1,9 @@
 import os
 import sys
 import time
-import re
 import html
 import json
+from concurrent.futures import ThreadPoolExecutor
 from typing import Optional, Dict, Any, Tuple
 from urllib.parse import urlparse
 from google.genai import types
@@ -32,6 +32,7 @@ from agents_lib import (
     clean_url_text,
     is_youtube_url,
     extract_html_title,
+    html_to_text,
     url_seems_relevant_to_topic,
     is_soft_404,
     validate_url,
@@ -46,6 +47,7 @@ from agents_lib import (
     # Post generator
     generate_x_post,
     generate_linkedin_post,
+    generate_x_and_linkedin_posts,
     # Search
     search_trending_topics,
     select_single_topic,
@@ -73,8 +75,6 @@ from agents_lib import (
     generate_image_for_post_builder,
     generate_video_for_post,
     generate_media_for_post_builder,
-    ORCHESTRATOR_SYSTEM_PROMPT,
-    ORCHESTRATOR_TOOLS,
 )
 
 # Alias private function names for backward compatibility within this file
@@ -85,6 +85,9 @@ _url_seems_relevant_to_topic = url_seems_relevant_to_topic
 
 # search, content_generator functions are now imported from agents_lib
 
+# Wall-clock budget for one scheduled cycle; retries stop backing off once it's spent
+AGENT_CYCLE_BUDGET = 20 * 60  # seconds
+
 
 def run_agent_cycle(user_id: int):
     """
@@ -102,6 +105,7 @@ def run_agent_cycle(user_id: int):
     include links that actually work. If a selected URL fails validation, we try
     selecting a different topic up to 3 times.
     """
+    deadline = time.monotonic() + AGENT_CYCLE_BUDGET
     try:
         logger.info("=" * 60)
         logger.info(f"Starting PLATFORM-SPECIFIC agent cycle for user {user_id} at {time.strftime('%Y-%m-%d %H:%M:%S')}")
@@ -132,7 +136,7 @@ def run_agent_cycle(user_id: int):
         # Step 1: Search for trending topics (shared between platforms)
         # Returns raw search results - URL validation happens in topic selection
         logger.info("[1/8] Searching for trending topics...")
-        search_context, source_urls, _ = search_trending_topics(user_prompt, refined_persona, recent_topics, validate_urls=False)
+        search_context, source_urls, _ = search_trending_topics(user_prompt, refined_persona, recent_topics, validate_urls=False, deadline=deadline)
         if search_context:
             logger.info(f"Found context: {search_context[:200]}...")
         else:
@@ -156,22 +160,17 @@ def run_agent_cycle(user_id: int):
             logger.warning("⚠️ No valid URL found - post will not include a link")
 
         # Extract topics ONCE from the focused context (used for both platforms)
-        # This is more accurate than extracting from posts, and avoids duplicate LLM calls
-        topics = extract_topics_from_post(focused_context, user_prompt)
-        logger.info(f"Extracted topics for history: {topics}")
+        # This is more accurate than extracting from posts, and avoids duplicate LLM calls.
+        # It only depends on focused_context, so it runs in the background while the
+        # platform posts and media are generated.
+        background_pool = ThreadPoolExecutor(max_workers=3)
+        topics_future = background_pool.submit(extract_topics_from_post, focused_context, user_prompt)
 
         # Enhance focused context with HTML content if available (from validated URL)
         enhanced_context = focused_context
         if html_content:
             # Extract useful text from HTML (limit to avoid token overload)
-            # Strip HTML tags for a cleaner context
-            # Remove script and style elements
-            clean_html = re.sub(r'<script[^>]*>.*?</script>', '', html_content, flags=re.DOTALL | re.IGNORECASE)
-            clean_html = re.sub(r'<style[^>]*>.*?</style>', '', clean_html, flags=re.DOTALL | re.IGNORECASE)
-            # Remove HTML tags
-            text_content = re.sub(r'<[^>]+>', ' ', clean_html)
-            # Clean up whitespace
-            text_content = re.sub(r'\s+', ' ', text_content).strip()
+            text_content = html_to_text(html_content)
             # Limit to first 2000 chars of meaningful content
             if len(text_content) > 2000:
                 text_content = text_content[:2000] + "..."
@@ -190,28 +189,50 @@ def run_agent_cycle(user_id: int):
         # Step 3: Generate platform-specific posts
         x_post = None
         linkedin_post = None
+        x_future = None
+        linkedin_future = None
+
+        # Both platforms connected: one structured call writes both posts (one thinking pass
+        # instead of two). Falls back to the per-platform generators below if it fails.
+        if twitter_tokens and linkedin_tokens:
+            try:
+                logger.info("[3/6] Generating X and LinkedIn posts in one call...")
+                x_post, linkedin_post = generate_x_and_linkedin_posts(enhanced_context, refined_persona, user_prompt, source_url, recent_topics, max_retries=1, deadline=deadline)
+                logger.info(f"X post: {x_post}")
+                logger.info(f"LinkedIn post: {linkedin_post[:150]}...")
+            except Exception as e:
+                logger.warning(f"Combined post generation failed, generating per platform: {e}")
+
+        # The per-platform generators are independent LLM calls, so they run concurrently.
+        if twitter_tokens and not x_post:
+            logger.info("[3/6] Generating X-specific post...")
+            x_future = background_pool.submit(generate_x_post, enhanced_context, refined_persona, user_prompt, source_url, recent_topics, deadline=deadline)
+        elif not twitter_tokens:
+            logger.info("[3/6] Skipping X post generation (not connected)")
 
-        if twitter_tokens:
+        if linkedin_tokens and not linkedin_post:
+            logger.info("[4/6] Generating LinkedIn-specific post...")
+            linkedin_future = background_pool.submit(generate_linkedin_post, enhanced_context, refined_persona, user_prompt, source_url, recent_topics, deadline=deadline)
+        elif not linkedin_tokens:
+            logger.info("[4/6] Skipping LinkedIn post generation (not connected)")
+
+        background_pool.shutdown(wait=False)
+
+        if x_future:
             try:
-                logger.info("[3/6] Generating X-specific post...")
-                x_post, x_url = generate_x_post(enhanced_context, refined_persona, user_prompt, source_url, recent_topics)
+                x_post, x_url = x_future.result()
                 logger.info(f"X post: {x_post}")
             except Exception as e:
                 logger.error(f"Failed to generate X post: {e}")
                 logger.info("Skipping X for this cycle")
-        else:
-            logger.info("[3/6] Skipping X post generation (not connected)")
 
-        if linkedin_tokens:
+        if linkedin_future:
             try:
-                logger.info("[4/6] Generating LinkedIn-specific post...")
-                linkedin_post = generate_linkedin_post(enhanced_context, refined_persona, user_prompt, source_url, recent_topics)
+                linkedin_post = linkedin_future.result()
                 logger.info(f"LinkedIn post: {linkedin_post[:150]}...")
             except Exception as e:
                 logger.error(f"Failed to generate LinkedIn post: {e}")
                 logger.info("Skipping LinkedIn for this cycle")
-        else:
-            logger.info("[4/6] Skipping LinkedIn post generation (not connected)")
 
         # Step 4: Generate ONE shared media (image or video, used for both platforms)
         shared_media = None
@@ -242,6 +263,9 @@ def run_agent_cycle(user_id: int):
         # Alias for backward compatibility with posting functions
         shared_image = shared_media
 
+        topics = topics_future.result()
+        logger.info(f"Extracted topics for history: {topics}")
+
         # Step 5: Post to platforms (using shared topics extracted earlier)
         if twitter_tokens and x_post and shared_image:
             try:
@@ -252,7 +276,7 @@ def run_agent_cycle(user_id: int):
                     x_post = None  # Clear so we don't save it
                 else:
                     logger.info("[6/6] Posting to X...")
-                    twitter_success = post_to_twitter(user_id, x_post, shared_image)
+                    twitter_success = post_to_twitter(user_id, x_post, shared_image, tokens=twitter_tokens)
                     if twitter_success:
                         posted_platforms.append("twitter")
                         save_post_history(user_id, x_post, topics, ["twitter"])
@@ -268,7 +292,7 @@ def run_agent_cycle(user_id: int):
                     linkedin_post = None  # Clear so we don't save it
                 else:
                     logger.info("[6/6] Posting to LinkedIn...")
-                    linkedin_success = post_to_linkedin(user_id, linkedin_post, shared_image)
+                    linkedin_success = post_to_linkedin(user_id, linkedin_post, shared_image, tokens=linkedin_tokens)
                     if linkedin_success:
                         posted_platforms.append("linkedin")
                         save_post_history(user_id, linkedin_post, topics, ["linkedin"])
@@ -290,5 +314,4 @@ def run_agent_cycle(user_id: int):
 
 # generate_from_url, generate_from_url_stream, post_url_content are now imported from agents_lib.url_content
 # chat_post_builder_stream, parse_generated_posts, generate_image_for_post_builder,
-# generate_video_for_post, generate_media_for_post_builder, ORCHESTRATOR_SYSTEM_PROMPT,
-# ORCHESTRATOR_TOOLS are now imported from agents_lib.chat_stream
+# generate_video_for_post, generate_media_for_post_builder are now imported from agents_lib.chat_stream
@@ -5,14 +5,16 @@ This module provides agent functionality for post generation.
 The main implementation is still in agents.py at the backend root.
 These sub-modules provide shared utilities and configuration.
 """
-from .config import client, LLM_MODEL, LLM_FALLBACK, IMAGE_MODEL, QUIC_ERROR_PATTERNS, TOPIC_STOPWORDS
-from .utils import is_network_error, emit_agent_event, strip_markdown_formatting, sanitize_for_linkedin
+from .config import client, LLM_MODEL, LLM_FALLBACK, LLM_MODEL_FAST, IMAGE_MODEL, QUIC_ERROR_PATTERNS, TOPIC_STOPWORDS
+from .utils import is_network_error, emit_agent_event, strip_markdown_formatting, sanitize_for_linkedin, parse_json_response, RetryDeadlineExceeded
 from .exceptions import AgentError, SearchError, NetworkError, URLValidationError, GenerationError
 from .url_utils import (
     resolve_redirect_url,
     clean_url_text,
     is_youtube_url,
     extract_html_title,
+    extract_title_and_text,
+    html_to_text,
     url_seems_relevant_to_topic,
     is_soft_404,
     validate_url,
@@ -20,6 +22,7 @@ from .url_utils import (
 )
 from .intent_parser import (
     agent_intent_parser,
+    agent_intent_router,
     INTENT_GENERATE_POSTS,
     INTENT_BRAINSTORM,
     INTENT_GENERATE_CAMPAIGN,
@@ -42,10 +45,13 @@ from .persona import (
 from .social_media import (
     post_to_twitter,
     post_to_linkedin,
+    get_linkedin_author_urn,
 )
 from .post_generator import (
     generate_x_post,
     generate_linkedin_post,
+    generate_x_and_linkedin_posts,
+    generate_linkedin_post_stream,
 )
 from .search import (
     search_trending_topics,
@@ -53,6 +59,7 @@ from .search import (
 )
 from .content_generator import (
     generate_post_draft,
+    generate_post_draft_stream,
     critique_and_refine_post,
     validate_content_matches_vision,
     extract_topics_from_post,
@@ -74,12 +81,11 @@ from .url_content import (
 )
 from .chat_stream import (
     chat_post_builder_stream,
+    chat_post_builder_stream_batch,
     parse_generated_posts,
     generate_image_for_post_builder,
     generate_video_for_post,
     generate_media_for_post_builder,
-    ORCHESTRATOR_SYSTEM_PROMPT,
-    ORCHESTRATOR_TOOLS,
 )
 from .video_posting import (
     upload_video_to_twitter,
@@ -94,6 +100,7 @@ __all__ = [
     'client',
     'LLM_MODEL',
     'LLM_FALLBACK',
+    'LLM_MODEL_FAST',
     'IMAGE_MODEL',
     'QUIC_ERROR_PATTERNS',
     'TOPIC_STOPWORDS',
@@ -102,11 +109,15 @@ __all__ = [
     'emit_agent_event',
     'strip_markdown_formatting',
     'sanitize_for_linkedin',
+    'parse_json_response',
+    'RetryDeadlineExceeded',
     # URL Utils
     'resolve_redirect_url',
     'clean_url_text',
     'is_youtube_url',
     'extract_html_title',
+    'extract_title_and_text',
+    'html_to_text',
     'url_seems_relevant_to_topic',
     'is_soft_404',
     'validate_url',
@@ -119,6 +130,7 @@ __all__ = [
     'GenerationError',
     # Intent Parser
     'agent_intent_parser',
+    'agent_intent_router',
     'INTENT_GENERATE_POSTS',
     'INTENT_BRAINSTORM',
     'INTENT_GENERATE_CAMPAIGN',
@@ -139,14 +151,18 @@ __all__ = [
     # Social Media
     'post_to_twitter',
     'post_to_linkedin',
+    'get_linkedin_author_urn',
     # Post Generator
     'generate_x_post',
     'generate_linkedin_post',
+    'generate_x_and_linkedin_posts',
+    'generate_linkedin_post_stream',
     # Search
     'search_trending_topics',
     'select_single_topic',
     # Content Generator
     'generate_post_draft',
+    'generate_post_draft_stream',
     'critique_and_refine_post',
     'validate_content_matches_vision',
     'extract_topics_from_post',
@@ -165,12 +181,11 @@ __all__ = [
     'post_url_content',
     # Chat Stream
     'chat_post_builder_stream',
+    'chat_post_builder_stream_batch',
     'parse_generated_posts',
     'generate_image_for_post_builder',
     'generate_video_for_post',
     'generate_media_for_post_builder',
-    'ORCHESTRATOR_SYSTEM_PROMPT',
-    'ORCHESTRATOR_TOOLS',
     # Video Posting
     'upload_video_to_twitter',
     'upload_video_to_linkedin',
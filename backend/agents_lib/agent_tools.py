@@ -30,7 +30,7 @@ def agent_search(query: str, persona_context: str = None) -> dict:
         if urls:
             try:
                 focused_context, selected_url, _ = select_single_topic(
-                    search_context, urls, query
+                    search_context, urls, query, html_content=html_content
                 )
             except Exception as e:
                 logger.warning(f"select_single_topic failed: {e}")
@@ -80,10 +80,7 @@ Call generate_posts() with the posts you create."""
         response = client.models.generate_content(
             model=LLM_MODEL,
             contents=POST_GEN_PROMPT,
-            config=types.GenerateContentConfig(
-                temperature=0.9,
-                tools=[POST_BUILDER_FUNCTION_TOOL]
-            )
+            config=_POST_GENERATOR_CONFIG
         )
 
         # Extract function call result
@@ -125,10 +122,7 @@ Format as a bulleted list that's easy to read."""
         response = client.models.generate_content(
             model=LLM_MODEL,
             contents=BRAINSTORM_PROMPT,
-            config=types.GenerateContentConfig(
-                tools=[types.Tool(google_search=types.GoogleSearch())],
-                temperature=0.7
-            )
+            config=_BRAINSTORM_CONFIG
         )
 
         return {
@@ -321,3 +315,15 @@ POST_BUILDER_FUNCTION_TOOL = types.Tool(
         )
     ]
 )
+
+# Request configs are invariant, so build (and validate) them once at import
+# instead of re-constructing the tool schemas on every call.
+_POST_GENERATOR_CONFIG = types.GenerateContentConfig(
+    temperature=0.9,
+    tools=[POST_BUILDER_FUNCTION_TOOL]
+)
+
+_BRAINSTORM_CONFIG = types.GenerateContentConfig(
+    tools=[types.Tool(google_search=types.GoogleSearch())],
+    temperature=0.7
+)
@@ -4,16 +4,15 @@ import json
 import base64
 import threading
 import time
-from typing import Optional
-
-from google.genai import types
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from typing import Callable, Optional
 
 from .config import client, LLM_MODEL
 from .utils import is_network_error, emit_agent_event, strip_markdown_formatting, sanitize_for_linkedin
-from .intent_parser import agent_intent_parser
+from .intent_parser import agent_intent_router
 from .agent_tools import agent_search, agent_post_generator, agent_brainstorm, agent_generate_campaign_prompt
 from .content_generator import generate_image
-from database import get_campaign
+from database import get_campaign_cached
 from logger_config import agent_logger as logger
 
 
@@ -26,6 +25,9 @@ class _KeepaliveTask:
         for keepalive in task.run():
             yield keepalive
         result = task.result
+
+    Call start() early to kick the work off while the caller is still
+    yielding other events; run() then only waits for it to finish.
     """
     def __init__(self, func, step_name: str, keepalive_interval: int = 15):
         self.func = func
@@ -33,9 +35,12 @@ class _KeepaliveTask:
         self.keepalive_interval = keepalive_interval
         self.result = None
         self._error = None
+        self._done = threading.Event()
+        self._thread = None
 
-    def run(self):
-        done = threading.Event()
+    def start(self):
+        if self._thread is not None:
+            return self
 
         def worker():
             try:
@@ -43,13 +48,17 @@ class _KeepaliveTask:
             except Exception as e:
                 self._error = e
             finally:
-                done.set()
+                self._done.set()
+
+        self._thread = threading.Thread(target=worker)
+        self._thread.start()
+        return self
 
-        thread = threading.Thread(target=worker)
-        thread.start()
+    def run(self):
+        self.start()
 
         keepalive_count = 0
-        while not done.wait(timeout=self.keepalive_interval):
+        while not self._done.wait(timeout=self.keepalive_interval):
             keepalive_count += 1
             yield emit_agent_event("keepalive", step=self.step_name,
                                   message=f"{self.step_name}... ({keepalive_count * self.keepalive_interval}s)")
@@ -60,112 +69,14 @@ class _KeepaliveTask:
 
 # ===== POST BUILDER MULTI-AGENT SYSTEM =====
 
-# Orchestrator system prompt - decides which agents to call
-ORCHESTRATOR_SYSTEM_PROMPT = """You are a conversation orchestrator for a social media post builder.
-
-Your job is to analyze the user's message and call the appropriate agents in the right order.
-
-AVAILABLE AGENTS (call as tools):
-1. call_intent_parser - ALWAYS call this first to understand the user's request
-2. call_search_agent - Search for content about a topic (use OPTIMIZED query from intent parser)
-3. call_post_generator - Generate X and LinkedIn posts using persona + content
-4. call_brainstorm_agent - Explore topic ideas without generating posts
-5. respond_to_user - Send a direct response (for greetings, clarifications)
-
-WORKFLOW FOR POST GENERATION:
-When user says something like "mario and luigi explain kubernetes":
-1. Call call_intent_parser with the message
-   - This extracts: persona="Mario and Luigi", topic="kubernetes", search_query="kubernetes best practices 2024"
-2. Call call_search_agent with the OPTIMIZED search_query (NOT the raw message!)
-3. Call call_post_generator with persona, topic, content, and visual_style
-
-CRITICAL RULES:
-- ALWAYS call call_intent_parser FIRST to understand the request
-- When searching, use the search_query from intent parser, NOT the raw user message
-- "mario and luigi explain observability" should search for "observability" not "mario luigi observability"
-- The persona is HOW to present content, the topic is WHAT to search for
-- If intent is "greeting", just call respond_to_user
-- If intent is "brainstorm", call brainstorm_agent instead of search+generate
-
-EXAMPLES:
-- "mario and luigi explain kubernetes" → intent_parser → search("kubernetes best practices") → post_generator(persona="Mario/Luigi")
-- "what's trending in AI?" → intent_parser → brainstorm_agent("AI trends")
-- "hello" → intent_parser → respond_to_user("Hello! I can help...")
-"""
-
-# Orchestrator tools - the agents it can call
-ORCHESTRATOR_TOOLS = types.Tool(
-    function_declarations=[
-        types.FunctionDeclaration(
-            name="call_intent_parser",
-            description="ALWAYS call this FIRST. Analyzes user message to extract intent, persona, topic, and optimized search query.",
-            parameters=types.Schema(
-                type="OBJECT",
-                properties={
-                    "message": types.Schema(type="STRING", description="The user's message to analyze")
-                },
-                required=["message"]
-            )
-        ),
-        types.FunctionDeclaration(
-            name="call_search_agent",
-            description="Search for content using an OPTIMIZED query (from intent parser). Do NOT pass the raw user message.",
-            parameters=types.Schema(
-                type="OBJECT",
-                properties={
-                    "query": types.Schema(type="STRING", description="Optimized search query from intent parser (e.g., 'kubernetes best practices 2024')"),
-                    "persona_context": types.Schema(type="STRING", description="Brief persona description for context")
-                },
-                required=["query"]
-            )
-        ),
-        types.FunctionDeclaration(
-            name="call_post_generator",
-            description="Generate social media posts using persona + searched content",
-            parameters=types.Schema(
-                type="OBJECT",
-                properties={
-                    "persona": types.Schema(type="STRING", description="Creative persona/voice (e.g., 'Mario and Luigi characters')"),
-                    "topic": types.Schema(type="STRING", description="The topic being discussed"),
-                    "content": types.Schema(type="STRING", description="Real content from search to use in posts"),
-                    "visual_style": types.Schema(type="STRING", description="How to visualize the persona for images"),
-                    "source_url": types.Schema(type="STRING", description="Source URL for attribution")
-                },
-                required=["persona", "topic", "content", "visual_style"]
-            )
-        ),
-        types.FunctionDeclaration(
-            name="call_brainstorm_agent",
-            description="Explore and suggest topic ideas without generating posts",
-            parameters=types.Schema(
-                type="OBJECT",
-                properties={
-                    "topic_area": types.Schema(type="STRING", description="Area to brainstorm about")
-                },
-                required=["topic_area"]
-            )
-        ),
-        types.FunctionDeclaration(
-            name="respond_to_user",
-            description="Send a direct response to user (for greetings, clarifications, errors)",
-            parameters=types.Schema(
-                type="OBJECT",
-                properties={
-                    "message": types.Schema(type="STRING", description="Message to send to user")
-                },
-                required=["message"]
-            )
-        )
-    ]
-)
-
 
 def chat_post_builder_stream(message: str, history: list[dict], user_id: int = None):
     """
     Stream a chat response using the multi-agent orchestrator pattern.
 
     Flow:
-    1. Intent Parser - understand persona, topic, intent
+    1. Intent Router - understand persona, topic, intent (and draft a direct
+       reply for greetings/clarifications) in a single LLM call
     2. Route based on intent:
        - greeting → respond directly
        - brainstorm → brainstorm agent
@@ -184,7 +95,7 @@ def chat_post_builder_stream(message: str, history: list[dict], user_id: int = N
         yield emit_agent_event("thinking", message="Analyzing your request...", step="intent_parsing")
 
         intent_task = _KeepaliveTask(
-            lambda: agent_intent_parser(message, history),
+            lambda: agent_intent_router(message, history),
             "Parsing intent"
         )
         for keepalive in intent_task.run():
@@ -208,11 +119,20 @@ def chat_post_builder_stream(message: str, history: list[dict], user_id: int = N
         })
 
         # STEP 2: Route based on intent
+        # Greetings/clarifications come back with the reply already drafted
+        direct_response = intent_data.get("response")
+
         if intent == "greeting":
+            if direct_response:
+                yield emit_agent_event("text", content=direct_response)
+                return
             yield emit_agent_event("text", content="Hello! I'm your Post Builder assistant. Tell me what you'd like to post about and I'll help create engaging content.\n\nFor example, try:\n- 'mario and luigi explain observability'\n- 'create a post about kubernetes best practices'\n- 'what's trending in AI?'")
             return
 
         if intent == "clarify":
+            if direct_response:
+                yield emit_agent_event("text", content=direct_response)
+                return
             yield emit_agent_event("text", content="I'd love to help! Could you tell me more about what you'd like to post about?\n\nYou can specify:\n- A topic (e.g., 'kubernetes', 'observability', 'AI')\n- A creative persona (e.g., 'mario and luigi explain...')\n- Or ask 'what's trending in [topic]?' to brainstorm ideas")
             return
 
@@ -239,27 +159,38 @@ def chat_post_builder_stream(message: str, history: list[dict], user_id: int = N
             context_topic = topic
             context_visual_style = visual_style
 
-            # Look through history to find the most relevant persona/topic
+            # Look through history (newest first) to find the most relevant persona/topic.
+            # An explicit "Persona:" line from a previous response beats keyword matches.
             if history:
+                found = {"persona": False, "topic": False, "ctx_persona": False}
+                keyword_persona = None
                 for msg in reversed(history):
-                    content = msg.get("content", "").lower()
+                    raw_content = msg.get("content") or ""
+                    if not raw_content:
+                        continue
+                    content = raw_content.lower()
                     # Look for messages that had actual content generation
-                    if "mario" in content or "luigi" in content:
-                        context_persona = "Mario and Luigi video game characters"
-                    if "observability" in content:
+                    if not found["persona"] and ("mario" in content or "luigi" in content):
+                        keyword_persona = "Mario and Luigi video game characters"
+                        found["persona"] = True
+                    if not found["topic"] and "observability" in content:
                         context_topic = "observability"
+                        found["topic"] = True
                     # More sophisticated extraction from history
-                    if msg.get("role") == "assistant" and "Persona:" in msg.get("content", ""):
+                    if not found["ctx_persona"] and msg.get("role") == "assistant" and "Persona:" in raw_content:
                         # Try to parse persona from previous responses
-                        lines = msg.get("content", "").split("\n")
-                        for line in lines:
+                        for line in raw_content.split("\n"):
                             if "Persona:" in line:
-                                parts = line.split("Persona:")
-                                if len(parts) > 1:
-                                    persona_part = parts[1].split("|")[0].strip()
-                                    if persona_part and persona_part != "professional thought leader":
-                                        context_persona = persona_part
-                                        break
+                                persona_part = line.split("Persona:")[1].split("|")[0].strip()
+                                if persona_part and persona_part != "professional thought leader":
+                                    context_persona = persona_part
+                                    found["ctx_persona"] = True
+                                    break
+                    if all(found.values()):
+                        break
+
+                if keyword_persona and not found["ctx_persona"]:
+                    context_persona = keyword_persona
 
             campaign_task = _KeepaliveTask(
                 lambda: agent_generate_campaign_prompt(
@@ -297,34 +228,17 @@ def chat_post_builder_stream(message: str, history: list[dict], user_id: int = N
         for keepalive in search_task.run():
             yield keepalive
         search_result = search_task.result
+        search_content = search_result.get("content") or ""
+        selected_url = search_result.get("selected_url")
 
-        if search_result.get("success") and search_result.get("content"):
-            selected_url = search_result.get("selected_url")
-            urls = search_result.get("urls", [])
-            yield emit_agent_event("search_results",
-                success=True,
-                selected_url=selected_url,
-                urls=urls[:3],  # Limit for display
-                content_preview=search_result.get("content", "")[:200]
-            )
-        else:
-            # Provide specific feedback for different error types
-            error_type = search_result.get("error_type", "unknown")
-            yield emit_agent_event("search_results",
-                success=False,
-                error_type=error_type,
-                message="Network issue during search" if error_type == "network" else "Search had issues"
-            )
-
-        # STEP 4: Generate posts using persona + searched content
-        yield emit_agent_event("generating", message=f"Generating posts as {persona}...", step="post_generation")
-
-        # Get campaign persona for additional context
+        # Resolve the visual style and kick off post generation BEFORE emitting the
+        # search/generating events, so the LLM request is already in flight while
+        # those events are flushed to the client.
         campaign_visual_style = None
         if user_id:
-            campaign_data = get_campaign(user_id)
-            if campaign_data and campaign_data.get("visual_style"):
-                campaign_visual_style = campaign_data.get("visual_style")
+            campaign_data = get_campaign_cached(user_id)
+            if campaign_data:
+                campaign_visual_style = campaign_data.get("visual_style") or None
 
         # Use visual_style from intent parser, or fallback to campaign style
         final_visual_style = visual_style
@@ -335,12 +249,34 @@ def chat_post_builder_stream(message: str, history: list[dict], user_id: int = N
             lambda: agent_post_generator(
                 persona=persona,
                 topic=topic,
-                content=search_result.get("content", f"Topic: {topic}"),
+                content=search_content or f"Topic: {topic}",
                 visual_style=final_visual_style,
-                source_url=search_result.get("selected_url")
+                source_url=selected_url
             ),
             "Generating posts"
-        )
+        ).start()
+
+        if search_result.get("success") and search_content:
+            display_urls = (search_result.get("urls") or [])[:3]  # Limit for display
+            content_preview = search_content[:200]
+            yield emit_agent_event("search_results",
+                success=True,
+                selected_url=selected_url,
+                urls=display_urls,
+                content_preview=content_preview
+            )
+        else:
+            # Provide specific feedback for different error types
+            error_type = search_result.get("error_type", "unknown")
+            yield emit_agent_event("search_results",
+                success=False,
+                error_type=error_type,
+                message="Network issue during search" if error_type == "network" else "Search had issues"
+            )
+
+        # STEP 4: Generate posts using persona + searched content (already running)
+        yield emit_agent_event("generating", message=f"Generating posts as {persona}...", step="post_generation")
+
         for keepalive in post_task.run():
             yield keepalive
         post_result = post_task.result
@@ -356,12 +292,14 @@ def chat_post_builder_stream(message: str, history: list[dict], user_id: int = N
                 "persona": post_result.get("persona", persona),
                 "visual_style": post_result.get("visual_style", final_visual_style)
             }
+            # Keep stdlib json here: its ASCII escaping is what lets the frontend's
+            # atob() + JSON.parse round-trip emoji and other non-ASCII post text.
             encoded = base64.b64encode(json.dumps(tool_result).encode()).decode()
             yield f"__TOOL_CALL_B64__{encoded}__END_TOOL_CALL__"
             yield emit_agent_event("complete",
                 success=True,
                 message=f"Posts generated in the {persona} style!",
-                source_url=search_result.get("selected_url")
+                source_url=selected_url
             )
         else:
             error_msg = post_result.get('error', 'Unknown error')
@@ -383,6 +321,70 @@ def chat_post_builder_stream(message: str, history: list[dict], user_id: int = N
         )
 
 
+def chat_post_builder_stream_batch(
+    messages: list[str],
+    histories: list[list[dict]] = None,
+    user_ids: list[int] = None,
+    max_concurrency: int = 8,
+    on_progress: Callable[[int, int], None] = None
+) -> list[list[str]]:
+    """
+    Run chat_post_builder_stream for many messages concurrently.
+
+    Intended for bulk/evaluation paths (dataset testing, campaign bulk
+    generation) where callers would otherwise loop over messages serially.
+    At most max_concurrency orchestrator runs are in flight at once.
+
+    Args:
+        messages: User messages to process
+        histories: Optional per-message histories (defaults to empty)
+        user_ids: Optional per-message user IDs (defaults to None)
+        max_concurrency: Maximum number of concurrent orchestrator runs
+        on_progress: Optional callback called as on_progress(completed, total)
+
+    Returns:
+        List of event lists, in the same order as messages. A run that raises keeps the
+        events it produced, followed by an "error" event; the other runs are unaffected.
+    """
+    total = len(messages)
+    histories = histories if histories is not None else [[] for _ in messages]
+    user_ids = user_ids if user_ids is not None else [None] * total
+    if len(histories) != total or len(user_ids) != total:
+        raise ValueError("messages, histories and user_ids must have the same length")
+
+    results: list[list[str]] = [[] for _ in messages]
+    if not total:
+        return results
+
+    def run_one(index: int) -> list[str]:
+        # One failing run must not discard the others, so its error becomes its last event
+        events = []
+        try:
+            for event in chat_post_builder_stream(messages[index], histories[index], user_ids[index]):
+                events.append(event)
+        except Exception as e:
+            logger.error(f"Batch run {index} failed: {e}", exc_info=True)
+            error_type = "network" if is_network_error(e) else "general"
+            events.append(emit_agent_event("error",
+                message=f"Sorry, I encountered an error: {str(e)}",
+                error=str(e),
+                error_type=error_type,
+                retryable=error_type == "network"
+            ))
+        return events
+
+    completed = 0
+    with ThreadPoolExecutor(max_workers=max(1, min(max_concurrency, total))) as executor:
+        futures = {executor.submit(run_one, i): i for i in range(total)}
+        for future in as_completed(futures):
+            results[futures[future]] = future.result()
+            completed += 1
+            if on_progress:
+                on_progress(completed, total)
+
+    return results
+
+
 def parse_generated_posts(response_text: str) -> dict:
     """
     Parse the LLM response to extract generated posts.
@@ -423,12 +425,14 @@ def generate_image_for_post_builder(post_text: str, visual_style: str = None, us
         user_prompt = post_text
 
         if not style and user_id:
-            campaign = get_campaign(user_id)
+            campaign = get_campaign_cached(user_id)
             if campaign:
-                if campaign.get("visual_style"):
-                    style = campaign["visual_style"]
-                if campaign.get("user_prompt"):
-                    user_prompt = campaign["user_prompt"]
+                campaign_style = campaign.get("visual_style")
+                campaign_prompt = campaign.get("user_prompt")
+                if campaign_style:
+                    style = campaign_style
+                if campaign_prompt:
+                    user_prompt = campaign_prompt
 
         if not style:
             style = "Modern, clean, professional social media graphic"
@@ -1,16 +1,29 @@
 """Configuration for agent models and constants."""
 import os
+import httpx
 from google import genai
+from google.genai import types
 from dotenv import load_dotenv
 
 load_dotenv()
 
 # Initialize Google GenAI client
-client = genai.Client(api_key=os.getenv("GEMINI_API_KEY"))
+# One long-lived HTTP/2 pool shared by every thread, so concurrent generation calls
+# multiplex over kept-alive connections instead of paying a TLS handshake each.
+client = genai.Client(
+    api_key=os.getenv("GEMINI_API_KEY"),
+    http_options=types.HttpOptions(
+        client_args={
+            "http2": True,
+            "limits": httpx.Limits(max_connections=100, max_keepalive_connections=50, keepalive_expiry=60),
+        }
+    )
+)
 
 # Model configurations
 LLM_MODEL = "gemini-3.1-pro-preview"  # Primary model
 LLM_FALLBACK = "gemini-2.5-pro"  # Fallback model
+LLM_MODEL_FAST = "gemini-2.5-flash-lite"  # Structured classification/extraction
 IMAGE_MODEL = "gemini-3.1-flash-image-preview"  # Nano Banana 2
 
 # QUIC/HTTP3 error patterns for graceful handling
@@ -26,8 +39,8 @@ QUIC_ERROR_PATTERNS = [
 ]
 
 # Topic stopwords for relevance checking
-TOPIC_STOPWORDS = {
+TOPIC_STOPWORDS = frozenset({
     "a", "an", "and", "are", "as", "at", "be", "by", "for", "from",
     "how", "in", "into", "is", "it", "its", "of", "on", "or", "our",
     "that", "the", "this", "to", "via", "we", "with",
-}
+})
@@ -7,11 +7,18 @@ is published, it is checked against that list.
 No company names are hardcoded — the list lives in the database.
 """
 import re
+from functools import lru_cache
 from typing import List, Tuple
 
 from logger_config import agent_logger as logger
 
 
+@lru_cache(maxsize=512)
+def _company_pattern(company: str) -> "re.Pattern[str]":
+    """Compiled case-insensitive word-boundary pattern for one company name."""
+    return re.compile(r"\b" + re.escape(company) + r"\b", re.IGNORECASE)
+
+
 def contains_excluded_company(text: str, exclude_list: List[str]) -> Tuple[bool, List[str]]:
     """
     Check whether *text* mentions any company in *exclude_list*.
@@ -24,15 +31,13 @@ def contains_excluded_company(text: str, exclude_list: List[str]) -> Tuple[bool,
     if not text or not exclude_list:
         return False, []
 
-    text_lower = text.lower()
     found: List[str] = []
 
     for company in exclude_list:
         company_clean = company.strip()
         if not company_clean:
             continue
-        pattern = r"\b" + re.escape(company_clean.lower()) + r"\b"
-        if re.search(pattern, text_lower):
+        if _company_pattern(company_clean).search(text):
             found.append(company_clean)
 
     return bool(found), found
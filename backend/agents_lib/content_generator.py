@@ -1,17 +1,24 @@
 """Content generation helpers for drafting, critiquing, and validating posts."""
-import json
+import logging
 from typing import Tuple, Optional
 from io import BytesIO
 
 from google.genai import types
 
-from .config import client, LLM_MODEL, IMAGE_MODEL
+from .config import client, LLM_MODEL, LLM_MODEL_FAST, IMAGE_MODEL
+from .utils import parse_json_response
+from .cache import TTLCache, make_cache_key
 from logger_config import agent_logger as logger
 
+# Output cap for the schema-constrained LLM_MODEL_FAST calls (critique verdict, vision check,
+# topic list). That model doesn't think by default, so the cap only has to fit a small JSON
+# object; it stops a runaway response rather than shaping the answer.
+FAST_JSON_MAX_OUTPUT_TOKENS = 256
 
-def generate_post_draft(search_context: str, refined_persona: str, user_prompt: str, source_url: Optional[str] = None, recent_topics: list = None) -> str:
+
+def generate_post_draft_stream(search_context: str, refined_persona: str, user_prompt: str, source_url: Optional[str] = None, recent_topics: list = None):
     """
-    Generate a social media post draft based on search context and persona.
+    Generate a social media post draft, streaming tokens as the model emits them (generator).
 
     Args:
         search_context: Context from trending search results
@@ -20,8 +27,12 @@ def generate_post_draft(search_context: str, refined_persona: str, user_prompt:
         source_url: Optional URL to include in the post
         recent_topics: List of specific topics covered in the last 2 weeks to avoid
 
-    Returns:
-        Post text (under 280 characters including URL)
+    Yields:
+        ('token', text_delta) as chunks arrive
+        ('complete', post_text) once the full post is assembled (URL appended)
+        ('error', error_message) on failure
+
+    NOTE: Use this for SSE streaming so users see the draft as it is written.
     """
     try:
         # Account for URL in character count (Twitter counts URLs as ~23 chars)
@@ -57,38 +68,86 @@ CRITICAL REQUIREMENTS:
 Write only the post text, nothing else.
 """
 
-        response = client.models.generate_content(
+        chunks = []
+        for chunk in client.models.generate_content_stream(
             model=LLM_MODEL,
             contents=draft_prompt,
             config=types.GenerateContentConfig(
                 temperature=0.8,
                 thinking_config=types.ThinkingConfig(
-                    thinking_level="HIGH"
+                    thinking_level="MEDIUM"  # Short-form writing; HIGH adds latency without better drafts
                 )
             )
-        )
+        ):
+            if chunk.text:
+                chunks.append(chunk.text)
+                yield ('token', chunk.text)
 
-        post_text = response.text.strip()
+        post_text = "".join(chunks).strip()
+        if not post_text:
+            yield ('error', "Model returned an empty draft")
+            return
+
+        if len(post_text) > max_text_length:
+            logger.warning(f"Draft exceeds {max_text_length} chars ({len(post_text)} chars)")
 
         # Append URL if provided
         if source_url:
             post_text = f"{post_text} {source_url}"
             logger.info(f"Added source URL to post (total length: {len(post_text)} chars)")
 
-        return post_text
+        yield ('complete', post_text)
 
     except Exception as e:
         logger.error(f"Error generating draft: {e}", exc_info=True)
-        fallback = "Excited to share thoughts on this topic! #ai #automation"
-        if source_url:
-            fallback = f"{fallback} {source_url}"
-        return fallback
+        yield ('error', str(e))
+
+
+def generate_post_draft(search_context: str, refined_persona: str, user_prompt: str, source_url: Optional[str] = None, recent_topics: list = None) -> str:
+    """
+    Generate a social media post draft based on search context and persona.
+
+    Blocking wrapper around generate_post_draft_stream().
+
+    Args:
+        search_context: Context from trending search results
+        refined_persona: The persona description
+        user_prompt: The user's campaign prompt
+        source_url: Optional URL to include in the post
+        recent_topics: List of specific topics covered in the last 2 weeks to avoid
+
+    Returns:
+        Post text (under 280 characters including URL)
+    """
+    for event_type, *data in generate_post_draft_stream(search_context, refined_persona, user_prompt, source_url, recent_topics):
+        if event_type == 'complete':
+            return data[0]
+        if event_type == 'error':
+            break
+
+    fallback = "Excited to share thoughts on this topic! #ai #automation"
+    if source_url:
+        fallback = f"{fallback} {source_url}"
+    return fallback
+
+
+CRITIQUE_SCHEMA = types.Schema(
+    type="OBJECT",
+    properties={
+        "needs_rewrite": types.Schema(type="BOOLEAN"),
+        "reason": types.Schema(type="STRING"),
+    },
+    required=["needs_rewrite", "reason"]
+)
 
 
 def critique_and_refine_post(draft: str, refined_persona: str) -> str:
     """
     Critique the post draft and refine it if needed.
 
+    The fast model decides whether the draft needs a rewrite; the primary model
+    only runs for drafts that fail the critique, so passing drafts cost one cheap call.
+
     Returns:
         Final refined post
     """
@@ -105,17 +164,50 @@ Critique it for:
 3. Safety (no controversial/harmful content)
 4. Length (must be under 280 chars)
 
-If the post has issues, rewrite it. Otherwise, return it unchanged.
+Respond in this exact JSON format:
+{{
+    "needs_rewrite": true/false,
+    "reason": "Brief explanation of the issues, or why it is fine as is"
+}}
+"""
+
+        critique = client.models.generate_content(
+            model=LLM_MODEL_FAST,
+            contents=critique_prompt,
+            config=types.GenerateContentConfig(
+                temperature=0.2,
+                response_mime_type="application/json",
+                response_schema=CRITIQUE_SCHEMA,
+                max_output_tokens=FAST_JSON_MAX_OUTPUT_TOKENS
+            )
+        )
+
+        result = parse_json_response(critique)
+        reason = result.get("reason", "")
+        if not result.get("needs_rewrite", False):
+            logger.debug(f"Critique PASS: {reason}")
+            return draft
+
+        logger.info(f"Critique requested rewrite: {reason}")
+        rewrite_prompt = f"""
+Rewrite this social media post draft:
+"{draft}"
+
+Persona: {refined_persona}
+
+Reviewer feedback: {reason}
+
+Fix the issues while keeping it engaging, authentic to the persona, safe, and under 280 chars.
 Return only the final post text, nothing else.
 """
 
         response = client.models.generate_content(
             model=LLM_MODEL,
-            contents=critique_prompt,
+            contents=rewrite_prompt,
             config=types.GenerateContentConfig(
                 temperature=0.7,
                 thinking_config=types.ThinkingConfig(
-                    thinking_level="HIGH"
+                    thinking_level="LOW"  # Polishing an existing draft
                 )
             )
         )
@@ -127,6 +219,16 @@ Return only the final post text, nothing else.
         return draft
 
 
+VALIDATION_SCHEMA = types.Schema(
+    type="OBJECT",
+    properties={
+        "is_valid": types.Schema(type="BOOLEAN"),
+        "feedback": types.Schema(type="STRING"),
+    },
+    required=["is_valid", "feedback"]
+)
+
+
 def validate_content_matches_vision(post_text: str, user_prompt: str, refined_persona: str) -> Tuple[bool, str]:
     """
     Validate that generated social media post text is appropriate.
@@ -165,19 +267,19 @@ Respond in this exact JSON format:
 }}
 """
 
+        # Structured classification/extraction: the fast model with schema-guided output is enough
         response = client.models.generate_content(
-            model=LLM_MODEL,
+            model=LLM_MODEL_FAST,
             contents=validation_prompt,
             config=types.GenerateContentConfig(
                 temperature=0.3,
                 response_mime_type="application/json",
-                thinking_config=types.ThinkingConfig(
-                    thinking_level="HIGH"
-                )
+                response_schema=VALIDATION_SCHEMA,
+                max_output_tokens=FAST_JSON_MAX_OUTPUT_TOKENS
             )
         )
 
-        result = json.loads(response.text)
+        result = parse_json_response(response)
         is_valid = result.get("is_valid", False)
         feedback = result.get("feedback", "No feedback provided")
 
@@ -193,6 +295,15 @@ Respond in this exact JSON format:
         return True, "Validation skipped due to error"
 
 
+TOPICS_SCHEMA = types.Schema(
+    type="OBJECT",
+    properties={
+        "topics": types.Schema(type="ARRAY", items=types.Schema(type="STRING")),
+    },
+    required=["topics"]
+)
+
+
 def extract_topics_from_post(post_text: str, user_prompt: str = "") -> list:
     """
     Extract specific, granular topics covered in the post.
@@ -224,19 +335,19 @@ Respond in this exact JSON format:
 }}
 """
 
+        # Structured classification/extraction: the fast model with schema-guided output is enough
         response = client.models.generate_content(
-            model=LLM_MODEL,
+            model=LLM_MODEL_FAST,
             contents=extraction_prompt,
             config=types.GenerateContentConfig(
                 temperature=0.3,
                 response_mime_type="application/json",
-                thinking_config=types.ThinkingConfig(
-                    thinking_level="HIGH"
-                )
+                response_schema=TOPICS_SCHEMA,
+                max_output_tokens=FAST_JSON_MAX_OUTPUT_TOKENS
             )
         )
 
-        result = json.loads(response.text)
+        result = parse_json_response(response)
         topics = result.get("topics", [])
         logger.info(f"Extracted {len(topics)} topics: {topics}")
         return topics
@@ -246,6 +357,11 @@ Respond in this exact JSON format:
         return []
 
 
+# Refined image prompts keyed on the exact inputs. Semantic matching is deliberately
+# not used here: two similar posts should still get prompts about their own content.
+_image_prompt_cache = TTLCache(maxsize=256, ttl=7 * 24 * 3600)
+
+
 def refine_image_prompt(post_text: str, visual_style: str, user_prompt: str, topic_context: str = "") -> str:
     """
     STEP 1 (The Brain): Use the text reasoning model to deeply think about
@@ -264,6 +380,12 @@ def refine_image_prompt(post_text: str, visual_style: str, user_prompt: str, top
     Returns:
         A refined, detailed image generation prompt
     """
+    cache_key = make_cache_key(post_text, visual_style, user_prompt, topic_context)
+    cached = _image_prompt_cache.get(cache_key)
+    if cached is not None:
+        logger.info("📝 Refined image prompt served from cache")
+        return cached
+
     try:
         # Build topic context section if available
         topic_context_section = ""
@@ -316,6 +438,8 @@ OUTPUT: Write ONLY the final, detailed prompt for the image generator.
         refined_prompt = response.text.strip()
         logger.info(f"📝 Refined image prompt: {refined_prompt[:200]}...")
 
+        if refined_prompt:
+            _image_prompt_cache.set(cache_key, refined_prompt)
         return refined_prompt
 
     except Exception as e:
@@ -362,48 +486,36 @@ def generate_image(post_text: str, visual_style: str, user_prompt: str, topic_co
             )
         )
 
-        # Debug logging
-        logger.info(f"Image API response type: {type(response)}")
-        logger.info(f"Has candidates: {hasattr(response, 'candidates')}")
-        if hasattr(response, 'candidates'):
-            logger.info(f"Number of candidates: {len(response.candidates)}")
-            for i, candidate in enumerate(response.candidates):
-                logger.info(f"Candidate {i} type: {type(candidate)}")
-                if hasattr(candidate, 'content'):
-                    logger.info(f"  Has content: True")
-                    if hasattr(candidate.content, 'parts'):
-                        logger.info(f"  Number of parts: {len(candidate.content.parts)}")
-                        for j, part in enumerate(candidate.content.parts):
-                            logger.info(f"    Part {j} type: {type(part)}")
-                            logger.info(f"    Part {j} has as_image: {hasattr(part, 'as_image')}")
-                            logger.info(f"    Part {j} has inline_data: {hasattr(part, 'inline_data')}")
-                            logger.info(f"    Part {j} attributes: {dir(part)}")
-
-        # Extract image from response candidates
-        if hasattr(response, 'candidates'):
-            for candidate in response.candidates:
-                if hasattr(candidate, 'content') and hasattr(candidate.content, 'parts'):
-                    for part in candidate.content.parts:
-                        # Try inline_data first (raw bytes - most reliable)
-                        if hasattr(part, 'inline_data') and part.inline_data:
-                            logger.info(f"Found inline_data: {type(part.inline_data)}")
-                            if hasattr(part.inline_data, 'data') and part.inline_data.data:
-                                logger.info(f"Image generated successfully via inline_data ({len(part.inline_data.data)} bytes)")
-                                return part.inline_data.data
-
-                        # Try as_image method as fallback
-                        if hasattr(part, 'as_image'):
-                            try:
-                                image = part.as_image()
-                                if image:
-                                    img_byte_arr = BytesIO()
-                                    # Check if it's a PIL Image with save method that takes format
-                                    if hasattr(image, 'save'):
-                                        image.save(img_byte_arr, format='PNG')
-                                        logger.info(f"Image generated successfully via as_image() ({len(img_byte_arr.getvalue())} bytes)")
-                                        return img_byte_arr.getvalue()
-                            except Exception as e:
-                                logger.warning(f"as_image() method failed: {e}")
+        parts = [
+            part
+            for candidate in (getattr(response, 'candidates', None) or [])
+            for part in (getattr(getattr(candidate, 'content', None), 'parts', None) or [])
+        ]
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug(f"Image API response parts: {[type(part).__name__ for part in parts]}")
+
+        # Raw inline bytes first (most reliable, no re-encoding)
+        for part in parts:
+            data = getattr(getattr(part, 'inline_data', None), 'data', None)
+            if data:
+                logger.info(f"Image generated successfully via inline_data ({len(data)} bytes)")
+                return data
+
+        # Fall back to as_image() only when no part carried inline bytes
+        for part in parts:
+            if not hasattr(part, 'as_image'):
+                continue
+            try:
+                image = part.as_image()
+                # Check if it's a PIL Image with save method that takes format
+                if image and hasattr(image, 'save'):
+                    img_byte_arr = BytesIO()
+                    image.save(img_byte_arr, format='PNG')
+                    image_bytes = img_byte_arr.getvalue()
+                    logger.info(f"Image generated successfully via as_image() ({len(image_bytes)} bytes)")
+                    return image_bytes
+            except Exception as e:
+                logger.warning(f"as_image() method failed: {e}")
 
         logger.warning("No image found in response candidates")
         return None
@@ -1,9 +1,9 @@
 """Intent parsing agent for analyzing user messages."""
-import json
 from typing import Optional
 from google.genai import types
 
 from .config import client, LLM_MODEL
+from .utils import parse_json_response
 from logger_config import agent_logger as logger
 
 
@@ -52,6 +52,67 @@ IMPORTANT: If user says things like "generate a campaign prompt", "create a camp
 
 Return ONLY valid JSON, no explanation."""
 
+# Intent router = intent parser + direct reply in a single LLM call, so greetings
+# and clarifications don't need a second model hop.
+INTENT_ROUTER_PROMPT = INTENT_PARSER_PROMPT.replace(
+    "Return ONLY valid JSON, no explanation.",
+    """6. "response": A reply to send directly to the user
+   - ONLY for "greeting" and "clarify" intents, otherwise an empty string
+   - greeting: briefly say hello and explain you help create social media posts, with 2-3 example requests
+     like "mario and luigi explain observability" or "what's trending in AI?"
+   - clarify: ask what they'd like to post about (a topic, an optional creative persona, or a brainstorm)
+
+Return ONLY valid JSON, no explanation."""
+)
+
+_INTENT_PROPERTIES = {
+    "intent": types.Schema(
+        type="STRING",
+        enum=[INTENT_GENERATE_POSTS, INTENT_BRAINSTORM, INTENT_GENERATE_CAMPAIGN, INTENT_GREETING, INTENT_CLARIFY]
+    ),
+    "persona": types.Schema(type="STRING"),
+    "topic": types.Schema(type="STRING"),
+    "search_query": types.Schema(type="STRING"),
+    "visual_style": types.Schema(type="STRING"),
+}
+
+INTENT_PARSER_SCHEMA = types.Schema(
+    type="OBJECT",
+    properties=_INTENT_PROPERTIES,
+    required=list(_INTENT_PROPERTIES)
+)
+
+INTENT_ROUTER_SCHEMA = types.Schema(
+    type="OBJECT",
+    properties={**_INTENT_PROPERTIES, "response": types.Schema(type="STRING")},
+    required=[*_INTENT_PROPERTIES, "response"]
+)
+
+
+def _build_intent_context(message: str, history: list = None) -> str:
+    """Build the LLM input for intent parsing from the message and recent history."""
+    context_parts = []
+    if history:
+        context_parts.append("Previous conversation:")
+        for msg in history[-6:]:  # Last 3 exchanges
+            role = msg.get("role", "user")
+            content = msg.get("content", "")[:500]
+            context_parts.append(f"  {role}: {content}")
+        context_parts.append("")
+    context_parts.append(f"Current user message: {message}")
+    return "\n".join(context_parts)
+
+
+def _fallback_intent(message: str) -> dict:
+    """Fallback intent when the LLM call fails - treat as simple post request."""
+    return {
+        "intent": INTENT_GENERATE_POSTS,
+        "persona": DEFAULT_PERSONA,
+        "topic": message,
+        "search_query": message,
+        "visual_style": DEFAULT_VISUAL_STYLE
+    }
+
 
 def agent_intent_parser(message: str, history: list = None) -> dict:
     """
@@ -67,17 +128,7 @@ def agent_intent_parser(message: str, history: list = None) -> dict:
         Dictionary with keys: intent, persona, topic, search_query, visual_style
     """
     try:
-        # Build context including history
-        context_parts = []
-        if history:
-            context_parts.append("Previous conversation:")
-            for msg in history[-6:]:  # Last 3 exchanges
-                role = msg.get("role", "user")
-                content = msg.get("content", "")[:500]
-                context_parts.append(f"  {role}: {content}")
-            context_parts.append("")
-        context_parts.append(f"Current user message: {message}")
-        full_context = "\n".join(context_parts)
+        full_context = _build_intent_context(message, history)
 
         response = client.models.generate_content(
             model=LLM_MODEL,
@@ -85,22 +136,50 @@ def agent_intent_parser(message: str, history: list = None) -> dict:
             config=types.GenerateContentConfig(
                 system_instruction=INTENT_PARSER_PROMPT,
                 temperature=0.2,
-                response_mime_type="application/json"
+                response_mime_type="application/json",
+                response_schema=INTENT_PARSER_SCHEMA
             )
         )
-        result = json.loads(response.text)
+        result = parse_json_response(response)
         logger.info(f"Intent parser result: {result}")
         return result
     except Exception as e:
         logger.error(f"Intent parser error: {e}")
-        # Fallback - treat as simple post request
-        return {
-            "intent": INTENT_GENERATE_POSTS,
-            "persona": DEFAULT_PERSONA,
-            "topic": message,
-            "search_query": message,
-            "visual_style": DEFAULT_VISUAL_STYLE
-        }
+        return _fallback_intent(message)
+
+
+def agent_intent_router(message: str, history: list = None) -> dict:
+    """
+    Parse intent AND draft the direct reply in one structured-output LLM call.
+
+    Same fields as agent_intent_parser plus "response", which carries the
+    reply text for greeting/clarify intents so the orchestrator can answer
+    without another model round-trip.
+
+    Args:
+        message: The user's message to parse
+        history: Optional conversation history
+
+    Returns:
+        Dictionary with keys: intent, persona, topic, search_query, visual_style, response
+    """
+    try:
+        response = client.models.generate_content(
+            model=LLM_MODEL,
+            contents=_build_intent_context(message, history),
+            config=types.GenerateContentConfig(
+                system_instruction=INTENT_ROUTER_PROMPT,
+                temperature=0.2,
+                response_mime_type="application/json",
+                response_schema=INTENT_ROUTER_SCHEMA
+            )
+        )
+        result = parse_json_response(response)
+        logger.info(f"Intent router result: {result}")
+        return result
+    except Exception as e:
+        logger.error(f"Intent router error: {e}")
+        return {**_fallback_intent(message), "response": ""}
 
 
 def is_greeting_intent(intent_result: dict) -> bool:
@@ -1,6 +1,7 @@
 """LinkedIn company mention detection and substitution."""
 import re
-from typing import List, Set
+from functools import lru_cache
+from typing import Dict, Optional, Pattern, Tuple
 import sys
 import os
 
@@ -9,12 +10,41 @@ from database import get_active_linkedin_mentions
 from logger_config import agent_logger as logger
 
 
+@lru_cache(maxsize=8)
+def _compile_mention_matcher(mention_spec: tuple) -> Tuple[Optional[Pattern], Dict[str, tuple]]:
+    """
+    Build one case-insensitive regex that matches every company name and alias.
+
+    Args:
+        mention_spec: Tuple of (company_name, organization_urn, aliases) in priority order
+
+    Returns:
+        (pattern, terms) where terms maps a lowercased term to
+        (organization_urn, company_name, (company_index, term_index))
+    """
+    terms: Dict[str, tuple] = {}
+    for company_index, (company_name, urn, aliases) in enumerate(mention_spec):
+        for term_index, term in enumerate((company_name,) + aliases):
+            if term:
+                terms.setdefault(term.lower(), (urn, company_name, (company_index, term_index)))
+
+    if not terms:
+        return None, terms
+
+    # Longest terms first so "Google Cloud" wins over "Google" at the same position
+    alternation = "|".join(re.escape(term) for term in sorted(terms, key=len, reverse=True))
+    # Negative lookbehind/lookahead to avoid matching inside existing mentions
+    pattern = re.compile(r'(?<!\[)(?<!\()\b(?:' + alternation + r')\b(?!\])(?!\))', re.IGNORECASE)
+    return pattern, terms
+
+
 def apply_linkedin_mentions(post_text: str) -> str:
     """
     Detect and apply LinkedIn company mentions to post text.
 
     Uses case-insensitive matching for company names and aliases.
     Each company is mentioned at most ONCE per post (first occurrence only).
+    All names are found in a single scan of the text with one precompiled regex.
 
     Args:
         post_text: The LinkedIn post text
@@ -29,31 +59,30 @@ def apply_linkedin_mentions(post_text: str) -> str:
     if not mentions:
         return post_text
 
-    applied_urns: Set[str] = set()  # Track which companies we've already mentioned
+    mention_spec = tuple(
+        (m['company_name'], m['organization_urn'], tuple(m.get('aliases') or ()))
+        for m in mentions
+    )
+    pattern, terms = _compile_mention_matcher(mention_spec)
+    if pattern is None:
+        return post_text
 
-    for mention in mentions:
-        if mention['organization_urn'] in applied_urns:
+    # Per company keep the first occurrence of its highest-priority term
+    # (company name before aliases, aliases in configured order)
+    selected: Dict[str, tuple] = {}
+    for match in pattern.finditer(post_text):
+        entry = terms.get(match.group(0).lower())
+        if entry is None:
             continue
-
-        # Build list of names to search for (primary + aliases)
-        search_terms = [mention['company_name']]
-        if mention.get('aliases'):
-            search_terms.extend(mention['aliases'])
-
-        # Try to find and replace first occurrence
-        for term in search_terms:
-            # Case-insensitive word boundary match
-            # Use negative lookbehind/lookahead to avoid matching inside existing mentions
-            pattern = r'(?<!\[)(?<!\()' + r'\b' + re.escape(term) + r'\b' + r'(?!\])(?!\))'
-            match = re.search(pattern, post_text, re.IGNORECASE)
-
-            if match:
-                # Replace first occurrence with mention format
-                mention_text = f"@[{mention['company_name']}]({mention['organization_urn']})"
-                post_text = post_text[:match.start()] + mention_text + post_text[match.end():]
-                applied_urns.add(mention['organization_urn'])
-                logger.info(f"Applied LinkedIn mention: '{term}' -> @[{mention['company_name']}]")
-                break  # Only replace first occurrence, move to next company
+        urn, company_name, priority = entry
+        current = selected.get(urn)
+        if current is None or priority < current[0]:
+            selected[urn] = (priority, match.start(), match.end(), company_name)
+
+    # Replace right-to-left so earlier offsets stay valid
+    for urn, (_, start, end, company_name) in sorted(selected.items(), key=lambda item: item[1][1], reverse=True):
+        logger.info(f"Applied LinkedIn mention: '{post_text[start:end]}' -> @[{company_name}]")
+        post_text = post_text[:start] + f"@[{company_name}]({urn})" + post_text[end:]
 
     return post_text
 
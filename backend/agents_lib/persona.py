@@ -1,10 +1,12 @@
 """Persona analysis for user prompts."""
-import json
+import orjson
 import re
 from typing import Tuple, List
 from google.genai import types
 
 from .config import client, LLM_MODEL
+from .utils import parse_json_response
+from .cache import TTLCache, make_cache_key, normalize_text
 from logger_config import agent_logger as logger
 
 
@@ -25,6 +27,15 @@ Respond in this exact JSON format:
 }}
 """
 
+PERSONA_ANALYSIS_SCHEMA = types.Schema(
+    type="OBJECT",
+    properties={
+        "refined_persona": types.Schema(type="STRING"),
+        "visual_style": types.Schema(type="STRING"),
+    },
+    required=["refined_persona", "visual_style"]
+)
+
 
 COMPETITOR_INFERENCE_PROMPT = """You are analyzing a social media campaign to identify companies that should NOT be mentioned in automated posts.
 
@@ -68,6 +79,11 @@ If no scheduling preference is detected, return:
 }}
 """
 
+# Re-saving a campaign with the same prompt (modulo case and whitespace) skips the
+# HIGH-thinking analysis call. Exact match only: a near-duplicate prompt is a different
+# creative vision, and must never pick up another user's persona.
+_persona_cache = TTLCache(maxsize=256, ttl=7 * 24 * 3600)
+
 
 def analyze_user_prompt(user_prompt: str) -> Tuple[str, str]:
     """
@@ -80,6 +96,12 @@ def analyze_user_prompt(user_prompt: str) -> Tuple[str, str]:
     Returns:
         Tuple of (refined_persona, visual_style)
     """
+    cache_key = make_cache_key(normalize_text(user_prompt))
+    cached = _persona_cache.get(cache_key)
+    if cached is not None:
+        logger.info("Persona analysis served from cache")
+        return cached
+
     try:
         analysis_prompt = PERSONA_ANALYSIS_PROMPT.format(user_prompt=user_prompt)
 
@@ -89,16 +111,19 @@ def analyze_user_prompt(user_prompt: str) -> Tuple[str, str]:
             config=types.GenerateContentConfig(
                 temperature=0.5,  # Lower temp to stay faithful to user input
                 response_mime_type="application/json",
+                response_schema=PERSONA_ANALYSIS_SCHEMA,
                 thinking_config=types.ThinkingConfig(
                     thinking_level="HIGH"
                 )
             )
         )
 
-        result = response.text
-        data = json.loads(result)
+        data = parse_json_response(response)
 
-        return data.get("refined_persona", ""), data.get("visual_style", "")
+        analysis = (data.get("refined_persona", ""), data.get("visual_style", ""))
+        if all(analysis):
+            _persona_cache.set(cache_key, analysis)
+        return analysis
 
     except Exception as e:
         logger.error(f"Error analyzing prompt: {e}", exc_info=True)
@@ -150,7 +175,7 @@ def infer_excluded_companies(prompt: str, author_bio: str = "") -> List[str]:
             )
         )
 
-        result = json.loads(response.text)
+        result = orjson.loads(response.text)
         
         # Handle both array and object responses
         if isinstance(result, list):
@@ -214,7 +239,7 @@ def infer_schedule_from_prompt(prompt: str) -> Tuple[str, str]:
             )
         )
 
-        result = json.loads(response.text)
+        result = orjson.loads(response.text)
         cron = result.get("cron", "0 9 * * *")
         description = result.get("description", "Daily at 9 AM")
         
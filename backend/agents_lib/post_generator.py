@@ -1,13 +1,21 @@
 """Post generation for X/Twitter and LinkedIn platforms."""
-import time
 from typing import Tuple, Optional
 from google.genai import types
 
 from .config import client, LLM_MODEL
-from .utils import strip_markdown_formatting, sanitize_for_linkedin
+from .utils import strip_markdown_formatting, sanitize_for_linkedin, parse_json_response, backoff_delay, sleep_before_retry
 from .linkedin_mentions import apply_linkedin_mentions
+from .cache import TTLCache, make_cache_key
 from logger_config import agent_logger as logger
 
+# Exact-input cache for generated post text, so a retried scheduled cycle reuses the post
+# instead of paying for another HIGH-thinking call. Callers where a repeat request means
+# "give me a fresh take" (the URL flow always regenerates) pass use_cache=False.
+_post_text_cache = TTLCache(maxsize=256, ttl=600)
+
+X_POST_TEMPERATURE = 0.8
+LINKEDIN_POST_TEMPERATURE = 0.7
+
 
 def generate_x_post(
     search_context: str,
@@ -15,7 +23,9 @@ def generate_x_post(
     user_prompt: str,
     source_url: Optional[str],
     recent_topics: list,
-    max_retries: int = 3
+    max_retries: int = 3,
+    deadline: Optional[float] = None,
+    use_cache: bool = True
 ) -> Tuple[str, str]:
     """
     Generate X/Twitter-specific post (280 char limit, casual, punchy).
@@ -30,6 +40,8 @@ def generate_x_post(
         source_url: Source URL to include
         recent_topics: List of recently covered topics to avoid
         max_retries: Number of retry attempts before failing (default: 3)
+        deadline: Optional time.monotonic() deadline; no retry backoff is started past it
+        use_cache: Reuse (and store) the post text for identical inputs (default: True)
 
     Returns:
         Tuple of (post_text, source_url)
@@ -38,25 +50,21 @@ def generate_x_post(
         Exception: If all retries fail - caller should handle by skipping post
     """
     for attempt in range(max_retries):
-        try:
-            if attempt > 0:
-                logger.info(f"Retry attempt {attempt + 1}/{max_retries} for X post generation")
-                time.sleep(2 ** attempt)  # Exponential backoff: 2s, 4s, 8s
+        if attempt > 0:
+            logger.info(f"Retry attempt {attempt + 1}/{max_retries} for X post generation")
+            sleep_before_retry(backoff_delay(attempt), deadline)  # Jittered exponential backoff: ~2s, ~4s, ~8s
 
+        try:
             post_text = _generate_x_post_text(
                 search_context,
                 refined_persona,
                 user_prompt,
                 source_url,
-                recent_topics
+                recent_topics,
+                use_cache
             )
 
-            # Always add URL if provided and not already in post
-            if source_url and source_url not in post_text:
-                post_text = f"{post_text}\n\n{source_url}"
-                logger.info(f"X post with URL (total: {len(post_text)} chars)")
-
-            return post_text, source_url
+            return _finalize_x_post(post_text, source_url), source_url
 
         except Exception as e:
             logger.warning(f"Attempt {attempt + 1}/{max_retries} failed for X post: {e}")
@@ -65,31 +73,21 @@ def generate_x_post(
                 raise
 
 
-def _generate_x_post_text(
-    search_context: str,
-    refined_persona: str,
-    user_prompt: str,
-    source_url: Optional[str],
-    recent_topics: list
-) -> str:
-    """Generate the X post text using LLM."""
-    max_text_length = 230 if source_url else 280
+def _build_avoidance_text(recent_topics: Optional[list]) -> str:
+    """Prompt rule steering away from recently covered topics (shared by X and LinkedIn)."""
+    if not recent_topics:
+        return ""
+    return f"\n- Explore a FRESH angle - we recently covered: {', '.join(recent_topics[:5])}"
 
-    avoidance_text = ""
-    if recent_topics:
-        topics_str = ", ".join(recent_topics[:5])
-        avoidance_text = f"\n- Explore a FRESH angle - we recently covered: {topics_str}"
 
-    prompt = f"""
-USER'S CREATIVE VISION: {user_prompt}
-This describes the IMAGE/VISUAL FORMAT that will accompany the post.
+def _x_max_text_length(source_url: Optional[str]) -> int:
+    """X post text budget, leaving room for the appended source URL."""
+    return 230 if source_url else 280
 
-TOPIC CONTEXT (pick ONE specific concept to focus on):
-{search_context}
-
-YOUR TASK: Write ONE polished, publication-ready X/Twitter post about a SINGLE topic from the context above.
 
-STRUCTURE YOUR POST (bullet format preferred for higher engagement):
+def _x_post_instructions(refined_persona: str, max_text_length: int, avoidance_text: str) -> str:
+    """Writing rules for an X post (shared by the single and combined prompts)."""
+    return f"""STRUCTURE YOUR POST (bullet format preferred for higher engagement):
 1. Hook line - grabs attention (question or bold statement)
 2. 2-3 bullet points with key insights (use • or - symbols)
 3. Call-to-action or hashtags
@@ -124,7 +122,95 @@ X/TWITTER REQUIREMENTS:
 - MAXIMUM {max_text_length} characters - this is STRICT
 - Engaging, punchy tone with a clear hook
 - Can use 1-2 relevant hashtags or emojis
-- DO NOT include URLs - we'll add that separately{avoidance_text}
+- DO NOT include URLs - we'll add that separately{avoidance_text}"""
+
+
+def _linkedin_post_instructions(refined_persona: str, avoidance_text: str) -> str:
+    """Writing rules for a LinkedIn post (shared by the single and combined prompts)."""
+    return f"""CRITICAL INSTRUCTIONS:
+- DO NOT write an image generation prompt or detailed description of the visual
+- DO write a thoughtful LinkedIn post ABOUT the technical topic
+- Write FROM the persona's voice: {refined_persona}
+- You CAN mention that there's a unique visual/tutorial format, but keep it brief and focus on the VALUE/INSIGHTS
+
+STRUCTURE FOR ENGAGEMENT:
+1. Opening hook (1-2 sentences max) - pose a question or bold statement
+2. Key insights - use bullet points or short paragraphs
+3. Takeaway - what should the reader do or think differently?
+4. Hashtags (2-3 max)
+
+FORMATTING GUIDANCE:
+- Keep sentences SHORT and punchy (under 15 words ideal)
+- Use line breaks between ideas for scannability
+- Bullet points work well for listing insights
+- Front-load the value - hook FIRST, context SECOND
+
+HOOK PATTERNS THAT WORK:
+- "Ever wondered why...?"
+- "Here's what most engineers miss about..."
+- "I used to think X. Then I learned Y."
+- Problem statement + "Here's how to fix it:"
+
+EXAMPLES OF WHAT TO DO:
+✓ "Ever dealt with messy traces clogging your OTEL collector?
+
+Here's why proper trace management matters:
+• Bad traces waste storage and compute
+• They obscure real issues in your data
+• Early filtering saves 40%+ on costs
+
+Key takeaway: configure your BadTrace filters early! #OpenTelemetry"
+
+EXAMPLES OF WHAT NOT TO DO:
+✗ "Check out this anime sketch showing a girl pointing at a whiteboard..."
+✗ "New diagram series featuring a character teaching..."
+✗ Long, dense paragraphs without breaks
+
+QUALITY CHECK (self-review before outputting):
+- Is this a professional post about the TOPIC (not an image description)?
+- Does it have a clear hook in the first 1-2 sentences?
+- Is it scannable (short sentences, line breaks, bullets)?
+- Is it free of markdown formatting (no **bold**, __italics__, etc.)?
+
+LINKEDIN REQUIREMENTS:
+- 1-3 short paragraphs or hook + bullets
+- Professional, insightful tone
+- Provide VALUE to readers - what will they learn?
+- Engage the professional community
+- Can use relevant hashtags (2-3 max)
+- Use plain text only with emojis if appropriate - NO markdown formatting
+- DO NOT include URLs - we'll add that separately{avoidance_text}"""
+
+
+def _generate_x_post_text(
+    search_context: str,
+    refined_persona: str,
+    user_prompt: str,
+    source_url: Optional[str],
+    recent_topics: list,
+    use_cache: bool = True
+) -> str:
+    """Generate the X post text using LLM."""
+    cache_key = make_cache_key("x", LLM_MODEL, search_context, refined_persona, user_prompt, source_url, recent_topics)
+    cached = _post_text_cache.get(cache_key) if use_cache else None
+    if cached is not None:
+        logger.info("X post text served from cache")
+        return cached
+
+    max_text_length = _x_max_text_length(source_url)
+
+    avoidance_text = _build_avoidance_text(recent_topics)
+
+    prompt = f"""
+USER'S CREATIVE VISION: {user_prompt}
+This describes the IMAGE/VISUAL FORMAT that will accompany the post.
+
+TOPIC CONTEXT (pick ONE specific concept to focus on):
+{search_context}
+
+YOUR TASK: Write ONE polished, publication-ready X/Twitter post about a SINGLE topic from the context above.
+
+{_x_post_instructions(refined_persona, max_text_length, avoidance_text)}
 
 Write ONLY the final post text, nothing else.
 """
@@ -133,14 +219,17 @@ Write ONLY the final post text, nothing else.
         model=LLM_MODEL,
         contents=prompt,
         config=types.GenerateContentConfig(
-            temperature=0.8,
+            temperature=X_POST_TEMPERATURE,
             thinking_config=types.ThinkingConfig(
                 thinking_level="HIGH"
             )
         )
     )
 
-    return response.text.strip()
+    post_text = response.text.strip()
+    if post_text and use_cache:
+        _post_text_cache.set(cache_key, post_text)
+    return post_text
 
 
 def generate_linkedin_post(
@@ -149,7 +238,9 @@ def generate_linkedin_post(
     user_prompt: str,
     source_url: Optional[str],
     recent_topics: list,
-    max_retries: int = 3
+    max_retries: int = 3,
+    deadline: Optional[float] = None,
+    use_cache: bool = True
 ) -> str:
     """
     Generate LinkedIn-specific post (longer form, professional, detailed).
@@ -164,6 +255,8 @@ def generate_linkedin_post(
         source_url: Source URL to include
         recent_topics: List of recently covered topics to avoid
         max_retries: Number of retry attempts before failing (default: 3)
+        deadline: Optional time.monotonic() deadline; no retry backoff is started past it
+        use_cache: Reuse (and store) the post text for identical inputs (default: True)
 
     Returns:
         Complete LinkedIn post text with context and insights
@@ -172,35 +265,20 @@ def generate_linkedin_post(
         Exception: If all retries fail - caller should handle by skipping post
     """
     for attempt in range(max_retries):
-        try:
-            if attempt > 0:
-                logger.info(f"Retry attempt {attempt + 1}/{max_retries} for LinkedIn post generation")
-                time.sleep(2 ** attempt)  # Exponential backoff: 2s, 4s, 8s
+        if attempt > 0:
+            logger.info(f"Retry attempt {attempt + 1}/{max_retries} for LinkedIn post generation")
+            sleep_before_retry(backoff_delay(attempt), deadline)  # Jittered exponential backoff: ~2s, ~4s, ~8s
 
+        try:
             post_text = _generate_linkedin_post_text(
                 search_context,
                 refined_persona,
                 user_prompt,
-                recent_topics
+                recent_topics,
+                use_cache
             )
 
-            # Strip any markdown formatting (LinkedIn doesn't support it)
-            post_text = strip_markdown_formatting(post_text)
-
-            # Replace pipe characters that cause LinkedIn truncation
-            post_text = sanitize_for_linkedin(post_text)
-
-            # Apply LinkedIn company mentions (converts company names to mention format)
-            post_text = apply_linkedin_mentions(post_text)
-
-            # Always add URL if provided and not already in post
-            if source_url and source_url not in post_text:
-                post_text = f"{post_text}\n\n{source_url}"
-                logger.info(f"Added source URL to LinkedIn post")
-
-            logger.info(f"LinkedIn post ({len(post_text)} chars)")
-
-            return post_text
+            return _finalize_linkedin_post(post_text, source_url)
 
         except Exception as e:
             logger.warning(f"Attempt {attempt + 1}/{max_retries} failed for LinkedIn post: {e}")
@@ -213,13 +291,30 @@ def _generate_linkedin_post_text(
     search_context: str,
     refined_persona: str,
     user_prompt: str,
-    recent_topics: list
+    recent_topics: list,
+    use_cache: bool = True
 ) -> str:
     """Generate the LinkedIn post text using LLM."""
-    avoidance_text = ""
-    if recent_topics:
-        topics_str = ", ".join(recent_topics[:5])
-        avoidance_text = f"\n- Explore a FRESH angle - we recently covered: {topics_str}"
+    cache_key = make_cache_key("linkedin", LLM_MODEL, search_context, refined_persona, user_prompt, recent_topics)
+    cached = _post_text_cache.get(cache_key) if use_cache else None
+    if cached is not None:
+        logger.info("LinkedIn post text served from cache")
+        return cached
+
+    post_text = "".join(_stream_linkedin_post_text(search_context, refined_persona, user_prompt, recent_topics)).strip()
+    if post_text and use_cache:
+        _post_text_cache.set(cache_key, post_text)
+    return post_text
+
+
+def _stream_linkedin_post_text(
+    search_context: str,
+    refined_persona: str,
+    user_prompt: str,
+    recent_topics: list
+):
+    """Yield raw LinkedIn post text deltas as the LLM emits them."""
+    avoidance_text = _build_avoidance_text(recent_topics)
 
     prompt = f"""
 CONTEXT: The user's creative vision is: {user_prompt}
@@ -227,72 +322,230 @@ This describes the IMAGE/VISUAL FORMAT that will accompany the post.
 
 Your task: Write a polished, publication-ready PROFESSIONAL LINKEDIN POST about this topic: {search_context}
 
-CRITICAL INSTRUCTIONS:
-- DO NOT write an image generation prompt or detailed description of the visual
-- DO write a thoughtful LinkedIn post ABOUT the technical topic
-- Write FROM the persona's voice: {refined_persona}
-- You CAN mention that there's a unique visual/tutorial format, but keep it brief and focus on the VALUE/INSIGHTS
+{_linkedin_post_instructions(refined_persona, avoidance_text)}
 
-STRUCTURE FOR ENGAGEMENT:
-1. Opening hook (1-2 sentences max) - pose a question or bold statement
-2. Key insights - use bullet points or short paragraphs
-3. Takeaway - what should the reader do or think differently?
-4. Hashtags (2-3 max)
+Write ONLY the final post text in plain text format, nothing else.
+"""
 
-FORMATTING GUIDANCE:
-- Keep sentences SHORT and punchy (under 15 words ideal)
-- Use line breaks between ideas for scannability
-- Bullet points work well for listing insights
-- Front-load the value - hook FIRST, context SECOND
+    for chunk in client.models.generate_content_stream(
+        model=LLM_MODEL,
+        contents=prompt,
+        config=types.GenerateContentConfig(
+            temperature=LINKEDIN_POST_TEMPERATURE,
+            thinking_config=types.ThinkingConfig(
+                thinking_level="HIGH"
+            )
+        )
+    ):
+        if chunk.text:
+            yield chunk.text
 
-HOOK PATTERNS THAT WORK:
-- "Ever wondered why...?"
-- "Here's what most engineers miss about..."
-- "I used to think X. Then I learned Y."
-- Problem statement + "Here's how to fix it:"
 
-EXAMPLES OF WHAT TO DO:
-✓ "Ever dealt with messy traces clogging your OTEL collector?
+def generate_linkedin_post_stream(
+    search_context: str,
+    refined_persona: str,
+    user_prompt: str,
+    source_url: Optional[str],
+    recent_topics: list
+):
+    """
+    Generate a LinkedIn post, streaming text as the model emits it (generator).
 
-Here's why proper trace management matters:
-• Bad traces waste storage and compute
-• They obscure real issues in your data
-• Early filtering saves 40%+ on costs
+    Args:
+        search_context: Context from search results
+        refined_persona: The persona to write as
+        user_prompt: User's original creative direction
+        source_url: Source URL to include
+        recent_topics: List of recently covered topics to avoid
 
-Key takeaway: configure your BadTrace filters early! #OpenTelemetry"
+    Yields:
+        ('token', text_delta) as chunks arrive (raw model text)
+        ('complete', post_text) once finished - cleaned, mentions applied, URL appended
+        ('error', error_message) on failure
 
-EXAMPLES OF WHAT NOT TO DO:
-✗ "Check out this anime sketch showing a girl pointing at a whiteboard..."
-✗ "New diagram series featuring a character teaching..."
-✗ Long, dense paragraphs without breaks
+    NOTE: Markdown stripping and company mentions need the full text, so only the
+    'complete' post is publish-ready. Unlike generate_linkedin_post, this does not retry.
+    """
+    try:
+        chunks = []
+        for delta in _stream_linkedin_post_text(search_context, refined_persona, user_prompt, recent_topics):
+            chunks.append(delta)
+            yield ('token', delta)
 
-QUALITY CHECK (self-review before outputting):
-- Is this a professional post about the TOPIC (not an image description)?
-- Does it have a clear hook in the first 1-2 sentences?
-- Is it scannable (short sentences, line breaks, bullets)?
-- Is it free of markdown formatting (no **bold**, __italics__, etc.)?
+        post_text = "".join(chunks).strip()
+        if not post_text:
+            raise ValueError("LLM returned an empty LinkedIn post")
+        yield ('complete', _finalize_linkedin_post(post_text, source_url))
 
-LINKEDIN REQUIREMENTS:
-- 1-3 short paragraphs or hook + bullets
-- Professional, insightful tone
-- Provide VALUE to readers - what will they learn?
-- Engage the professional community
-- Can use relevant hashtags (2-3 max)
-- Use plain text only with emojis if appropriate - NO markdown formatting
-- DO NOT include URLs - we'll add that separately{avoidance_text}
+    except Exception as e:
+        logger.error(f"Error streaming LinkedIn post: {e}", exc_info=True)
+        yield ('error', str(e))
 
-Write ONLY the final post text in plain text format, nothing else.
+
+def _finalize_x_post(post_text: str, source_url: Optional[str]) -> str:
+    """Append the source URL to generated X post text."""
+    # Always add URL if provided and not already in post
+    if source_url and source_url not in post_text:
+        post_text = f"{post_text}\n\n{source_url}"
+        logger.info(f"X post with URL (total: {len(post_text)} chars)")
+    return post_text
+
+
+def _finalize_linkedin_post(post_text: str, source_url: Optional[str]) -> str:
+    """Clean generated LinkedIn post text, apply company mentions, and append the source URL."""
+    # Strip any markdown formatting (LinkedIn doesn't support it)
+    post_text = strip_markdown_formatting(post_text)
+
+    # Replace pipe characters that cause LinkedIn truncation
+    post_text = sanitize_for_linkedin(post_text)
+
+    # Apply LinkedIn company mentions (converts company names to mention format)
+    post_text = apply_linkedin_mentions(post_text)
+
+    # Always add URL if provided and not already in post
+    if source_url and source_url not in post_text:
+        post_text = f"{post_text}\n\n{source_url}"
+        logger.info(f"Added source URL to LinkedIn post")
+
+    logger.info(f"LinkedIn post ({len(post_text)} chars)")
+    return post_text
+
+
+POST_PAIR_SCHEMA = types.Schema(
+    type="OBJECT",
+    properties={
+        "x_post": types.Schema(type="STRING"),
+        "linkedin_post": types.Schema(type="STRING"),
+    },
+    required=["x_post", "linkedin_post"]
+)
+
+
+def generate_x_and_linkedin_posts(
+    search_context: str,
+    refined_persona: str,
+    user_prompt: str,
+    source_url: Optional[str],
+    recent_topics: list,
+    max_retries: int = 3,
+    deadline: Optional[float] = None,
+    use_cache: bool = True
+) -> Tuple[str, str]:
+    """
+    Generate the X and LinkedIn posts for one topic in a single LLM call.
+
+    The model reasons about the topic once and writes both posts into one structured
+    response, instead of paying for two HIGH-thinking calls. The prompt reuses the
+    single-post writing rules, and an X post over the character budget is regenerated
+    alone. Post-processing matches generate_x_post and generate_linkedin_post.
+
+    Args:
+        search_context: Context from search results
+        refined_persona: The persona to write as
+        user_prompt: User's original creative direction
+        source_url: Source URL to include
+        recent_topics: List of recently covered topics to avoid
+        max_retries: Number of retry attempts before failing (default: 3)
+        deadline: Optional time.monotonic() deadline; no retry backoff is started past it
+        use_cache: Reuse (and store) the post text for identical inputs (default: True)
+
+    Returns:
+        Tuple of (x_post, linkedin_post)
+
+    Raises:
+        Exception: If all retries fail - caller should fall back to the per-platform functions
+    """
+    for attempt in range(max_retries):
+        if attempt > 0:
+            logger.info(f"Retry attempt {attempt + 1}/{max_retries} for combined post generation")
+            sleep_before_retry(backoff_delay(attempt), deadline)  # Jittered exponential backoff: ~2s, ~4s, ~8s
+
+        try:
+            x_text, linkedin_text = _generate_x_and_linkedin_post_texts(
+                search_context,
+                refined_persona,
+                user_prompt,
+                source_url,
+                recent_topics,
+                use_cache
+            )
+
+            return _finalize_x_post(x_text, source_url), _finalize_linkedin_post(linkedin_text, source_url)
+
+        except Exception as e:
+            logger.warning(f"Attempt {attempt + 1}/{max_retries} failed for combined post generation: {e}")
+            if attempt == max_retries - 1:
+                logger.error(f"All {max_retries} attempts failed for combined post generation", exc_info=True)
+                raise
+
+
+def _generate_x_and_linkedin_post_texts(
+    search_context: str,
+    refined_persona: str,
+    user_prompt: str,
+    source_url: Optional[str],
+    recent_topics: list,
+    use_cache: bool = True
+) -> Tuple[str, str]:
+    """Generate both post texts using one structured-output LLM call."""
+    cache_key = make_cache_key("x+linkedin", LLM_MODEL, search_context, refined_persona, user_prompt, source_url, recent_topics)
+    cached = _post_text_cache.get(cache_key) if use_cache else None
+    if cached is not None:
+        logger.info("X and LinkedIn post text served from cache")
+        return cached
+
+    max_text_length = _x_max_text_length(source_url)
+
+    avoidance_text = _build_avoidance_text(recent_topics)
+
+    prompt = f"""
+USER'S CREATIVE VISION: {user_prompt}
+This describes the IMAGE/VISUAL FORMAT that will accompany the posts.
+
+TOPIC CONTEXT (pick ONE specific concept to focus on):
+{search_context}
+
+YOUR TASK: Write TWO polished, publication-ready posts about the SAME single topic from the context above:
+an X/Twitter post ("x_post") and a PROFESSIONAL LINKEDIN POST ("linkedin_post").
+
+=== "x_post" ===
+{_x_post_instructions(refined_persona, max_text_length, avoidance_text)}
+
+=== "linkedin_post" ===
+{_linkedin_post_instructions(refined_persona, avoidance_text)}
+
+Respond in this exact JSON format:
+{{
+    "x_post": "The final X post text",
+    "linkedin_post": "The final LinkedIn post text"
+}}
 """
 
     response = client.models.generate_content(
         model=LLM_MODEL,
         contents=prompt,
         config=types.GenerateContentConfig(
-            temperature=0.7,
+            # One call has one temperature; the X post is the one tuned for a punchy, varied hook
+            temperature=X_POST_TEMPERATURE,
+            response_mime_type="application/json",
+            response_schema=POST_PAIR_SCHEMA,
             thinking_config=types.ThinkingConfig(
                 thinking_level="HIGH"
             )
         )
     )
 
-    return response.text.strip()
+    result = parse_json_response(response)
+    x_text, linkedin_text = ((result.get("x_post") or "").strip(), (result.get("linkedin_post") or "").strip())
+    if not (x_text and linkedin_text):
+        raise ValueError("Combined generation returned an empty post")
+
+    # The schema can't express the X limit, so an over-length X post is rewritten on its own
+    if len(x_text) > max_text_length:
+        logger.warning(f"Combined X post too long ({len(x_text)} > {max_text_length} chars), regenerating it alone")
+        x_text = _generate_x_post_text(search_context, refined_persona, user_prompt, source_url, recent_topics, use_cache)
+
+    texts = (x_text, linkedin_text)
+    if use_cache:
+        _post_text_cache.set(cache_key, texts)
+    return texts
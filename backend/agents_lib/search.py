@@ -1,13 +1,11 @@
 """Search and topic selection for content generation."""
-import json
-import time
 from typing import Tuple, Optional
 from concurrent.futures import ThreadPoolExecutor, TimeoutError as FuturesTimeoutError
 
 from google.genai import types
 
 from .config import client, LLM_MODEL
-from .utils import is_network_error
+from .utils import is_network_error, backoff_delay, parse_json_response, sleep_before_retry, RetryDeadlineExceeded
 from .url_utils import (
     resolve_redirect_url,
     clean_url_text,
@@ -20,16 +18,33 @@ from logger_config import agent_logger as logger
 # Safety limits
 MAX_SEARCH_CONTEXT_FOR_LLM = 50_000   # 50KB max for search context passed to LLM
 LLM_CALL_TIMEOUT = 300                  # seconds per LLM call (generous for thinking models)
+MAX_RECENT_TOPICS_FOR_LLM = 30          # most recent topics listed in the search avoidance block
+SINGLE_SOURCE_CONTEXT_CHARS = 2000      # focused context kept when topic selection is bypassed
+SELECTION_THINKING_LEVEL = "LOW"        # picking 1 of <=20 URLs is ranking, not generation
+
+
+# Shared workers for timed LLM calls. A per-call executor paid thread startup on every
+# call and its shutdown(wait=True) blocked on a hung call, defeating the timeout.
+# A call that times out after starting can't be interrupted: its worker stays busy until
+# the SDK call returns, so enough hung calls at once will queue later ones behind them.
+_LLM_EXECUTOR = ThreadPoolExecutor(max_workers=8, thread_name_prefix="llm-call")
+
+# Grounding redirects are independent HEAD/GET requests; resolve them side by side.
+_REDIRECT_EXECUTOR = ThreadPoolExecutor(max_workers=16, thread_name_prefix="resolve-redirect")
 
 
 def _llm_call_with_timeout(func, timeout=LLM_CALL_TIMEOUT):
     """Run an LLM call with a timeout to prevent infinite hangs."""
-    with ThreadPoolExecutor(max_workers=1) as executor:
-        future = executor.submit(func)
+    future = _LLM_EXECUTOR.submit(func)
+    try:
         return future.result(timeout=timeout)
+    except FuturesTimeoutError:
+        # Drops the call if it is still queued behind busy workers; a running call can't be stopped
+        future.cancel()
+        raise
 
 
-def search_trending_topics(user_prompt: str, refined_persona: str, recent_topics: list = None, max_search_retries: int = 3, validate_urls: bool = True) -> Tuple[str, list, Optional[str]]:
+def search_trending_topics(user_prompt: str, refined_persona: str, recent_topics: list = None, max_search_retries: int = 3, validate_urls: bool = True, deadline: Optional[float] = None) -> Tuple[str, list, Optional[str]]:
     """
     Search for relevant content that fits the user's creative vision.
     CRITICAL: Finds content that can be presented in the user's specified format,
@@ -43,6 +58,7 @@ def search_trending_topics(user_prompt: str, refined_persona: str, recent_topics
         recent_topics: List of specific topics covered in the last 2 weeks to avoid
         max_search_retries: Number of times to retry search if all URLs are 404 (default: 3)
         validate_urls: If True, validates URLs and fetches content (default: True)
+        deadline: Optional time.monotonic() deadline; no retry backoff is started past it
 
     Returns:
         Tuple of (search_context, urls_list, html_content) where:
@@ -50,18 +66,11 @@ def search_trending_topics(user_prompt: str, refined_persona: str, recent_topics
         - urls_list: List of source URLs (validated if validate_urls=True)
         - html_content: Raw HTML from the first valid URL (for additional context)
     """
-    # Retry loop for URL validation
-    for search_attempt in range(max_search_retries):
-        try:
-            if search_attempt > 0:
-                logger.info(f"Search retry attempt {search_attempt + 1}/{max_search_retries} - previous URLs were invalid")
-                time.sleep(2 ** search_attempt)  # Exponential backoff
-
-            # Build avoidance instruction if we have recent topics
-            avoidance_text = ""
-            if recent_topics:
-                topics_str = "\n- ".join(recent_topics)
-                avoidance_text = f"""
+    # Build avoidance instruction once (same for every retry), bounded to keep the prompt small
+    avoidance_text = ""
+    if recent_topics:
+        topics_str = "\n- ".join(recent_topics[:MAX_RECENT_TOPICS_FOR_LLM])
+        avoidance_text = f"""
 
 IMPORTANT: We've recently covered these specific topics, so explore DIFFERENT aspects or angles:
 - {topics_str}
@@ -69,6 +78,13 @@ IMPORTANT: We've recently covered these specific topics, so explore DIFFERENT as
 Look for new angles, different sub-topics, or emerging developments we haven't discussed yet.
 """
 
+    # Retry loop for URL validation
+    for search_attempt in range(max_search_retries):
+        try:
+            if search_attempt > 0:
+                logger.info(f"Search retry attempt {search_attempt + 1}/{max_search_retries} - previous URLs were invalid")
+                sleep_before_retry(backoff_delay(search_attempt), deadline)  # Jittered exponential backoff
+
             # Add retry context to get different results
             retry_context = ""
             if search_attempt > 0:
@@ -136,12 +152,12 @@ Provide:
                 if hasattr(candidate, 'grounding_metadata'):
                     metadata = candidate.grounding_metadata
                     if hasattr(metadata, 'grounding_chunks') and metadata.grounding_chunks:
-                        for chunk in metadata.grounding_chunks:
-                            if hasattr(chunk, 'web') and hasattr(chunk.web, 'uri'):
-                                redirect_url = chunk.web.uri
-                                # Resolve redirect to get actual URL
-                                actual_url = resolve_redirect_url(redirect_url)
-                                urls.append(actual_url)
+                        redirect_urls = [
+                            chunk.web.uri for chunk in metadata.grounding_chunks
+                            if hasattr(chunk, 'web') and hasattr(chunk.web, 'uri')
+                        ]
+                        # Resolve redirects to get actual URLs (concurrently; each is a blocking HTTP call)
+                        urls = list(_REDIRECT_EXECUTOR.map(resolve_redirect_url, redirect_urls))
                         logger.info(f"Extracted and resolved {len(urls)} URLs from search results")
 
             # Get response text, handling None case
@@ -167,14 +183,21 @@ Provide:
                 # No validation requested or no URLs found
                 return response_text, urls, None
 
+        except RetryDeadlineExceeded as e:
+            logger.error(f"Stopping search retries: {e}")
+            return f"General discussion about {user_prompt}", [], None
         except Exception as e:
             if is_network_error(e):
                 logger.warning(f"Network/QUIC error in search attempt {search_attempt + 1}: {e}")
                 if search_attempt < max_search_retries - 1:
                     # Exponential backoff for network errors
-                    wait_time = 2 ** search_attempt
-                    logger.info(f"Retrying after {wait_time}s backoff...")
-                    time.sleep(wait_time)
+                    wait_time = backoff_delay(search_attempt)
+                    logger.info(f"Retrying after {wait_time:.1f}s backoff...")
+                    try:
+                        sleep_before_retry(wait_time, deadline)
+                    except RetryDeadlineExceeded as deadline_error:
+                        logger.error(f"Stopping search retries: {deadline_error}")
+                        return f"General discussion about {user_prompt}", [], None
                     continue
                 else:
                     logger.error(f"All retries exhausted due to network errors: {e}")
@@ -187,7 +210,20 @@ Provide:
     return f"General discussion about {user_prompt}", [], None
 
 
-def select_single_topic(search_context: str, source_urls: list, user_prompt: str, recent_topics: list = None, max_selection_attempts: int = 3) -> Tuple[str, Optional[str], Optional[str]]:
+TOPIC_SELECTION_SCHEMA = types.Schema(
+    type="OBJECT",
+    properties={
+        "selected_topic": types.Schema(type="STRING"),
+        "focused_context": types.Schema(type="STRING"),
+        "selected_url_index": types.Schema(type="INTEGER", nullable=True),
+        "selected_url": types.Schema(type="STRING", nullable=True),
+        "reasoning": types.Schema(type="STRING"),
+    },
+    required=["selected_topic", "focused_context", "selected_url_index", "reasoning"]
+)
+
+
+def select_single_topic(search_context: str, source_urls: list, user_prompt: str, recent_topics: list = None, max_selection_attempts: int = 3, html_content: Optional[str] = None, bypass_llm_when_single: bool = True) -> Tuple[str, Optional[str], Optional[str]]:
     """
     Select ONE specific topic from search results to focus the post on.
     This prevents the post from mixing multiple concepts together.
@@ -198,6 +234,9 @@ def select_single_topic(search_context: str, source_urls: list, user_prompt: str
         user_prompt: User's campaign prompt for context
         recent_topics: Topics to avoid (recently covered)
         max_selection_attempts: Number of times to retry if URL is truly broken (404)
+        html_content: HTML already fetched for source_urls[0] by a validating search
+        bypass_llm_when_single: Skip the selection LLM call when the only candidate
+            URL was already validated (html_content given)
 
     Returns:
         Tuple of (focused_context, selected_url, html_content) where:
@@ -210,22 +249,27 @@ def select_single_topic(search_context: str, source_urls: list, user_prompt: str
         logger.warning(f"Truncating search_context from {len(search_context)} to {MAX_SEARCH_CONTEXT_FOR_LLM} chars")
         search_context = search_context[:MAX_SEARCH_CONTEXT_FOR_LLM] + "\n...[truncated]"
 
-    broken_urls = []  # Only track URLs that are actually broken (404, etc.)
+    # A single pre-validated source leaves nothing to choose between
+    if bypass_llm_when_single and html_content and len(source_urls) == 1:
+        logger.info("Single validated source URL - skipping topic selection LLM call")
+        return search_context[:SINGLE_SOURCE_CONTEXT_CHARS], source_urls[0], html_content
 
-    for attempt in range(max_selection_attempts):
-        try:
-            if attempt > 0:
-                logger.info(f"Topic selection retry {attempt + 1}/{max_selection_attempts} - previous URL was broken")
+    broken_urls = []  # Only track URLs that are actually broken (404, etc.)
 
-            avoidance_text = ""
-            if recent_topics:
-                topics_str = ", ".join(recent_topics[:5])
-                avoidance_text = f"""
+    avoidance_text = ""
+    if recent_topics:
+        topics_str = ", ".join(recent_topics[:5])
+        avoidance_text = f"""
 
 AVOID these recently covered topics - pick something DIFFERENT:
 - {topics_str}
 """
 
+    for attempt in range(max_selection_attempts):
+        try:
+            if attempt > 0:
+                logger.info(f"Topic selection retry {attempt + 1}/{max_selection_attempts} - previous URL was broken")
+
             # Filter out URLs that are actually broken
             available_urls = [url for url in source_urls if url not in broken_urls]
             if not available_urls:
@@ -239,18 +283,22 @@ AVOID these recently covered topics - pick something DIFFERENT:
             # Keep the prompt compact but include enough URLs to find the right match.
             max_urls_in_prompt = 20
             max_chars_in_prompt = 2500
-            urls_in_prompt = []
+            # Grounding often repeats a source, so dedupe (dict keeps order) before
+            # spending the prompt budget on it.
+            selected = {}
             current_chars = 0
             for url in urls_for_selection:
-                if len(urls_in_prompt) >= max_urls_in_prompt:
-                    break
+                if url in selected:
+                    continue
                 # +6 to account for numbering and formatting
-                if current_chars + len(url) + 6 > max_chars_in_prompt:
+                extra = len(url) + 6
+                if len(selected) >= max_urls_in_prompt or current_chars + extra > max_chars_in_prompt:
                     break
-                urls_in_prompt.append(url)
-                current_chars += len(url) + 6
+                selected[url] = None
+                current_chars += extra
+            urls_in_prompt = list(selected)
 
-            urls_text = "\n".join([f"{i}. {url}" for i, url in enumerate(urls_in_prompt, start=1)])
+            urls_text = "\n".join(f"{i}. {url}" for i, url in enumerate(urls_in_prompt, start=1))
 
             # Add context about broken URLs if we're retrying
             broken_text = ""
@@ -305,8 +353,9 @@ RESPOND IN THIS EXACT JSON FORMAT:
                         config=types.GenerateContentConfig(
                             temperature=_select_temp,  # Slightly increase temp on retries
                             response_mime_type="application/json",
+                            response_schema=TOPIC_SELECTION_SCHEMA,
                             thinking_config=types.ThinkingConfig(
-                                thinking_level="HIGH"
+                                thinking_level=SELECTION_THINKING_LEVEL
                             )
                         )
                     )
@@ -317,7 +366,7 @@ RESPOND IN THIS EXACT JSON FORMAT:
                     continue
                 return search_context, None, None
 
-            result = json.loads(response.text)
+            result = parse_json_response(response)
 
             selected_topic = result.get("selected_topic", "")
             focused_context = result.get("focused_context", search_context)
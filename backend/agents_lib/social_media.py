@@ -3,14 +3,33 @@ import os
 from typing import Optional
 from io import BytesIO
 import tweepy
+import orjson
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 
 from database import get_oauth_tokens
 from logger_config import agent_logger as logger
 from agents_lib.utils import sanitize_for_linkedin
+from agents_lib.cache import TTLCache, make_cache_key
 
+# Shared keep-alive connections to api.linkedin.com and the image upload host, so a post
+# doesn't pay a fresh TCP+TLS handshake per hop. Retry's default allowed_methods excludes
+# POST, so transient errors never re-send a post creation.
+_LINKEDIN_SESSION = requests.Session()
+_LINKEDIN_SESSION.mount("https://", HTTPAdapter(
+    pool_connections=50,
+    pool_maxsize=50,
+    max_retries=Retry(total=3, backoff_factor=0.3, status_forcelist=[429, 500, 502, 503, 504]),
+))
 
-def post_to_twitter(user_id: int, post_text: str, image_bytes: Optional[bytes] = None) -> bool:
+# A token's LinkedIn member never changes, so repeat posts skip the /userinfo hop.
+# Keyed by a hash of the Authorization header, never the raw token.
+_author_urn_cache = TTLCache(maxsize=256, ttl=24 * 3600)
+
+
+def post_to_twitter(user_id: int, post_text: str, image_bytes: Optional[bytes] = None,
+                    tokens: Optional[dict] = None) -> bool:
     """
     Post to Twitter/X with optional image using OAuth 1.0a.
 
@@ -18,12 +37,14 @@ def post_to_twitter(user_id: int, post_text: str, image_bytes: Optional[bytes] =
         user_id: The user's ID in the database
         post_text: The text content of the tweet
         image_bytes: Optional image bytes to attach
+        tokens: OAuth tokens already loaded by the caller (looked up when omitted)
 
     Returns:
         True if successful, False otherwise
     """
     try:
-        tokens = get_oauth_tokens(user_id, "twitter")
+        if tokens is None:
+            tokens = get_oauth_tokens(user_id, "twitter")
         if not tokens:
             logger.warning(f"No Twitter tokens found for user {user_id}")
             return False
@@ -102,7 +123,8 @@ def _upload_twitter_media(
         return None
 
 
-def post_to_linkedin(user_id: int, post_text: str, image_bytes: Optional[bytes] = None) -> bool:
+def post_to_linkedin(user_id: int, post_text: str, image_bytes: Optional[bytes] = None,
+                     tokens: Optional[dict] = None) -> bool:
     """
     Post to LinkedIn with optional image using the new Posts API.
 
@@ -112,12 +134,14 @@ def post_to_linkedin(user_id: int, post_text: str, image_bytes: Optional[bytes]
         user_id: The user's ID in the database
         post_text: The text content of the post
         image_bytes: Optional image bytes to attach
+        tokens: OAuth tokens already loaded by the caller (looked up when omitted)
 
     Returns:
         True if successful, False otherwise
     """
     try:
-        tokens = get_oauth_tokens(user_id, "linkedin")
+        if tokens is None:
+            tokens = get_oauth_tokens(user_id, "linkedin")
         if not tokens:
             logger.warning(f"No LinkedIn tokens found for user {user_id}")
             return False
@@ -129,7 +153,7 @@ def post_to_linkedin(user_id: int, post_text: str, image_bytes: Optional[bytes]
         }
 
         # Get user URN
-        author_urn = _get_linkedin_author_urn(headers)
+        author_urn = get_linkedin_author_urn(headers)
         if not author_urn:
             return False
 
@@ -154,10 +178,10 @@ def post_to_linkedin(user_id: int, post_text: str, image_bytes: Optional[bytes]
             "X-Restli-Protocol-Version": "2.0.0"
         }
 
-        response = requests.post(
+        response = _LINKEDIN_SESSION.post(
             "https://api.linkedin.com/rest/posts",
             headers=post_headers,
-            json=post_data
+            data=orjson.dumps(post_data)
         )
 
         if not response.ok:
@@ -176,7 +200,7 @@ def post_to_linkedin(user_id: int, post_text: str, image_bytes: Optional[bytes]
         return False
 
 
-def _get_linkedin_author_urn(headers: dict) -> Optional[str]:
+def get_linkedin_author_urn(headers: dict) -> Optional[str]:
     """
     Get the LinkedIn author URN for the authenticated user.
 
@@ -186,14 +210,21 @@ def _get_linkedin_author_urn(headers: dict) -> Optional[str]:
     Returns:
         Author URN string or None if failed
     """
+    cache_key = make_cache_key(headers.get("Authorization"))
+    author_urn = _author_urn_cache.get(cache_key)
+    if author_urn:
+        return author_urn
+
     try:
-        user_response = requests.get(
+        user_response = _LINKEDIN_SESSION.get(
             "https://api.linkedin.com/v2/userinfo",
             headers=headers
         )
         user_response.raise_for_status()
         person_id = user_response.json()["sub"]
-        return f"urn:li:person:{person_id}"
+        author_urn = f"urn:li:person:{person_id}"
+        _author_urn_cache.set(cache_key, author_urn)
+        return author_urn
     except Exception as e:
         logger.error(f"Error getting LinkedIn author URN: {e}")
         return None
@@ -228,10 +259,10 @@ def _upload_linkedin_image(
             "X-Restli-Protocol-Version": "2.0.0"
         }
 
-        init_response = requests.post(
+        init_response = _LINKEDIN_SESSION.post(
             "https://api.linkedin.com/rest/images?action=initializeUpload",
             headers=init_headers,
-            json={"initializeUploadRequest": {"owner": author_urn}}
+            data=orjson.dumps({"initializeUploadRequest": {"owner": author_urn}})
         )
         init_response.raise_for_status()
         init_data = init_response.json()
@@ -240,7 +271,7 @@ def _upload_linkedin_image(
         image_urn = init_data["value"]["image"]
 
         # Step 2: Upload the image binary
-        upload_response = requests.put(
+        upload_response = _LINKEDIN_SESSION.put(
             upload_url,
             headers={"Content-Type": "image/png"},
             data=image_bytes
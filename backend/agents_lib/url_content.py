@@ -1,63 +1,71 @@
 """URL content generation - generate posts from a given URL."""
-import json
-import re as regex_module
-import base64
-import threading
+import asyncio
+import orjson
+import pybase64
 import time
-from typing import Dict, Any, Optional
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Any, Optional, Tuple
 
-from .url_utils import validate_url, extract_html_title
+from .url_utils import validate_url, extract_title_and_text
 from .post_generator import generate_x_post, generate_linkedin_post
 from .content_generator import generate_image
 from .social_media import post_to_twitter, post_to_linkedin
 from .content_filter import validate_post_content
-from database import get_campaign, get_oauth_tokens, save_post_history
+from database import get_campaign_cached, get_oauth_tokens, save_post_history_batch
 from logger_config import agent_logger as logger
 
 
-class _KeepaliveTask:
-    """
-    Run a blocking function with keepalive events for SSE streaming.
+_KEEPALIVE_INTERVAL = 15  # seconds between SSE keepalives while work is pending
 
-    Usage:
-        task = _KeepaliveTask(lambda: slow_function(), "Processing")
-        for keepalive in task.run():
-            yield keepalive
-        result = task.result
-    """
-    def __init__(self, func, step_name: str, keepalive_interval: int = 15):
-        self.func = func
-        self.step_name = step_name
-        self.keepalive_interval = keepalive_interval
-        self.result = None
-        self._error = None
+# Steps of generate_from_url_stream
+_STREAM_STEP_NAMES = {
+    "fetch": "Fetching URL",
+    "x": "Generating X post",
+    "linkedin": "Generating LinkedIn post",
+    "image": "Generating image",
+}
+_STREAM_ERROR_STATUS = {"x": "x_post_error", "linkedin": "linkedin_post_error", "image": "image_error"}
 
-    def run(self):
-        done = threading.Event()
 
-        def worker():
-            try:
-                self.result = self.func()
-            except Exception as e:
-                self._error = e
-            finally:
-                done.set()
+# Shared workers for the URL flow; a streaming request runs up to three steps at once.
+_GEN_POOL = ThreadPoolExecutor(max_workers=16, thread_name_prefix="urlgen")
 
-        thread = threading.Thread(target=worker)
-        thread.start()
 
-        keepalive_count = 0
-        while not done.wait(timeout=self.keepalive_interval):
-            keepalive_count += 1
-            yield json.dumps({
+def _submit(fn, *args, **kwargs) -> asyncio.Future:
+    """Run a blocking step on _GEN_POOL and return an awaitable future for it."""
+    return asyncio.wrap_future(_GEN_POOL.submit(fn, *args, **kwargs))
+
+
+async def _with_keepalives(pending: Dict[asyncio.Future, str], interval: float = _KEEPALIVE_INTERVAL):
+    """
+    Await `pending` (future -> step key) for SSE streaming.
+
+    Yields a keepalive JSON string every `interval` seconds while any step is still
+    running, and a (step_key, future) tuple as each step completes. Futures added to
+    `pending` while iterating are waited on too. The event loop is free between
+    keepalives; only the _GEN_POOL workers block.
+
+    Usage:
+        async for item in _with_keepalives({_submit(slow_function): "fetch"}):
+            if isinstance(item, str):
+                yield item
+                continue
+            step_key, future = item
+    """
+    started_at = time.time()
+    while pending:
+        done, _ = await asyncio.wait(pending, timeout=interval, return_when=asyncio.FIRST_COMPLETED)
+        if not done:
+            step = ", ".join(_STREAM_STEP_NAMES[key] for key in pending.values())
+            yield orjson.dumps({
                 "status": "keepalive",
-                "step": self.step_name,
-                "message": f"{self.step_name}... ({keepalive_count * self.keepalive_interval}s)",
+                "step": step,
+                "message": f"{step}... ({int(time.time() - started_at)}s)",
                 "timestamp": time.time()
-            })
-
-        if self._error:
-            raise self._error
+            }).decode()
+            continue
+        for future in done:
+            yield pending.pop(future), future
 
 
 def generate_from_url(user_id: int, url: str) -> Dict[str, Any]:
@@ -103,23 +111,16 @@ def generate_from_url(user_id: int, url: str) -> Dict[str, Any]:
 
         result["source_url"] = final_url
 
-        # Extract a summary from the HTML content for context
-        # Use the page title and some body text
-        title = extract_html_title(html_content)
-
-        # Strip HTML tags to get plain text (basic extraction)
-        body_text = regex_module.sub(r'<script[^>]*>.*?</script>', '', html_content, flags=regex_module.DOTALL | regex_module.IGNORECASE)
-        body_text = regex_module.sub(r'<style[^>]*>.*?</style>', '', body_text, flags=regex_module.DOTALL | regex_module.IGNORECASE)
-        body_text = regex_module.sub(r'<[^>]+>', ' ', body_text)
-        body_text = regex_module.sub(r'\s+', ' ', body_text).strip()
-        body_text = body_text[:3000]  # Limit to prevent token overflow
+        # Extract a summary from the HTML content for context: the page title
+        # and plain body text, limited to prevent token overflow
+        title, body_text = extract_title_and_text(html_content, limit=3000)
 
         search_context = f"Title: {title}\n\nContent Summary:\n{body_text}\n\nSource URL: {final_url}"
         logger.info(f"Extracted context: {search_context[:200]}...")
 
         # Step 2: Get campaign config or use defaults
         logger.info("[2/5] Getting persona and style settings...")
-        campaign = get_campaign(user_id)
+        campaign = get_campaign_cached(user_id)
 
         if campaign and campaign.get("refined_persona"):
             refined_persona = campaign["refined_persona"]
@@ -141,7 +142,8 @@ def generate_from_url(user_id: int, url: str) -> Dict[str, Any]:
                 refined_persona=refined_persona,
                 user_prompt=user_prompt,
                 source_url=final_url,
-                recent_topics=[]
+                recent_topics=[],
+                use_cache=False
             )
             result["x_post"] = x_post
             logger.info(f"X post generated ({len(x_post)} chars)")
@@ -156,7 +158,8 @@ def generate_from_url(user_id: int, url: str) -> Dict[str, Any]:
                 refined_persona=refined_persona,
                 user_prompt=user_prompt,
                 source_url=final_url,
-                recent_topics=[]
+                recent_topics=[],
+                use_cache=False
             )
             result["linkedin_post"] = linkedin_post
             logger.info(f"LinkedIn post generated ({len(linkedin_post)} chars)")
@@ -175,7 +178,7 @@ def generate_from_url(user_id: int, url: str) -> Dict[str, Any]:
                     topic_context=search_context[:1000]  # Limit context for image
                 )
                 if image_bytes:
-                    result["image_base64"] = base64.b64encode(image_bytes).decode('utf-8')
+                    result["image_base64"] = pybase64.b64encode_as_string(image_bytes)
                     logger.info(f"Image generated ({len(image_bytes)} bytes)")
                 else:
                     logger.warning("Image generation returned None")
@@ -197,12 +200,13 @@ def generate_from_url(user_id: int, url: str) -> Dict[str, Any]:
         return result
 
 
-def generate_from_url_stream(user_id: int, url: str):
+async def generate_from_url_stream(user_id: int, url: str):
     """
     Stream social media post generation from a URL with progress updates.
 
-    Yields JSON strings with status updates and generated content.
-    This avoids timeout issues by streaming progress as content is generated.
+    Async generator yielding JSON strings with status updates and generated content.
+    This avoids timeout issues by streaming progress as content is generated, and
+    blocking work runs on _GEN_POOL so an idle stream doesn't hold a server thread.
 
     Args:
         user_id: The user ID (for campaign config lookup)
@@ -218,37 +222,29 @@ def generate_from_url_stream(user_id: int, url: str):
         logger.info("=" * 60)
 
         # Step 1: Validate and fetch URL content with keepalives
-        yield json.dumps({"status": "fetching", "message": "Fetching URL content..."})
+        yield orjson.dumps({"status": "fetching", "message": "Fetching URL content..."}).decode()
 
-        fetch_task = _KeepaliveTask(
-            lambda: validate_url(url, fetch_content=True),
-            "Fetching URL"
-        )
-        for keepalive in fetch_task.run():
-            yield keepalive
-        is_valid, html_content, status_code, final_url = fetch_task.result
+        fetch_future = _submit(validate_url, url, fetch_content=True)
+        async for item in _with_keepalives({fetch_future: "fetch"}):
+            if isinstance(item, str):
+                yield item
+        is_valid, html_content, status_code, final_url = fetch_future.result()
 
         if not is_valid:
             error_msg = f"Could not fetch content from URL (status: {status_code})"
             logger.warning(error_msg)
-            yield json.dumps({"status": "error", "error": error_msg})
+            yield orjson.dumps({"status": "error", "error": error_msg}).decode()
             return
 
         # Extract title and content
-        title = extract_html_title(html_content)
-
-        body_text = regex_module.sub(r'<script[^>]*>.*?</script>', '', html_content, flags=regex_module.DOTALL | regex_module.IGNORECASE)
-        body_text = regex_module.sub(r'<style[^>]*>.*?</style>', '', body_text, flags=regex_module.DOTALL | regex_module.IGNORECASE)
-        body_text = regex_module.sub(r'<[^>]+>', ' ', body_text)
-        body_text = regex_module.sub(r'\s+', ' ', body_text).strip()
-        body_text = body_text[:3000]
+        title, body_text = extract_title_and_text(html_content, limit=3000)
 
         search_context = f"Title: {title}\n\nContent Summary:\n{body_text}\n\nSource URL: {final_url}"
 
-        yield json.dumps({"status": "content", "title": title, "source_url": final_url})
+        yield orjson.dumps({"status": "content", "title": title, "source_url": final_url}).decode()
 
         # Step 2: Get campaign config or use defaults
-        campaign = get_campaign(user_id)
+        campaign = await _submit(get_campaign_cached, user_id)
 
         if campaign and campaign.get("refined_persona"):
             refined_persona = campaign["refined_persona"]
@@ -259,84 +255,71 @@ def generate_from_url_stream(user_id: int, url: str):
             visual_style = "Clean, modern digital illustration style. Professional and eye-catching visuals that complement the content."
             user_prompt = "Create engaging social media content about this topic"
 
-        # Step 3: Generate X/Twitter post with keepalives
-        yield json.dumps({"status": "generating_x", "message": "Generating X post..."})
-
+        # Steps 3-5: Generate both posts concurrently; the image starts as soon as
+        # either post is ready instead of waiting for both.
+        yield orjson.dumps({"status": "generating_x", "message": "Generating X post..."}).decode()
+        yield orjson.dumps({"status": "generating_linkedin", "message": "Generating LinkedIn post..."}).decode()
+
+        post_kwargs = dict(
+            search_context=search_context,
+            refined_persona=refined_persona,
+            user_prompt=user_prompt,
+            source_url=final_url,
+            recent_topics=[],
+            # "Generate" on the same URL again should give a new take, not the cached one
+            use_cache=False
+        )
+        pending = {
+            _submit(generate_x_post, **post_kwargs): "x",
+            _submit(generate_linkedin_post, **post_kwargs): "linkedin",
+        }
         x_post = None
-        try:
-            x_task = _KeepaliveTask(
-                lambda: generate_x_post(
-                    search_context=search_context,
-                    refined_persona=refined_persona,
-                    user_prompt=user_prompt,
-                    source_url=final_url,
-                    recent_topics=[]
-                ),
-                "Generating X post"
-            )
-            for keepalive in x_task.run():
-                yield keepalive
-            x_post, _ = x_task.result
-            yield json.dumps({"status": "x_post", "x_post": x_post})
-            logger.info(f"X post generated ({len(x_post)} chars)")
-        except Exception as e:
-            logger.error(f"Failed to generate X post: {e}")
-            yield json.dumps({"status": "x_post_error", "error": str(e)})
-
-        # Step 4: Generate LinkedIn post with keepalives
-        yield json.dumps({"status": "generating_linkedin", "message": "Generating LinkedIn post..."})
-
         linkedin_post = None
-        try:
-            linkedin_task = _KeepaliveTask(
-                lambda: generate_linkedin_post(
-                    search_context=search_context,
-                    refined_persona=refined_persona,
-                    user_prompt=user_prompt,
-                    source_url=final_url,
-                    recent_topics=[]
-                ),
-                "Generating LinkedIn post"
-            )
-            for keepalive in linkedin_task.run():
-                yield keepalive
-            linkedin_post = linkedin_task.result
-            yield json.dumps({"status": "linkedin_post", "linkedin_post": linkedin_post})
-            logger.info(f"LinkedIn post generated ({len(linkedin_post)} chars)")
-        except Exception as e:
-            logger.error(f"Failed to generate LinkedIn post: {e}")
-            yield json.dumps({"status": "linkedin_post_error", "error": str(e)})
+        image_started = False
 
-        # Step 5: Generate image with keepalives
-        yield json.dumps({"status": "generating_image", "message": "Generating image..."})
+        async for item in _with_keepalives(pending):
+            if isinstance(item, str):
+                yield item
+                continue
+
+            kind, future = item
+            try:
+                value = future.result()
+            except Exception as e:
+                logger.error(f"{_STREAM_STEP_NAMES[kind]} failed: {e}")
+                yield orjson.dumps({"status": _STREAM_ERROR_STATUS[kind], "error": str(e)}).decode()
+                continue
+
+            if kind == "x":
+                x_post, _ = value
+                yield orjson.dumps({"status": "x_post", "x_post": x_post}).decode()
+                logger.info(f"X post generated ({len(x_post)} chars)")
+            elif kind == "linkedin":
+                linkedin_post = value
+                yield orjson.dumps({"status": "linkedin_post", "linkedin_post": linkedin_post}).decode()
+                logger.info(f"LinkedIn post generated ({len(linkedin_post)} chars)")
+            elif value:
+                image_b64 = pybase64.b64encode_as_string(value)
+                yield orjson.dumps({"status": "image", "image_base64": image_b64}).decode()
+                logger.info(f"Image generated ({len(value)} bytes)")
+            else:
+                yield orjson.dumps({"status": "image_error", "error": "Image generation returned None"}).decode()
 
-        try:
             image_context_post = x_post or linkedin_post
-            if image_context_post:
-                image_task = _KeepaliveTask(
-                    lambda: generate_image(
-                        post_text=image_context_post,
-                        visual_style=visual_style,
-                        user_prompt=user_prompt,
-                        topic_context=search_context[:1000]
-                    ),
-                    "Generating image"
+            if image_context_post and not image_started:
+                image_started = True
+                yield orjson.dumps({"status": "generating_image", "message": "Generating image..."}).decode()
+                image_future = _submit(
+                    generate_image,
+                    post_text=image_context_post,
+                    visual_style=visual_style,
+                    user_prompt=user_prompt,
+                    topic_context=search_context[:1000]
                 )
-                for keepalive in image_task.run():
-                    yield keepalive
-                image_bytes = image_task.result
-                if image_bytes:
-                    image_b64 = base64.b64encode(image_bytes).decode('utf-8')
-                    yield json.dumps({"status": "image", "image_base64": image_b64})
-                    logger.info(f"Image generated ({len(image_bytes)} bytes)")
-                else:
-                    yield json.dumps({"status": "image_error", "error": "Image generation returned None"})
-        except Exception as e:
-            logger.error(f"Failed to generate image: {e}")
-            yield json.dumps({"status": "image_error", "error": str(e)})
+                pending[image_future] = "image"
 
         # Complete
-        yield json.dumps({"status": "complete", "source_url": final_url})
+        yield orjson.dumps({"status": "complete", "source_url": final_url}).decode()
 
         logger.info("=" * 60)
         logger.info("[STREAMING] Generation complete")
@@ -344,7 +327,7 @@ def generate_from_url_stream(user_id: int, url: str):
 
     except Exception as e:
         logger.error(f"Error in generate_from_url_stream: {e}", exc_info=True)
-        yield json.dumps({"status": "error", "error": str(e)})
+        yield orjson.dumps({"status": "error", "error": str(e)}).decode()
 
 
 def post_url_content(user_id: int, x_post: Optional[str], linkedin_post: Optional[str],
@@ -368,59 +351,67 @@ def post_url_content(user_id: int, x_post: Optional[str], linkedin_post: Optiona
     }
 
     # Load user's exclude_companies list from campaign config
-    from database import get_campaign as _get_campaign
-    _campaign = _get_campaign(user_id)
-    exclude_companies = _campaign.get("exclude_companies", []) if _campaign else []
+    campaign = get_campaign_cached(user_id)
+    exclude_companies = campaign.get("exclude_companies", []) if campaign else []
 
     # Decode image if provided
     image_bytes = None
     if image_base64:
         try:
-            image_bytes = base64.b64decode(image_base64)
+            image_bytes = pybase64.b64decode(image_base64, validate=False)
         except Exception as e:
             logger.error(f"Failed to decode image: {e}")
 
-    # Post to Twitter
+    # The platforms are independent multi-request flows, so post to them concurrently
+    tasks = []
     if 'twitter' in platforms and x_post:
-        try:
-            # Validate post content (competitor filtering)
-            is_safe, block_reason = validate_post_content(x_post, exclude_companies, "twitter")
-            if not is_safe:
-                result["errors"]["twitter"] = f"Blocked: {block_reason}"
-            elif not get_oauth_tokens(user_id, "twitter"):
-                result["errors"]["twitter"] = "Not connected to Twitter"
-            else:
-                success = post_to_twitter(user_id, x_post, image_bytes)
-                if success:
-                    result["posted"].append("twitter")
-                    # Extract simple topic for history
-                    topics = [x_post[:50].split('\n')[0]]
-                    save_post_history(user_id, x_post, topics, ["twitter"])
-                else:
-                    result["errors"]["twitter"] = "Failed to post"
-        except Exception as e:
-            logger.error(f"Error posting to Twitter: {e}")
-            result["errors"]["twitter"] = str(e)
-
-    # Post to LinkedIn
+        tasks.append(("twitter", x_post, post_to_twitter))
     if 'linkedin' in platforms and linkedin_post:
-        try:
-            # Validate post content (competitor filtering)
-            is_safe, block_reason = validate_post_content(linkedin_post, exclude_companies, "linkedin")
-            if not is_safe:
-                result["errors"]["linkedin"] = f"Blocked: {block_reason}"
-            elif not get_oauth_tokens(user_id, "linkedin"):
-                result["errors"]["linkedin"] = "Not connected to LinkedIn"
-            else:
-                success = post_to_linkedin(user_id, linkedin_post, image_bytes)
-                if success:
-                    result["posted"].append("linkedin")
-                    topics = [linkedin_post[:50].split('\n')[0]]
-                    save_post_history(user_id, linkedin_post, topics, ["linkedin"])
-                else:
-                    result["errors"]["linkedin"] = "Failed to post"
-        except Exception as e:
-            logger.error(f"Error posting to LinkedIn: {e}")
-            result["errors"]["linkedin"] = str(e)
+        tasks.append(("linkedin", linkedin_post, post_to_linkedin))
+
+    futures = [
+        (platform, _GEN_POOL.submit(_post_to_platform, user_id, platform, post_text, post_fn,
+                                    image_bytes, exclude_companies))
+        for platform, post_text, post_fn in tasks
+    ]
+    history_rows = []
+    for platform, future in futures:
+        error, history_row = future.result()
+        if error:
+            result["errors"][platform] = error
+        else:
+            result["posted"].append(platform)
+            history_rows.append(history_row)
+
+    # One write for every platform that posted; a history failure doesn't undo the posts
+    try:
+        save_post_history_batch(user_id, history_rows)
+    except Exception as e:
+        logger.error(f"Error saving post history: {e}")
 
     return result
+
+
+_PLATFORM_NAMES = {"twitter": "Twitter", "linkedin": "LinkedIn"}
+
+
+def _post_to_platform(user_id: int, platform: str, post_text: str, post_fn,
+                      image_bytes: Optional[bytes], exclude_companies: list) -> Tuple[Optional[str], Optional[tuple]]:
+    """Validate and publish one post. Returns (error message, None) or (None, history row) on success."""
+    name = _PLATFORM_NAMES[platform]
+    try:
+        # Validate post content (competitor filtering)
+        is_safe, block_reason = validate_post_content(post_text, exclude_companies, platform)
+        if not is_safe:
+            return f"Blocked: {block_reason}", None
+        tokens = get_oauth_tokens(user_id, platform)
+        if not tokens:
+            return f"Not connected to {name}", None
+        if not post_fn(user_id, post_text, image_bytes, tokens=tokens):
+            return "Failed to post", None
+        # Extract simple topic for history
+        topics = [post_text[:50].split('\n')[0]]
+        return None, (post_text, topics, [platform])
+    except Exception as e:
+        logger.error(f"Error posting to {name}: {e}")
+        return str(e), None
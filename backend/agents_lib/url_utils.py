@@ -1,16 +1,126 @@
 """URL validation, redirect resolution, and utility functions."""
 import re
+import codecs
 import html
+from concurrent.futures import ThreadPoolExecutor
 from typing import Optional, Tuple
-from urllib.parse import urlparse
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+from selectolax.lexbor import LexborHTMLParser
 
 from .config import TOPIC_STOPWORDS
+from .cache import TTLCache
 from logger_config import agent_logger as logger
 
 # Maximum HTML content size to fetch (100KB) - prevents memory/LLM issues with massive pages
 MAX_HTML_CONTENT_SIZE = 100_000
 
+# Candidates advertising a bigger body than this (PDFs, media) are skipped at the HEAD check
+MAX_CANDIDATE_CONTENT_LENGTH = 2_000_000
+
+# is_soft_404 only scans this many leading characters: error phrases live in the <title>,
+# meta tags and hero markup, not deep in a long article body
+SOFT_404_SCAN_CHARS = 32_768
+
+# Hard byte ceiling on a page download. Reading normally stops once MAX_HTML_CONTENT_SIZE
+# characters are decoded; this bounds pages of mostly multi-byte text
+MAX_HTML_FETCH_BYTES = 512 * 1024
+
+# One keep-alive pool for redirect resolution and page validation, so candidates on the
+# same host reuse a socket instead of paying a TCP+TLS handshake each. raise_on_status=False
+# hands the final 5xx back to the caller as a normal (invalid) response. Read timeouts are
+# never retried and connect failures only once, so a request stays close to its own timeout
+# and can't blow through the search/agent deadlines.
+_HTTP_SESSION = requests.Session()
+_HTTP_SESSION.headers.update({
+    'User-Agent': 'Mozilla/5.0 (compatible; Vibecaster/1.0; +https://vibecaster.app)',
+    'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,*/*;q=0.8',
+})
+_HTTP_ADAPTER = HTTPAdapter(
+    pool_connections=32,
+    pool_maxsize=64,
+    max_retries=Retry(total=2, connect=1, read=0, status=2, backoff_factor=0.2,
+                      status_forcelist=[429, 502, 503, 504], raise_on_status=False),
+)
+_HTTP_SESSION.mount("https://", _HTTP_ADAPTER)
+_HTTP_SESSION.mount("http://", _HTTP_ADAPTER)
+
+# Candidate URLs are independent fetches; validate them side by side instead of one
+# 15s timeout after another.
+_VALIDATE_EXECUTOR = ThreadPoolExecutor(max_workers=8, thread_name_prefix="validate-url")
+
+# Grounding results repeat the same links within and across cycles. Redirect targets are
+# stable; validation results are kept briefly, and definitive 404/410s for less time still.
+# Timeouts, connection errors and 5xx are never cached, so retries still hit the network.
+_redirect_cache = TTLCache(maxsize=2048, ttl=1800)
+_validation_cache = TTLCache(maxsize=256, ttl=600)
+NEGATIVE_VALIDATION_TTL = 300
+
+# Patterns used on every validated page / selected topic, compiled once
+_TITLE_RE = re.compile(r"<title[^>]*>(.*?)</title>", re.IGNORECASE | re.DOTALL)
+_WHITESPACE_RE = re.compile(r"\s+")
+_TOPIC_TOKEN_RE = re.compile(r"[A-Za-z0-9][A-Za-z0-9\\-]{2,}")
+
+# Vertex AI Search grounding redirectors: HEAD always returns the redirect chain
+_HEAD_ONLY_REDIRECT_HOSTS = frozenset({"vertexaisearch.cloud.google.com"})
+
+_YOUTUBE_HOSTS = frozenset({"youtube.com", "www.youtube.com", "m.youtube.com", "youtu.be"})
+
+# Whitespace, quotes and trailing punctuation LLMs wrap around URLs, stripped in one pass
+_URL_STRIP_CHARS = ' \t\n\r\f\v"\'().,;'
+_NULL_URL_TEXT = frozenset({"", "null", "none"})
+
+# Common soft 404 indicators in page content
+_SOFT_404_PATTERNS = (
+    # Generic 404 phrases
+    'page not found',
+    'page could not be found',
+    'page doesn\'t exist',
+    'page does not exist',
+    'not found</title>',
+    '404</title>',
+    'error 404',
+    '404 error',
+    # Elastic-specific patterns
+    'this page doesn\'t exist',
+    'we couldn\'t find',
+    'the page you\'re looking for',
+    'this content has moved',
+    'content not available',
+    'something\'s amiss',
+    'hmmm… something\'s amiss',
+    'we\'re really good at search but can\'t seem to find',
+    # Common CMS 404 patterns
+    'oops! that page',
+    'sorry, we can\'t find',
+    'nothing found',
+    'no results found',
+    # Meta indicators
+    '<meta name="robots" content="noindex',
+)
+
+# Markers that a short page still carries real article content
+_ARTICLE_MARKERS = (
+    '<article', 'class="article', 'class="post', 'class="content',
+    'class="blog', '<main', 'class="documentation',
+)
+
+# One alternation per list, so each check is a single pass over the page instead of one per pattern
+_SOFT_404_RE = re.compile("|".join(map(re.escape, _SOFT_404_PATTERNS)))
+_ARTICLE_MARKER_RE = re.compile("|".join(map(re.escape, _ARTICLE_MARKERS)))
+
+
+def _url_host(url: str) -> str:
+    """Lowercased hostname of a URL via string ops ("" if there is none); cheaper than urlparse."""
+    start = url.find("//")
+    if start < 0:
+        return ""
+    netloc = url[start + 2:]
+    for sep in "/?#":
+        netloc = netloc.partition(sep)[0]
+    return netloc.rpartition("@")[2].partition(":")[0].lower()
+
 
 def resolve_redirect_url(url: str) -> str:
     """
@@ -23,27 +133,36 @@ def resolve_redirect_url(url: str) -> str:
     Returns:
         The final destination URL after following all redirects
     """
-    headers = {
-        'User-Agent': 'Mozilla/5.0 (compatible; Vibecaster/1.0; +https://vibecaster.app)',
-        'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,*/*;q=0.8',
-    }
+    cached = _redirect_cache.get(url)
+    if cached is not None:
+        return cached
 
     # HEAD is cheapest, but some redirectors (and some CDNs) don't support it well.
+    # Grounding redirectors answer HEAD reliably, so they never pay for a GET retry.
+    head_only = _url_host(url) in _HEAD_ONLY_REDIRECT_HOSTS
     try:
-        response = requests.head(url, allow_redirects=True, timeout=10, headers=headers)
+        response = _HTTP_SESSION.head(url, allow_redirects=True, timeout=10)
         if response.url and response.url != url:
             logger.info(f"Resolved redirect (HEAD): {url[:60]}... -> {response.url}")
+            _redirect_cache.set(url, response.url)
             return response.url
+        if head_only:
+            logger.warning(f"Grounding redirect did not resolve (status {response.status_code}): {url[:60]}...")
+            return url
     except Exception as e:
+        if head_only:
+            logger.warning(f"Could not resolve redirect for {url[:60]}...: {e}")
+            return url
         logger.debug(f"HEAD redirect resolution failed for {url[:60]}...: {e}")
 
     # Fallback: GET with streaming (do not download full body).
     try:
-        response = requests.get(url, allow_redirects=True, timeout=10, headers=headers, stream=True)
+        response = _HTTP_SESSION.get(url, allow_redirects=True, timeout=10, stream=True)
         final_url = response.url or url
         response.close()
         if final_url != url:
             logger.info(f"Resolved redirect (GET): {url[:60]}... -> {final_url}")
+        _redirect_cache.set(url, final_url)
         return final_url
     except Exception as e:
         logger.warning(f"Could not resolve redirect for {url[:60]}...: {e}")
@@ -54,35 +173,64 @@ def clean_url_text(url: Optional[str]) -> Optional[str]:
     """Clean and normalize URL text, removing quotes and trailing punctuation."""
     if not url:
         return None
-    cleaned = str(url).strip().strip('"\'' ).strip()
-    cleaned = cleaned.rstrip(").,;")
-    if not cleaned:
-        return None
-    if cleaned.lower() in {"null", "none"}:
+    cleaned = str(url).strip(_URL_STRIP_CHARS)
+    if cleaned.lower() in _NULL_URL_TEXT:
         return None
     return cleaned
 
 
 def is_youtube_url(url: str) -> bool:
     """Check if a URL is a YouTube URL."""
-    try:
-        host = (urlparse(url).hostname or "").lower()
-    except Exception:
-        return False
-    return host in {"youtube.com", "www.youtube.com", "m.youtube.com", "youtu.be"}
+    return _url_host(url) in _YOUTUBE_HOSTS
 
 
 def extract_html_title(html_content: Optional[str]) -> str:
     """Extract the title from HTML content."""
     if not html_content:
         return ""
-    match = re.search(r"<title[^>]*>(.*?)</title>", html_content, flags=re.IGNORECASE | re.DOTALL)
-    if not match:
-        return ""
-    title = re.sub(r"\s+", " ", match.group(1)).strip()
+    # Fast path for the usual lowercase <title>...</title>; the regex handles other casings
+    raw = None
+    start = html_content.find("<title")
+    if start >= 0:
+        open_end = html_content.find(">", start) + 1
+        close = html_content.find("</title>", open_end) if open_end else -1
+        if close >= 0:
+            raw = html_content[open_end:close]
+    if raw is None:
+        match = _TITLE_RE.search(html_content)
+        if not match:
+            return ""
+        raw = match.group(1)
+    title = _WHITESPACE_RE.sub(" ", raw).strip()
     return html.unescape(title)
 
 
+def extract_title_and_text(html_content: Optional[str], limit: Optional[int] = None) -> Tuple[str, str]:
+    """
+    Page title and visible body text (scripts and styles dropped) from a single
+    selectolax parse, so callers that need both don't scan the HTML twice.
+    """
+    if not html_content:
+        return "", ""
+    tree = LexborHTMLParser(html_content)
+    title_node = tree.css_first("title")
+    title = " ".join(title_node.text().split()) if title_node is not None else ""
+    tree.strip_tags(["script", "style", "noscript"])
+    root = tree.body or tree.root
+    if root is None:
+        return title, ""
+    text = " ".join(root.text(separator=" ").split())
+    return title, (text[:limit] if limit is not None else text)
+
+
+def html_to_text(html_content: Optional[str], limit: Optional[int] = None) -> str:
+    """
+    Visible text of an HTML page with whitespace collapsed (scripts and styles dropped).
+    One C-level DOM parse via selectolax instead of a chain of regex passes.
+    """
+    return extract_title_and_text(html_content, limit)[1]
+
+
 def url_seems_relevant_to_topic(selected_topic: str, final_url: str, html_content: Optional[str]) -> bool:
     """
     Lightweight sanity check to prevent obviously mismatched links being posted.
@@ -91,16 +239,19 @@ def url_seems_relevant_to_topic(selected_topic: str, final_url: str, html_conten
         return True
 
     tokens = [
-        t for t in re.findall(r"[A-Za-z0-9][A-Za-z0-9\\-]{2,}", selected_topic.lower())
+        t for t in _TOPIC_TOKEN_RE.findall(selected_topic.lower())
         if t not in TOPIC_STOPWORDS
-    ]
+    ][:8]
     if not tokens:
         return True
 
-    title = extract_html_title(html_content).lower()
-    haystack = f"{final_url.lower()} {title}"
     # If NONE of the meaningful topic tokens appear in the URL or <title>, it's very likely unrelated.
-    return any(token in haystack for token in tokens[:8])
+    # Check the URL first so a match there never touches the HTML.
+    url_lower = final_url.lower()
+    if any(token in url_lower for token in tokens):
+        return True
+    title = extract_html_title(html_content).lower()
+    return any(token in title for token in tokens)
 
 
 def is_soft_404(html_content: str, url: str) -> bool:
@@ -118,52 +269,18 @@ def is_soft_404(html_content: str, url: str) -> bool:
     if not html_content:
         return False
 
-    # Lowercase for case-insensitive matching
-    content_lower = html_content.lower()
-
-    # Common soft 404 indicators in page content
-    soft_404_patterns = [
-        # Generic 404 phrases
-        'page not found',
-        'page could not be found',
-        'page doesn\'t exist',
-        'page does not exist',
-        'not found</title>',
-        '404</title>',
-        'error 404',
-        '404 error',
-        # Elastic-specific patterns
-        'this page doesn\'t exist',
-        'we couldn\'t find',
-        'the page you\'re looking for',
-        'this content has moved',
-        'content not available',
-        'something\'s amiss',
-        'hmmm… something\'s amiss',
-        'we\'re really good at search but can\'t seem to find',
-        # Common CMS 404 patterns
-        'oops! that page',
-        'sorry, we can\'t find',
-        'nothing found',
-        'no results found',
-        # Meta indicators
-        '<meta name="robots" content="noindex',
-    ]
-
-    for pattern in soft_404_patterns:
-        if pattern in content_lower:
-            logger.warning(f"Soft 404 detected for {url[:60]}... (matched: '{pattern}')")
-            return True
+    # Lowercase only the head of the page for case-insensitive matching
+    window = html_content[:SOFT_404_SCAN_CHARS].lower()
+
+    match = _SOFT_404_RE.search(window)
+    if match:
+        logger.warning(f"Soft 404 detected for {url[:60]}... (matched: '{match.group(0)}')")
+        return True
 
     # Check for very short content (often a sign of error pages)
     # But only if it also lacks typical article indicators
     content_length = len(html_content)
-    has_article_content = any(indicator in content_lower for indicator in [
-        '<article', 'class="article', 'class="post', 'class="content',
-        'class="blog', '<main', 'class="documentation'
-    ])
-
-    if content_length < 5000 and not has_article_content:
+    if content_length < 5000 and _ARTICLE_MARKER_RE.search(window) is None:
         # Very short page without article markers - suspicious
         logger.warning(f"Suspicious short page ({content_length} chars) without article content: {url[:60]}...")
         return True
@@ -171,15 +288,43 @@ def is_soft_404(html_content: str, url: str) -> bool:
     return False
 
 
-def validate_url(url: str, fetch_content: bool = True) -> Tuple[bool, Optional[str], Optional[int], str]:
+def _read_capped_text(response: requests.Response, max_bytes: int, max_chars: int) -> str:
+    """
+    Decode a streamed response body incrementally, stopping as soon as `max_chars`
+    characters are decoded or `max_bytes` bytes are read, whichever comes first.
+    """
+    try:
+        decoder = codecs.getincrementaldecoder(response.encoding or "utf-8")(errors="replace")
+    except LookupError:
+        decoder = codecs.getincrementaldecoder("utf-8")(errors="replace")
+    parts = []
+    bytes_read = chars_read = 0
+    for chunk in response.iter_content(chunk_size=65536):
+        chunk = chunk[:max_bytes - bytes_read]
+        bytes_read += len(chunk)
+        text = decoder.decode(chunk)
+        parts.append(text)
+        chars_read += len(text)
+        if bytes_read >= max_bytes or chars_read >= max_chars:
+            logger.warning(f"Stopped reading {response.url} after {bytes_read} bytes ({chars_read} chars)")
+            break
+    else:
+        parts.append(decoder.decode(b"", final=True))
+    return "".join(parts)
+
+
+def validate_url(url: str, fetch_content: bool = True,
+                 max_bytes: int = MAX_HTML_FETCH_BYTES) -> Tuple[bool, Optional[str], Optional[int], str]:
     """
     Validate a URL by fetching it and checking for 404 or other errors.
     Also detects "soft 404s" - pages that return 200 but show error content.
     Optionally returns raw HTML content for additional context.
+    Valid results and definitive 404/410s are cached; transient failures are not.
 
     Args:
         url: The URL to validate
         fetch_content: If True, fetches and returns raw HTML content
+        max_bytes: Stop downloading the body after this many bytes
 
     Returns:
         Tuple of (is_valid, html_content, status_code, final_url)
@@ -188,27 +333,39 @@ def validate_url(url: str, fetch_content: bool = True) -> Tuple[bool, Optional[s
         - status_code: HTTP status code or None if request failed
         - final_url: Final URL after following redirects (best effort)
     """
+    key = (url, fetch_content, max_bytes)
+    cached = _validation_cache.get(key)
+    if cached is not None:
+        return cached
+
+    result = _fetch_and_validate(url, fetch_content, max_bytes)
+    is_valid, _, status_code, _ = result
+    if is_valid:
+        _validation_cache.set(key, result)
+    elif status_code in (404, 410):
+        _validation_cache.set(key, result, ttl=NEGATIVE_VALIDATION_TTL)
+    return result
+
+
+def _fetch_and_validate(url: str, fetch_content: bool,
+                        max_bytes: int) -> Tuple[bool, Optional[str], Optional[int], str]:
+    """Uncached body of validate_url."""
     try:
-        headers = {
-            'User-Agent': 'Mozilla/5.0 (compatible; Vibecaster/1.0; +https://vibecaster.app)',
-            'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,*/*;q=0.8',
-        }
-
         if fetch_content:
-            response = requests.get(url, headers=headers, timeout=15, allow_redirects=True)
+            response = _HTTP_SESSION.get(url, timeout=15, allow_redirects=True, stream=True)
         else:
-            response = requests.head(url, headers=headers, timeout=10, allow_redirects=True)
+            response = _HTTP_SESSION.head(url, timeout=10, allow_redirects=True)
 
         status_code = response.status_code
         final_url = response.url or url
         is_valid = 200 <= status_code < 300
 
         if is_valid and fetch_content:
-            html_content = response.text
-            # Truncate large HTML to prevent downstream issues (LLM hangs, memory)
-            if len(html_content) > MAX_HTML_CONTENT_SIZE:
-                logger.warning(f"Truncating HTML from {len(html_content)} to {MAX_HTML_CONTENT_SIZE} chars for {url[:60]}...")
-                html_content = html_content[:MAX_HTML_CONTENT_SIZE]
+            try:
+                # Only as much as we keep is downloaded; the cap prevents downstream issues (LLM hangs, memory)
+                html_content = _read_capped_text(response, max_bytes, MAX_HTML_CONTENT_SIZE)[:MAX_HTML_CONTENT_SIZE]
+            finally:
+                response.close()
             # Check for soft 404 (200 status but 404-like content)
             if is_soft_404(html_content, url):
                 logger.warning(f"URL is soft 404: {url[:60]}... (status: {status_code})")
@@ -220,6 +377,7 @@ def validate_url(url: str, fetch_content: bool = True) -> Tuple[bool, Optional[s
             logger.info(f"URL validated successfully (HEAD): {url[:60]}... (status: {status_code})")
             return True, None, status_code, final_url
         else:
+            response.close()
             logger.warning(f"URL validation failed: {url[:60]}... (status: {status_code})")
             return False, None, status_code, final_url
 
@@ -231,10 +389,36 @@ def validate_url(url: str, fetch_content: bool = True) -> Tuple[bool, Optional[s
         return False, None, None, url
 
 
+def _passes_head_check(url: str) -> bool:
+    """
+    Cheap HEAD probe run before any body is downloaded. Only rejects candidates a GET
+    can't rescue: gone (404/410) or too large to be an article page. Servers that
+    mishandle HEAD (405, errors, timeouts) get the benefit of the doubt.
+    """
+    try:
+        response = _HTTP_SESSION.head(url, timeout=10, allow_redirects=True)
+    except requests.exceptions.RequestException as e:
+        logger.debug(f"HEAD precheck failed for {url[:60]}..., leaving it to GET: {e}")
+        return True
+    if response.status_code in (404, 410):
+        logger.info(f"Skipping {response.status_code} URL after HEAD: {url[:60]}...")
+        return False
+    content_length = response.headers.get("content-length", "")
+    if content_length.isdigit() and int(content_length) > MAX_CANDIDATE_CONTENT_LENGTH:
+        logger.info(f"Skipping oversized URL ({content_length} bytes) after HEAD: {url[:60]}...")
+        return False
+    return True
+
+
 def validate_and_select_url(urls: list, fetch_content: bool = True) -> Tuple[Optional[str], Optional[str]]:
     """
     Validate a list of URLs and return the first valid one with its content.
 
+    When fetching content, every candidate first gets a concurrent HEAD check, and
+    only the survivors are downloaded, one at a time in list order, until one passes.
+    Without content, the HEAD validations run concurrently and list order still
+    decides which valid URL wins.
+
     Args:
         urls: List of URLs to validate
         fetch_content: If True, fetches and returns raw HTML content
@@ -242,8 +426,14 @@ def validate_and_select_url(urls: list, fetch_content: bool = True) -> Tuple[Opt
     Returns:
         Tuple of (valid_url, html_content) or (None, None) if all URLs are invalid
     """
-    for url in urls:
-        is_valid, html_content, status_code, final_url = validate_url(url, fetch_content)
+    if fetch_content:
+        survivors = [url for url, ok in zip(urls, _VALIDATE_EXECUTOR.map(_passes_head_check, urls)) if ok]
+        results = ((url, validate_url(url, fetch_content)) for url in survivors)
+    else:
+        futures = [(url, _VALIDATE_EXECUTOR.submit(validate_url, url, fetch_content)) for url in urls]
+        results = ((url, future.result()) for url, future in futures)
+
+    for url, (is_valid, html_content, status_code, final_url) in results:
         if is_valid:
             return final_url, html_content
         elif status_code == 404:
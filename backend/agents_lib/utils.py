@@ -1,15 +1,45 @@
 """Shared utility functions for agents."""
+import random
 import re
-import json
 import time
+from typing import Optional
+
+import orjson
 
 from .config import QUIC_ERROR_PATTERNS
 
+MAX_BACKOFF = 30  # seconds
+
+
+# Every network/QUIC error pattern in one case-insensitive alternation: one scan per error
+_NETWORK_ERROR_RE = re.compile("|".join(map(re.escape, QUIC_ERROR_PATTERNS)), re.IGNORECASE)
+
 
 def is_network_error(error: Exception) -> bool:
     """Check if an error is a network/QUIC related error that should be retried."""
-    error_str = str(error).lower()
-    return any(pattern in error_str for pattern in QUIC_ERROR_PATTERNS)
+    return _NETWORK_ERROR_RE.search(str(error)) is not None
+
+
+def backoff_delay(attempt: int) -> float:
+    """
+    Seconds to wait before retry `attempt`: exponential with up to 1s of jitter, capped
+    at MAX_BACKOFF, so a burst of failures doesn't retry in lockstep.
+    """
+    return min((1 << attempt) + random.random(), MAX_BACKOFF)
+
+
+class RetryDeadlineExceeded(TimeoutError):
+    """Raised instead of sleeping when a retry backoff would overrun the caller's deadline."""
+
+
+def sleep_before_retry(delay: float, deadline: Optional[float] = None) -> None:
+    """
+    Sleep `delay` seconds before a retry. `deadline` is a time.monotonic() timestamp;
+    if the sleep would run past it, raise RetryDeadlineExceeded without sleeping.
+    """
+    if deadline is not None and time.monotonic() + delay > deadline:
+        raise RetryDeadlineExceeded(f"Retry deadline exceeded ({delay:.1f}s backoff would overrun it)")
+    time.sleep(delay)
 
 
 def emit_agent_event(event_type: str, **kwargs) -> str:
@@ -31,31 +61,56 @@ def emit_agent_event(event_type: str, **kwargs) -> str:
         "timestamp": time.time(),
         **kwargs
     }
-    return json.dumps(event) + "\n"
+    return orjson.dumps(event, option=orjson.OPT_NON_STR_KEYS).decode() + "\n"
 
 
-def strip_markdown_formatting(text: str) -> str:
+def parse_json_response(response):
     """
-    Remove common markdown formatting that LinkedIn doesn't support.
-    LinkedIn only supports plain text, so we strip **bold**, __italic__, etc.
+    Return the structured payload of a JSON-mode Gemini response.
+
+    Uses the SDK's already-decoded `response.parsed` when a response_schema was
+    set, and only parses `response.text` when it is missing.
     """
-    # Remove bold: **text** or __text__
-    text = re.sub(r'\*\*(.+?)\*\*', r'\1', text)
-    text = re.sub(r'__(.+?)__', r'\1', text)
+    parsed = getattr(response, "parsed", None)
+    if isinstance(parsed, (dict, list)):
+        return parsed
+    return orjson.loads(response.text)
+
 
-    # Remove italic: *text* or _text_ (but be careful with underscores in URLs)
-    text = re.sub(r'(?<!\w)\*(.+?)\*(?!\w)', r'\1', text)
-    text = re.sub(r'(?<!\w)_(.+?)_(?!\w)', r'\1', text)
+# Every inline style in one alternation; order gives bold precedence over italic.
+_MARKDOWN_INLINE_RE = re.compile(
+    r'\*\*(.+?)\*\*'                 # **bold**
+    r'|__(.+?)__'                    # __bold__
+    r'|(?<!\w)\*(.+?)\*(?!\w)'       # *italic*
+    r'|(?<!\w)_(.+?)_(?!\w)'         # _italic_ (not underscores inside URLs/words)
+    r'|~~(.+?)~~'                    # ~~strikethrough~~
+    r'|`(.+?)`'                      # `code`
+)
 
-    # Remove strikethrough: ~~text~~
-    text = re.sub(r'~~(.+?)~~', r'\1', text)
 
-    # Remove code formatting: `text`
-    text = re.sub(r'`(.+?)`', r'\1', text)
+def _unwrap_markdown(match: re.Match) -> str:
+    return next(group for group in match.groups() if group is not None)
 
+
+def strip_markdown_formatting(text: str) -> str:
+    """
+    Remove common markdown formatting that LinkedIn doesn't support.
+    LinkedIn only supports plain text, so we strip **bold**, __italic__, etc.
+    """
+    # Repeat only while something was stripped, so nested styles like
+    # ***bold italic*** lose every layer; plain text takes a single pass.
+    count = 1
+    while count:
+        text, count = _MARKDOWN_INLINE_RE.subn(_unwrap_markdown, text)
     return text
 
 
+# LinkedIn @[Name](urn:li:...) mention syntax, whose parens must survive sanitizing
+_LINKEDIN_MENTION_RE = re.compile(r'@\[([^\]]+)\]\(([^)]+)\)')
+_FULLWIDTH_PARENS = str.maketrans({"(": "\uff08", ")": "\uff09"})
+_LINKEDIN_UNSAFE_CHARS = str.maketrans({"|": "\u23d0", "(": "\uff08", ")": "\uff09"})
+
+
 def sanitize_for_linkedin(text: str) -> str:
     """
     Sanitize text for LinkedIn Posts API to prevent truncation.
@@ -66,24 +121,20 @@ def sanitize_for_linkedin(text: str) -> str:
        parses parens as mention URNs, causing truncation on malformed patterns.
        We swap standalone parens to Unicode fullwidth equivalents.
     """
+    # Most posts have no mentions: swap pipes and parens in a single translate
+    if "@[" not in text:
+        return text.translate(_LINKEDIN_UNSAFE_CHARS)
+
     # Fix 1: Replace pipe characters
     text = text.replace("|", "\u23d0")
 
-    # Fix 2: Replace parentheses that are NOT part of @[Name](urn:...) mentions
-    # Temporarily protect mention patterns
-    mentions = []
-    def protect_mention(m):
-        mentions.append(m.group(0))
-        return f"__MENTION_{len(mentions)-1}__"
-
-    text = re.sub(r'@\[([^\]]+)\]\(([^)]+)\)', protect_mention, text)
-
-    # Now replace remaining parens with fullwidth versions
-    text = text.replace("(", "\uff08")
-    text = text.replace(")", "\uff09")
-
-    # Restore mentions
-    for i, mention in enumerate(mentions):
-        text = text.replace(f"__MENTION_{i}__", mention)
-
-    return text
+    # Fix 2: Swap parentheses to fullwidth everywhere except inside @[Name](urn:...) mentions,
+    # translating the text between mentions in a single pass
+    parts = []
+    pos = 0
+    for match in _LINKEDIN_MENTION_RE.finditer(text):
+        parts.append(text[pos:match.start()].translate(_FULLWIDTH_PARENS))
+        parts.append(match.group(0))
+        pos = match.end()
+    parts.append(text[pos:].translate(_FULLWIDTH_PARENS))
+    return "".join(parts)
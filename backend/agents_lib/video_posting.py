@@ -2,16 +2,66 @@
 import os
 import time
 import json
-import tempfile
+from concurrent.futures import ThreadPoolExecutor
 from typing import Optional, Tuple
 from io import BytesIO
 import tweepy
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 
 from database import get_oauth_tokens
 from logger_config import agent_logger as logger
 from agents_lib.linkedin_mentions import apply_linkedin_mentions
 from agents_lib.utils import sanitize_for_linkedin
+from agents_lib.social_media import get_linkedin_author_urn
+
+# Shared keep-alive pool for the multi-step LinkedIn and YouTube upload flows, so each
+# init/chunk/finalize/post hop reuses the connection instead of a fresh TCP+TLS handshake.
+# Retry's default allowed_methods excludes POST, so only idempotent chunk PUTs are re-sent.
+_HTTP_SESSION = requests.Session()
+_HTTP_ADAPTER = HTTPAdapter(
+    pool_connections=32,
+    pool_maxsize=64,
+    max_retries=Retry(total=2, backoff_factor=0.2, status_forcelist=[429, 502, 503, 504], raise_on_status=False),
+)
+_HTTP_SESSION.mount("https://", _HTTP_ADAPTER)
+_HTTP_SESSION.mount("http://", _HTTP_ADAPTER)
+
+# LinkedIn upload instructions are independent byte ranges, so their PUTs run side by
+# side. Shared across uploads to stay inside LinkedIn's rate limits.
+LINKEDIN_UPLOAD_CONCURRENCY = int(os.getenv("LINKEDIN_UPLOAD_CONCURRENCY", "4"))
+_LINKEDIN_CHUNK_EXECUTOR = ThreadPoolExecutor(
+    max_workers=max(1, LINKEDIN_UPLOAD_CONCURRENCY), thread_name_prefix="linkedin-chunk"
+)
+
+
+class _ByteRangeReader:
+    """
+    Read-only file over a slice of the video bytes. requests sends it with a
+    Content-Length and streams it in blocks, so a chunk PUT never copies its
+    slice of the video; seek/tell let urllib3 rewind it for a retry.
+    """
+    def __init__(self, data, start: int, end: int):
+        self._view = memoryview(data)[start:end]
+        self._pos = 0
+
+    def __len__(self) -> int:
+        return len(self._view)
+
+    def read(self, size: int = -1):
+        end = len(self._view) if size is None or size < 0 else min(self._pos + size, len(self._view))
+        block = self._view[self._pos:end]
+        self._pos = end
+        return block
+
+    def tell(self) -> int:
+        return self._pos
+
+    def seek(self, offset: int, whence: int = 0) -> int:
+        base = (0, self._pos, len(self._view))[whence]
+        self._pos = max(0, min(base + offset, len(self._view)))
+        return self._pos
 
 
 # ===== TWITTER/X VIDEO UPLOAD =====
@@ -54,21 +104,16 @@ def upload_video_to_twitter(
         auth.set_access_token(access_token, access_token_secret)
         api = tweepy.API(auth)
 
-        # Write video to temp file for chunked upload
-        with tempfile.NamedTemporaryFile(suffix=".mp4", delete=False) as f:
-            f.write(video_bytes)
-            temp_path = f.name
-
-        try:
-            # Chunked upload for video
-            media = api.chunked_upload(
-                filename=temp_path,
-                media_category="tweet_video",
-                wait_for_async_finalize=True
-            )
-            media_id = media.media_id
-        finally:
-            os.unlink(temp_path)
+        # Chunked upload straight from memory; BytesIO shares the bytes buffer rather
+        # than copying it, so no temp-file copy of the video is written to disk
+        media = api.chunked_upload(
+            filename="video.mp4",
+            file=BytesIO(video_bytes),
+            file_type=mime_type,
+            media_category="tweet_video",
+            wait_for_async_finalize=True
+        )
+        media_id = media.media_id
 
         # Create tweet with video
         client = tweepy.Client(
@@ -91,6 +136,31 @@ def upload_video_to_twitter(
 
 # ===== LINKEDIN VIDEO UPLOAD =====
 
+def _put_linkedin_chunk(access_token: str, video_bytes: bytes, i: int, total_chunks: int,
+                        instruction: dict) -> Optional[str]:
+    """PUT one LinkedIn upload-instruction byte range. Returns its ETag (needed for finalizeUpload)."""
+    first_byte = instruction["firstByte"]
+    last_byte = instruction["lastByte"]
+
+    chunk = _ByteRangeReader(video_bytes, first_byte, last_byte + 1)
+    logger.info(f"[LinkedIn Video] PUT chunk {i+1}/{total_chunks} - bytes {first_byte}-{last_byte} ({len(chunk)} bytes)")
+
+    upload_response = _HTTP_SESSION.put(
+        instruction["uploadUrl"],
+        headers={
+            "Authorization": f"Bearer {access_token}",
+            "Content-Type": "application/octet-stream"
+        },
+        data=chunk
+    )
+    upload_response.raise_for_status()
+
+    etag = upload_response.headers.get("etag")
+    if etag:
+        logger.info(f"[LinkedIn Video] Chunk {i+1} uploaded, ETag: {etag[:50]}...")
+    return etag
+
+
 def upload_video_to_linkedin(
     user_id: int,
     video_bytes: bytes,
@@ -125,15 +195,10 @@ def upload_video_to_linkedin(
             "X-Restli-Protocol-Version": "2.0.0"
         }
 
-        # Get author URN
-        logger.info("[LinkedIn Video] GET /v2/userinfo - fetching author URN")
-        user_response = requests.get(
-            "https://api.linkedin.com/v2/userinfo",
-            headers=headers
-        )
-        user_response.raise_for_status()
-        person_id = user_response.json()["sub"]
-        author_urn = f"urn:li:person:{person_id}"
+        # Get author URN (cached per token, shared with image posts)
+        author_urn = get_linkedin_author_urn(headers)
+        if not author_urn:
+            return False, "Could not fetch LinkedIn profile"
         logger.info(f"[LinkedIn Video] Author URN: {author_urn}")
 
         # Step 1: Initialize video upload
@@ -148,7 +213,7 @@ def upload_video_to_linkedin(
         }
 
         logger.info(f"[LinkedIn Video] POST /rest/videos?action=initializeUpload - file size: {file_size}")
-        init_response = requests.post(
+        init_response = _HTTP_SESSION.post(
             "https://api.linkedin.com/rest/videos?action=initializeUpload",
             headers={
                 "Authorization": f"Bearer {tokens['access_token']}",
@@ -165,31 +230,13 @@ def upload_video_to_linkedin(
         upload_instructions = init_data["value"]["uploadInstructions"]
         logger.info(f"[LinkedIn Video] Initialized upload - video URN: {video_urn}, {len(upload_instructions)} chunk(s)")
 
-        # Step 2: Upload video chunks and capture ETags
-        uploaded_part_ids = []
-        for i, instruction in enumerate(upload_instructions):
-            upload_url = instruction["uploadUrl"]
-            first_byte = instruction["firstByte"]
-            last_byte = instruction["lastByte"]
-
-            chunk = video_bytes[first_byte:last_byte + 1]
-            logger.info(f"[LinkedIn Video] PUT chunk {i+1}/{len(upload_instructions)} - bytes {first_byte}-{last_byte} ({len(chunk)} bytes)")
-
-            upload_response = requests.put(
-                upload_url,
-                headers={
-                    "Authorization": f"Bearer {tokens['access_token']}",
-                    "Content-Type": "application/octet-stream"
-                },
-                data=chunk
-            )
-            upload_response.raise_for_status()
-
-            # Capture ETag from response headers (required for finalizeUpload)
-            etag = upload_response.headers.get("etag")
-            if etag:
-                uploaded_part_ids.append(etag)
-                logger.info(f"[LinkedIn Video] Chunk {i+1} uploaded, ETag: {etag[:50]}...")
+        # Step 2: Upload video chunks concurrently and capture ETags (in instruction order)
+        futures = [
+            _LINKEDIN_CHUNK_EXECUTOR.submit(_put_linkedin_chunk, tokens['access_token'], video_bytes,
+                                            i, len(upload_instructions), instruction)
+            for i, instruction in enumerate(upload_instructions)
+        ]
+        uploaded_part_ids = [etag for etag in (future.result() for future in futures) if etag]
 
         logger.info(f"[LinkedIn Video] All chunks uploaded, {len(uploaded_part_ids)} ETags captured")
 
@@ -203,7 +250,7 @@ def upload_video_to_linkedin(
         }
 
         logger.info(f"[LinkedIn Video] POST /rest/videos?action=finalizeUpload with {len(uploaded_part_ids)} ETags")
-        finalize_response = requests.post(
+        finalize_response = _HTTP_SESSION.post(
             "https://api.linkedin.com/rest/videos?action=finalizeUpload",
             headers={
                 "Authorization": f"Bearer {tokens['access_token']}",
@@ -239,7 +286,7 @@ def upload_video_to_linkedin(
             "isReshareDisabledByAuthor": False
         }
 
-        post_response = requests.post(
+        post_response = _HTTP_SESSION.post(
             "https://api.linkedin.com/rest/posts",
             headers={
                 "Authorization": f"Bearer {tokens['access_token']}",
@@ -281,7 +328,7 @@ def refresh_youtube_token(user_id: int) -> Optional[str]:
         return None
 
     try:
-        response = requests.post(
+        response = _HTTP_SESSION.post(
             "https://oauth2.googleapis.com/token",
             data={
                 "grant_type": "refresh_token",
@@ -358,7 +405,7 @@ def upload_video_to_youtube(
         if tags:
             metadata["snippet"]["tags"] = tags[:500]  # Max 500 tags
 
-        init_response = requests.post(
+        init_response = _HTTP_SESSION.post(
             "https://www.googleapis.com/upload/youtube/v3/videos?uploadType=resumable&part=snippet,status",
             headers={
                 "Authorization": f"Bearer {access_token}",
@@ -381,7 +428,7 @@ def upload_video_to_youtube(
 
         while uploaded < total_size:
             chunk_end = min(uploaded + chunk_size, total_size)
-            chunk = video_bytes[uploaded:chunk_end]
+            chunk = _ByteRangeReader(video_bytes, uploaded, chunk_end)
 
             headers = {
                 "Authorization": f"Bearer {access_token}",
@@ -390,7 +437,7 @@ def upload_video_to_youtube(
                 "Content-Range": f"bytes {uploaded}-{chunk_end - 1}/{total_size}"
             }
 
-            upload_response = requests.put(upload_url, headers=headers, data=chunk)
+            upload_response = _HTTP_SESSION.put(upload_url, headers=headers, data=chunk)
 
             if upload_response.status_code == 200:
                 # Upload complete
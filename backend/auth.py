@@ -1,4 +1,5 @@
 import os
+import json
 import secrets
 from typing import Optional
 from fastapi import APIRouter, HTTPException, Query, Depends
@@ -15,9 +16,51 @@ load_dotenv()
 
 router = APIRouter(prefix="/api/auth", tags=["auth"])
 
-# OAuth state storage (in-memory for MVP, consider Redis for production)
-# Format: {state: {service: str, user_id: int, timestamp: float, oauth_handler: Optional[object]}}
-oauth_states = {}
+# Seconds a login has to come back through its OAuth callback
+OAUTH_STATE_TTL = 600
+
+# Shared state store for multi-worker / multi-instance deployments; unset keeps state in-process
+REDIS_URL = os.getenv("REDIS_URL")
+
+
+class OAuthStateStore:
+    """
+    One-time OAuth state entries that expire after `ttl` seconds.
+
+    Backed by Redis when a URL is given, so a callback can land on a different worker
+    or instance than its login; otherwise an in-process dict (single-worker dev).
+    Payloads must be JSON-serializable.
+    """
+    def __init__(self, redis_url: Optional[str] = None, ttl: int = OAUTH_STATE_TTL):
+        self.ttl = ttl
+        self._redis = None
+        self._local = {}
+        if redis_url:
+            import redis.asyncio as redis
+            self._redis = redis.from_url(redis_url, decode_responses=True)
+
+    async def put(self, state: str, payload: dict) -> None:
+        if self._redis is not None:
+            await self._redis.set(f"oauth_state:{state}", json.dumps(payload), ex=self.ttl)
+            return
+        now = time.time()
+        for key in [k for k, (expires_at, _) in self._local.items() if expires_at <= now]:
+            self._local.pop(key, None)
+        self._local[state] = (now + self.ttl, payload)
+
+    async def pop(self, state: str) -> Optional[dict]:
+        """Return and consume a state's payload in one step; None if unknown or expired."""
+        if self._redis is not None:
+            raw = await self._redis.getdel(f"oauth_state:{state}")
+            return json.loads(raw) if raw else None
+        entry = self._local.pop(state, None)
+        if entry is None or entry[0] <= time.time():
+            return None
+        return entry[1]
+
+
+# Format: {state: {service: str, user_id: int, timestamp: float, request_token_secret: Optional[str]}}
+oauth_states = OAuthStateStore(REDIS_URL)
 
 # Environment variables
 FRONTEND_URL = os.getenv("FRONTEND_URL", "http://localhost:3000")
@@ -57,13 +100,14 @@ async def twitter_login(user_id: int = Depends(get_current_user_id)):
 
         # Store request token for callback validation
         # OAuth 1.0a uses oauth_token as the identifier
+        # Only the token secret is kept; the callback rebuilds the handler from it
         request_token = oauth1_handler.request_token["oauth_token"]
-        oauth_states[request_token] = {
+        await oauth_states.put(request_token, {
             "service": "twitter",
             "user_id": user_id,
             "timestamp": time.time(),
-            "oauth_handler": oauth1_handler
-        }
+            "request_token_secret": oauth1_handler.request_token["oauth_token_secret"]
+        })
         logger.info(f"Stored Twitter OAuth request token: {request_token}")
 
         return {"auth_url": auth_url}
@@ -86,21 +130,31 @@ async def twitter_callback(
             logger.warning(f"Twitter OAuth denied: {denied}")
             return RedirectResponse(url=f"{FRONTEND_URL}/dashboard?status=twitter_error&error=Authorization denied")
 
-        # Validate oauth_token
-        if not oauth_token or oauth_token not in oauth_states:
+        # Validate and consume oauth_token
+        state_data = await oauth_states.pop(oauth_token) if oauth_token else None
+        if not state_data:
             return RedirectResponse(url=f"{FRONTEND_URL}/dashboard?status=twitter_error&error=Invalid oauth_token")
 
-        # Get user_id and OAuth handler from stored state
-        state_data = oauth_states.pop(oauth_token)
         user_id = state_data.get("user_id")
-        oauth1_handler = state_data.get("oauth_handler")
+        request_token_secret = state_data.get("request_token_secret")
 
         if not user_id:
             return RedirectResponse(url=f"{FRONTEND_URL}/dashboard?status=twitter_error&error=User not authenticated")
 
-        if not oauth1_handler:
+        if not request_token_secret:
             return RedirectResponse(url=f"{FRONTEND_URL}/dashboard?status=twitter_error&error=OAuth handler not found")
 
+        # Rebuild the OAuth handler from the stored request token
+        oauth1_handler = tweepy.OAuth1UserHandler(
+            consumer_key=X_API_KEY,
+            consumer_secret=X_API_SECRET,
+            callback=X_REDIRECT_URI
+        )
+        oauth1_handler.request_token = {
+            "oauth_token": oauth_token,
+            "oauth_token_secret": request_token_secret
+        }
+
         # Get access token using the verifier
         logger.info(f"Fetching Twitter access token with verifier...")
         access_token, access_token_secret = oauth1_handler.get_access_token(oauth_verifier)
@@ -171,7 +225,7 @@ async def linkedin_login(user_id: int = Depends(get_current_user_id)):
     try:
         # Generate state for CSRF protection
         state = secrets.token_urlsafe(32)
-        oauth_states[state] = {"service": "linkedin", "user_id": user_id, "timestamp": time.time()}
+        await oauth_states.put(state, {"service": "linkedin", "user_id": user_id, "timestamp": time.time()})
 
         # LinkedIn OAuth URL
         scopes = ["openid", "profile", "w_member_social"]
@@ -194,12 +248,12 @@ async def linkedin_login(user_id: int = Depends(get_current_user_id)):
 async def linkedin_callback(code: str = Query(...), state: Optional[str] = Query(None)):
     """Handle LinkedIn OAuth callback."""
     try:
-        # Validate state
-        if not state or state not in oauth_states:
+        # Validate and consume state
+        state_data = await oauth_states.pop(state) if state else None
+        if not state_data:
             return RedirectResponse(url=f"{FRONTEND_URL}/dashboard?status=linkedin_error&error=Invalid state")
 
         # Get user_id from state
-        state_data = oauth_states.pop(state)
         user_id = state_data.get("user_id")
 
         if not user_id:
@@ -268,7 +322,7 @@ async def youtube_login(user_id: int = Depends(get_current_user_id)):
     try:
         # Generate state for CSRF protection
         state = secrets.token_urlsafe(32)
-        oauth_states[state] = {"service": "youtube", "user_id": user_id, "timestamp": time.time()}
+        await oauth_states.put(state, {"service": "youtube", "user_id": user_id, "timestamp": time.time()})
 
         # YouTube/Google OAuth URL with youtube.upload scope
         scopes = [
@@ -301,12 +355,12 @@ async def youtube_callback(code: str = Query(...), state: str = Query(None), err
             logger.warning(f"YouTube OAuth error: {error}")
             return RedirectResponse(url=f"{FRONTEND_URL}/dashboard?status=youtube_error&error={error}")
 
-        # Validate state
-        if not state or state not in oauth_states:
+        # Validate and consume state
+        state_data = await oauth_states.pop(state) if state else None
+        if not state_data:
             return RedirectResponse(url=f"{FRONTEND_URL}/dashboard?status=youtube_error&error=Invalid state")
 
         # Get user_id from state
-        state_data = oauth_states.pop(state)
         user_id = state_data.get("user_id")
 
         if not user_id:
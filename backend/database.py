@@ -1,4 +1,5 @@
 import sqlite3
+import threading
 import time
 from typing import Optional, Dict, Any
 from contextlib import contextmanager
@@ -340,6 +341,7 @@ def update_campaign(user_id: int, user_prompt: Optional[str] = None, refined_per
             """, (user_id, user_prompt or "", refined_persona or "", visual_style or "",
                   schedule_cron or "0 9 * * *", 1 if include_links else 0, media_type or "image",
                   _json.dumps(exclude_companies) if exclude_companies else None))
+    invalidate_campaign_cache(user_id)
 
 
 def get_campaign(user_id: int) -> Optional[Dict[str, Any]]:
@@ -363,11 +365,42 @@ def get_campaign(user_id: int) -> Optional[Dict[str, Any]]:
         return campaign
 
 
+# Campaign config changes rarely, so hot request paths (chat, image generation)
+# read it through a short-lived per-process cache. Writes invalidate the entry.
+CAMPAIGN_CACHE_TTL = 60  # seconds
+_campaign_cache: Dict[int, tuple] = {}
+_campaign_cache_lock = threading.Lock()
+
+
+def get_campaign_cached(user_id: int) -> Optional[Dict[str, Any]]:
+    """Retrieve campaign configuration, served from a TTL cache when fresh."""
+    now = time.monotonic()
+    with _campaign_cache_lock:
+        entry = _campaign_cache.get(user_id)
+        if entry and entry[0] > now:
+            return dict(entry[1]) if entry[1] is not None else None
+
+    campaign = get_campaign(user_id)
+    with _campaign_cache_lock:
+        _campaign_cache[user_id] = (now + CAMPAIGN_CACHE_TTL, campaign)
+    return dict(campaign) if campaign is not None else None
+
+
+def invalidate_campaign_cache(user_id: Optional[int] = None):
+    """Drop cached campaign config for a user (or everyone when user_id is None)."""
+    with _campaign_cache_lock:
+        if user_id is None:
+            _campaign_cache.clear()
+        else:
+            _campaign_cache.pop(user_id, None)
+
+
 def update_last_run(user_id: int, timestamp: int):
     """Update the last run timestamp for a user."""
     with get_db() as conn:
         cursor = conn.cursor()
         cursor.execute("UPDATE campaign SET last_run = ? WHERE user_id = ?", (timestamp, user_id))
+    invalidate_campaign_cache(user_id)
 
 
 def get_connection_status(user_id: int) -> Dict[str, Any]:
@@ -422,8 +455,25 @@ def save_post_history(user_id: int, post_text: str, topics: list, platforms: lis
         """, (user_id, post_text, json.dumps(topics), int(time.time()), json.dumps(platforms)))
 
 
+def save_post_history_batch(user_id: int, rows: list):
+    """Save several (post_text, topics, platforms) history rows in one transaction."""
+    import json
+    import time
+
+    if not rows:
+        return
+    now = int(time.time())
+    with get_db() as conn:
+        cursor = conn.cursor()
+        cursor.executemany("""
+            INSERT INTO post_history (user_id, post_text, topics_json, created_at, platforms)
+            VALUES (?, ?, ?, ?, ?)
+        """, [(user_id, post_text, json.dumps(topics), now, json.dumps(platforms))
+              for post_text, topics, platforms in rows])
+
+
 def get_recent_topics(user_id: int, days: int = 14) -> list:
-    """Get all topics covered in the last N days."""
+    """Get the distinct topics covered in the last N days, most recent first."""
     import json
     import time
 
@@ -438,10 +488,14 @@ def get_recent_topics(user_id: int, days: int = 14) -> list:
         """, (user_id, cutoff_time))
 
         all_topics = []
+        seen = set()
         for row in cursor.fetchall():
             if row[0]:
-                topics = json.loads(row[0])
-                all_topics.extend(topics)
+                for topic in json.loads(row[0]):
+                    key = topic.strip().lower()
+                    if key not in seen:
+                        seen.add(key)
+                        all_topics.append(topic)
 
         return all_topics
 
@@ -933,7 +987,9 @@ def create_linkedin_mention(company_name: str, organization_urn: str, aliases: l
             INSERT INTO linkedin_mentions (company_name, organization_urn, aliases_json, created_at, updated_at)
             VALUES (?, ?, ?, ?, ?)
         """, (company_name, organization_urn, json.dumps(aliases) if aliases else None, now, now))
-        return cursor.lastrowid
+        mention_id = cursor.lastrowid
+    invalidate_mentions_cache()
+    return mention_id
 
 
 def update_linkedin_mention(mention_id: int, company_name: str = None,
@@ -964,6 +1020,7 @@ def update_linkedin_mention(mention_id: int, company_name: str = None,
         query = f"UPDATE linkedin_mentions SET {', '.join(updates)} WHERE id = ?"
         params.append(mention_id)
         cursor.execute(query, params)
+    invalidate_mentions_cache()
 
 
 def delete_linkedin_mention(mention_id: int):
@@ -971,6 +1028,7 @@ def delete_linkedin_mention(mention_id: int):
     with get_db() as conn:
         cursor = conn.cursor()
         cursor.execute("DELETE FROM linkedin_mentions WHERE id = ?", (mention_id,))
+    invalidate_mentions_cache()
 
 
 def get_linkedin_mention(mention_id: int) -> Optional[Dict[str, Any]]:
@@ -1013,9 +1071,29 @@ def get_all_linkedin_mentions(include_inactive: bool = False) -> list:
         return mentions
 
 
+MENTIONS_CACHE_TTL = 60  # seconds
+_mentions_cache: Dict[str, tuple] = {}
+_mentions_cache_lock = threading.Lock()
+
+
 def get_active_linkedin_mentions() -> list:
-    """Get only active mentions for use in post processing."""
-    return get_all_linkedin_mentions(include_inactive=False)
+    """Get only active mentions for use in post processing, served from a TTL cache when fresh."""
+    now = time.monotonic()
+    with _mentions_cache_lock:
+        entry = _mentions_cache.get("active")
+        if entry and entry[0] > now:
+            return list(entry[1])
+
+    mentions = get_all_linkedin_mentions(include_inactive=False)
+    with _mentions_cache_lock:
+        _mentions_cache["active"] = (now + MENTIONS_CACHE_TTL, mentions)
+    return list(mentions)
+
+
+def invalidate_mentions_cache():
+    """Drop the cached active mentions so the next post sees admin edits immediately."""
+    with _mentions_cache_lock:
+        _mentions_cache.clear()
 
 
 # ===== CLEANUP FUNCTIONS =====
@@ -5,7 +5,7 @@ import time as time_module
 import json
 import threading
 import re
-import base64
+import pybase64
 from typing import Optional, Dict
 from fastapi import FastAPI, HTTPException, Depends, UploadFile, File, Form
 from fastapi.middleware.cors import CORSMiddleware
@@ -18,7 +18,7 @@ from dotenv import load_dotenv
 import uvicorn
 
 # Import local modules
-from database import init_database, get_campaign, update_campaign, get_connection_status
+from database import init_database, get_campaign, update_campaign, get_connection_status, invalidate_campaign_cache
 from agents import analyze_user_prompt, run_agent_cycle, generate_from_url, generate_from_url_stream, post_url_content, chat_post_builder_stream, parse_generated_posts, generate_image_for_post_builder
 from agents_lib.persona import infer_excluded_companies, infer_schedule_from_prompt
 from database import get_author_bio as db_get_author_bio
@@ -567,6 +567,7 @@ async def activate_campaign(user_id: int = Depends(get_current_user_id)):
         _conn.execute("UPDATE campaign SET is_active = 1 WHERE user_id = ?", (user_id,))
         _conn.commit()
         _conn.close()
+        invalidate_campaign_cache(user_id)
 
         setup_scheduler(user_id)
 
@@ -596,6 +597,7 @@ async def deactivate_campaign(user_id: int = Depends(get_current_user_id)):
         _conn.execute("UPDATE campaign SET is_active = 0 WHERE user_id = ?", (user_id,))
         _conn.commit()
         _conn.close()
+        invalidate_campaign_cache(user_id)
 
         job_id = f"agent_cycle_user_{user_id}"
         if scheduler.get_job(job_id):
@@ -724,8 +726,8 @@ async def generate_from_url_stream_endpoint(request: GenerateFromURLRequest, use
     if not request.url or not request.url.startswith(('http://', 'https://')):
         raise HTTPException(status_code=400, detail="Invalid URL format")
 
-    def generate():
-        for chunk in generate_from_url_stream(user_id, request.url):
+    async def generate():
+        async for chunk in generate_from_url_stream(user_id, request.url):
             yield f"data: {chunk}\n\n"
         yield "data: [DONE]\n\n"
 
@@ -805,6 +807,11 @@ async def chat_endpoint(request: ChatRequest, user_id: int = Depends(get_current
     )
 
 
+def _encode_base64(data: bytes) -> str:
+    """Base64-encode media bytes for a JSON response (SIMD-accelerated)."""
+    return pybase64.b64encode_as_string(data)
+
+
 @app.post("/api/chat/generate-image")
 async def chat_generate_image(request: GenerateImageRequest, user_id: int = Depends(get_current_user_id)):
     """
@@ -812,26 +819,26 @@ async def chat_generate_image(request: GenerateImageRequest, user_id: int = Depe
     Accepts optional visual_style to customize the image (e.g., "Mario and Luigi cartoon characters...")
     """
     try:
-        import concurrent.futures
-        import base64
-
-        with concurrent.futures.ThreadPoolExecutor() as executor:
-            future = executor.submit(
+        # Generation and PNG/base64 encoding run in worker threads so the event
+        # loop keeps serving other requests while this one waits.
+        image_bytes = await asyncio.wait_for(
+            asyncio.to_thread(
                 generate_image_for_post_builder,
                 request.post_text,
                 request.visual_style,  # Pass visual_style from request
                 user_id
-            )
-            image_bytes = future.result(timeout=120)  # 2 minute timeout
+            ),
+            timeout=120  # 2 minute timeout
+        )
 
         if not image_bytes:
             raise HTTPException(status_code=500, detail="Failed to generate image")
 
         # Return base64 encoded image
-        image_base64 = base64.b64encode(image_bytes).decode('utf-8')
+        image_base64 = await asyncio.to_thread(_encode_base64, image_bytes)
         return {"image_base64": image_base64}
 
-    except concurrent.futures.TimeoutError:
+    except asyncio.TimeoutError:
         raise HTTPException(status_code=504, detail="Image generation timed out")
     except HTTPException:
         raise
@@ -848,9 +855,6 @@ async def chat_generate_media(request: GenerateMediaRequest, user_id: int = Depe
     from agents import generate_media_for_post_builder
 
     try:
-        import concurrent.futures
-        import base64
-
         # Validate media_type
         if request.media_type not in ("image", "video"):
             raise HTTPException(status_code=400, detail="media_type must be 'image' or 'video'")
@@ -858,27 +862,28 @@ async def chat_generate_media(request: GenerateMediaRequest, user_id: int = Depe
         # Video takes much longer
         timeout = 120 if request.media_type == "image" else 600
 
-        with concurrent.futures.ThreadPoolExecutor() as executor:
-            future = executor.submit(
+        media_bytes, mime_type = await asyncio.wait_for(
+            asyncio.to_thread(
                 generate_media_for_post_builder,
                 request.post_text,
                 request.visual_style,
                 user_id,
                 request.media_type
-            )
-            media_bytes, mime_type = future.result(timeout=timeout)
+            ),
+            timeout=timeout
+        )
 
         if not media_bytes:
             raise HTTPException(status_code=500, detail=f"Failed to generate {request.media_type}")
 
-        media_base64 = base64.b64encode(media_bytes).decode('utf-8')
+        media_base64 = await asyncio.to_thread(_encode_base64, media_bytes)
         return {
             "media_base64": media_base64,
             "mime_type": mime_type,
             "media_type": request.media_type
         }
 
-    except concurrent.futures.TimeoutError:
+    except asyncio.TimeoutError:
         raise HTTPException(status_code=504, detail=f"{request.media_type.title()} generation timed out")
     except HTTPException:
         raise
@@ -1753,7 +1758,7 @@ async def generate_reference_endpoint(
         )
 
         # Return base64 encoded image
-        image_base64 = base64.b64encode(image_bytes).decode('utf-8')
+        image_base64 = await asyncio.to_thread(_encode_base64, image_bytes)
         return {
             "success": True,
             "image_base64": image_base64,
@@ -1834,7 +1839,7 @@ async def upload_reference_endpoint(
     # Return success with image info
     return {
         "success": True,
-        "image_base64": base64.b64encode(file_bytes).decode('utf-8'),
+        "image_base64": await asyncio.to_thread(_encode_base64, file_bytes),
         "mime_type": validation.get('mime_type'),
         "width": validation.get('width'),
         "height": validation.get('height')
@@ -1872,7 +1877,7 @@ async def download_image_endpoint(
 
         return {
             "success": True,
-            "image_base64": base64.b64encode(image_bytes).decode('utf-8'),
+            "image_base64": await asyncio.to_thread(_encode_base64, image_bytes),
             "mime_type": validation.get('mime_type'),
             "width": validation.get('width'),
             "height": validation.get('height')
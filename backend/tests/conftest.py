@@ -112,3 +112,19 @@ def sample_soft_404_html():
     </body>
     </html>
     """
+
+
+@pytest.fixture(autouse=True)
+def reset_llm_caches():
+    """Start every test with empty LLM result and database read caches."""
+    from agents_lib import persona, content_generator, post_generator, social_media, url_utils
+    from database import invalidate_campaign_cache, invalidate_mentions_cache
+    invalidate_campaign_cache()
+    invalidate_mentions_cache()
+    persona._persona_cache.clear()
+    content_generator._image_prompt_cache.clear()
+    post_generator._post_text_cache.clear()
+    social_media._author_urn_cache.clear()
+    url_utils._redirect_cache.clear()
+    url_utils._validation_cache.clear()
+    yield
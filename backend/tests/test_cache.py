@@ -0,0 +1,53 @@
+"""Tests for the in-process LLM result caches."""
+import pytest
+from unittest.mock import patch
+
+from agents_lib.cache import TTLCache, make_cache_key, normalize_text
+
+
+class TestTTLCache:
+    """Tests for TTLCache."""
+
+    def test_get_returns_stored_value(self):
+        cache = TTLCache(maxsize=4, ttl=60)
+        cache.set("a", 1)
+        assert cache.get("a") == 1
+        assert "a" in cache
+
+    def test_expired_entries_are_dropped(self):
+        cache = TTLCache(maxsize=4, ttl=60)
+        with patch('agents_lib.cache.time.monotonic', return_value=1000.0):
+            cache.set("a", 1)
+        with patch('agents_lib.cache.time.monotonic', return_value=1061.0):
+            assert cache.get("a") is None
+        assert len(cache) == 0
+
+    def test_evicts_least_recently_used(self):
+        cache = TTLCache(maxsize=2, ttl=60)
+        cache.set("a", 1)
+        cache.set("b", 2)
+        cache.get("a")
+        cache.set("c", 3)
+        assert "a" in cache
+        assert "b" not in cache
+        assert "c" in cache
+
+
+class TestMakeCacheKey:
+    """Tests for make_cache_key."""
+
+    def test_same_parts_same_key(self):
+        assert make_cache_key("x", {"b": 1, "a": 2}) == make_cache_key("x", {"a": 2, "b": 1})
+
+    def test_different_parts_different_key(self):
+        assert make_cache_key("x", None) != make_cache_key("x", "")
+
+
+class TestNormalizeText:
+    """Tests for normalize_text."""
+
+    def test_ignores_case_and_whitespace(self):
+        assert normalize_text("  Anime   GIRL\nteaching AI ") == "anime girl teaching ai"
+
+    def test_handles_none(self):
+        assert normalize_text(None) == ""
@@ -0,0 +1,114 @@
+"""
+Tests for agents_lib/chat_stream.py
+
+Each test has meaningful assertions that could actually fail.
+Covers chat_post_builder_stream_batch: ordering, progress, concurrency and argument checks.
+"""
+import json
+import threading
+import time
+import pytest
+from unittest.mock import patch
+
+from agents_lib.chat_stream import chat_post_builder_stream_batch
+
+
+def _fake_stream(message, history, user_id):
+    """Stand-in orchestrator: later messages finish first, events echo the inputs."""
+    time.sleep(0.01 * (5 - int(message[-1])))
+    yield f"start:{message}"
+    yield f"done:{message}:{len(history)}:{user_id}"
+
+
+class TestChatPostBuilderStreamBatch:
+    """Tests for chat_post_builder_stream_batch function."""
+
+    @patch('agents_lib.chat_stream.chat_post_builder_stream', side_effect=_fake_stream)
+    def test_results_follow_message_order(self, mock_stream):
+        """Results should line up with messages even when runs finish out of order."""
+        messages = ["msg0", "msg1", "msg2", "msg3"]
+
+        results = chat_post_builder_stream_batch(messages)
+
+        assert results == [[f"start:{m}", f"done:{m}:0:None"] for m in messages]
+        assert mock_stream.call_count == 4
+
+    @patch('agents_lib.chat_stream.chat_post_builder_stream', side_effect=_fake_stream)
+    def test_passes_per_message_history_and_user(self, mock_stream):
+        """Each run should get the history and user id at its own index."""
+        results = chat_post_builder_stream_batch(
+            ["msg0", "msg1"],
+            histories=[[], [{"role": "user", "content": "hi"}]],
+            user_ids=[7, 8],
+        )
+
+        assert results[0][-1] == "done:msg0:0:7"
+        assert results[1][-1] == "done:msg1:1:8"
+
+    @patch('agents_lib.chat_stream.chat_post_builder_stream', side_effect=_fake_stream)
+    def test_reports_progress_per_completion(self, mock_stream):
+        """on_progress should be called once per finished message with a running count."""
+        calls = []
+
+        chat_post_builder_stream_batch(["msg0", "msg1", "msg2"], on_progress=lambda done, total: calls.append((done, total)))
+
+        assert calls == [(1, 3), (2, 3), (3, 3)]
+
+    def test_failed_run_keeps_other_results(self):
+        """A raising run should end with an error event without discarding the rest."""
+        def flaky_stream(message, history, user_id):
+            yield f"start:{message}"
+            if message == "msg1":
+                raise RuntimeError("orchestrator crashed")
+            yield f"done:{message}"
+
+        with patch('agents_lib.chat_stream.chat_post_builder_stream', side_effect=flaky_stream):
+            results = chat_post_builder_stream_batch(["msg0", "msg1", "msg2"])
+
+        assert results[0] == ["start:msg0", "done:msg0"]
+        assert results[2] == ["start:msg2", "done:msg2"]
+        assert results[1][0] == "start:msg1"
+        error = json.loads(results[1][1])
+        assert error["type"] == "error"
+        assert error["error"] == "orchestrator crashed"
+        assert len(results[1]) == 2
+
+    def test_limits_concurrency(self):
+        """No more than max_concurrency orchestrator runs should be in flight."""
+        lock = threading.Lock()
+        running = 0
+        peak = 0
+
+        def tracking_stream(message, history, user_id):
+            nonlocal running, peak
+            with lock:
+                running += 1
+                peak = max(peak, running)
+            time.sleep(0.02)
+            with lock:
+                running -= 1
+            yield message
+
+        with patch('agents_lib.chat_stream.chat_post_builder_stream', side_effect=tracking_stream):
+            results = chat_post_builder_stream_batch([f"msg{i}" for i in range(6)], max_concurrency=2)
+
+        assert results == [[f"msg{i}"] for i in range(6)]
+        assert peak <= 2
+
+    @pytest.mark.parametrize("kwargs", [
+        {"histories": [[]]},
+        {"user_ids": [1, 2, 3]},
+    ])
+    def test_rejects_mismatched_lengths(self, kwargs):
+        """histories and user_ids must match messages one-to-one."""
+        with pytest.raises(ValueError):
+            chat_post_builder_stream_batch(["msg0", "msg1"], **kwargs)
+
+    @patch('agents_lib.chat_stream.chat_post_builder_stream')
+    def test_empty_batch(self, mock_stream):
+        """An empty batch should return immediately without running or reporting."""
+        calls = []
+
+        assert chat_post_builder_stream_batch([], on_progress=lambda *args: calls.append(args)) == []
+        mock_stream.assert_not_called()
+        assert calls == []
@@ -0,0 +1,165 @@
+"""
+Tests for agents_lib/content_generator.py
+
+Each test has meaningful assertions that could actually fail.
+Covers edge cases: pass/rewrite paths and error states.
+"""
+import pytest
+from unittest.mock import patch, Mock
+import json
+
+from agents_lib.config import LLM_MODEL, LLM_MODEL_FAST
+from agents_lib.content_generator import (
+    critique_and_refine_post,
+    generate_post_draft,
+    generate_post_draft_stream,
+)
+
+
+def _response(text):
+    response = Mock()
+    response.text = text
+    return response
+
+
+def _chunks(*texts):
+    return [_response(text) for text in texts]
+
+
+class TestGeneratePostDraftStream:
+    """Tests for generate_post_draft_stream function."""
+
+    @patch('agents_lib.content_generator.client')
+    def test_streams_tokens_then_complete(self, mock_client):
+        """Each non-empty chunk should be a token event, followed by the assembled post."""
+        mock_client.models.generate_content_stream.return_value = _chunks("Kubernetes ", None, "tips #k8s ")
+
+        events = list(generate_post_draft_stream("context", "persona", "prompt"))
+
+        assert events == [
+            ('token', "Kubernetes "),
+            ('token', "tips #k8s "),
+            ('complete', "Kubernetes tips #k8s"),
+        ]
+
+    @patch('agents_lib.content_generator.client')
+    def test_appends_source_url_and_tightens_limit(self, mock_client):
+        """The URL should be appended and the prompt should budget 220 chars for the text."""
+        mock_client.models.generate_content_stream.return_value = _chunks("Post text")
+
+        events = list(generate_post_draft_stream("context", "persona", "prompt", source_url="https://example.com"))
+
+        assert events[-1] == ('complete', "Post text https://example.com")
+        prompt = mock_client.models.generate_content_stream.call_args.kwargs['contents']
+        assert "MAXIMUM 220 characters" in prompt
+        assert "https://example.com" not in prompt
+
+    @patch('agents_lib.content_generator.logger')
+    @patch('agents_lib.content_generator.client')
+    def test_warns_when_draft_exceeds_limit(self, mock_client, mock_logger):
+        """An over-length draft is still returned but logged."""
+        mock_client.models.generate_content_stream.return_value = _chunks("x" * 281)
+
+        events = list(generate_post_draft_stream("context", "persona", "prompt"))
+
+        assert events[-1] == ('complete', "x" * 281)
+        assert "exceeds 280 chars" in mock_logger.warning.call_args.args[0]
+
+    @patch('agents_lib.content_generator.logger')
+    @patch('agents_lib.content_generator.client')
+    def test_no_warning_at_limit(self, mock_client, mock_logger):
+        """A draft exactly at the limit should not be flagged."""
+        mock_client.models.generate_content_stream.return_value = _chunks("x" * 280)
+
+        list(generate_post_draft_stream("context", "persona", "prompt"))
+
+        mock_logger.warning.assert_not_called()
+
+    @patch('agents_lib.content_generator.client')
+    def test_empty_draft_is_an_error(self, mock_client):
+        """Whitespace-only output should end with an error event, not a complete one."""
+        mock_client.models.generate_content_stream.return_value = _chunks("  ", "\n")
+
+        events = list(generate_post_draft_stream("context", "persona", "prompt"))
+
+        assert events[-1] == ('error', "Model returned an empty draft")
+        assert not any(event[0] == 'complete' for event in events)
+
+    @patch('agents_lib.content_generator.client')
+    def test_stream_failure_is_an_error_event(self, mock_client):
+        """An exception from the model should be yielded, not raised."""
+        mock_client.models.generate_content_stream.side_effect = Exception("API down")
+
+        events = list(generate_post_draft_stream("context", "persona", "prompt"))
+
+        assert events == [('error', "API down")]
+
+
+class TestGeneratePostDraft:
+    """Tests for the blocking generate_post_draft wrapper."""
+
+    @patch('agents_lib.content_generator.client')
+    def test_returns_completed_draft(self, mock_client):
+        """Should return the post from the stream's complete event."""
+        mock_client.models.generate_content_stream.return_value = _chunks("Draft ", "post")
+
+        assert generate_post_draft("context", "persona", "prompt", "https://example.com") == "Draft post https://example.com"
+
+    @patch('agents_lib.content_generator.client')
+    def test_falls_back_on_error(self, mock_client):
+        """Should return the canned fallback (with URL) when generation fails."""
+        mock_client.models.generate_content_stream.side_effect = Exception("API down")
+
+        draft = generate_post_draft("context", "persona", "prompt", "https://example.com")
+
+        assert draft.startswith("Excited to share thoughts")
+        assert draft.endswith("https://example.com")
+
+
+class TestCritiqueAndRefinePost:
+    """Tests for critique_and_refine_post function."""
+
+    @patch('agents_lib.content_generator.client')
+    def test_returns_draft_without_rewrite_when_critique_passes(self, mock_client):
+        """A passing draft should cost a single fast-model call."""
+        mock_client.models.generate_content.return_value = _response(
+            json.dumps({"needs_rewrite": False, "reason": "Engaging and on-voice"})
+        )
+
+        result = critique_and_refine_post("Great draft", "expert persona")
+
+        assert result == "Great draft"
+        assert mock_client.models.generate_content.call_count == 1
+        call_args = mock_client.models.generate_content.call_args
+        assert call_args.kwargs['model'] == LLM_MODEL_FAST
+        assert call_args.kwargs['config'].response_schema is not None
+
+    @patch('agents_lib.content_generator.client')
+    def test_rewrites_with_primary_model_when_critique_fails(self, mock_client):
+        """A failing draft should be rewritten by the primary model using the critique."""
+        mock_client.models.generate_content.side_effect = [
+            _response(json.dumps({"needs_rewrite": True, "reason": "Too long"})),
+            _response("  Shorter post  "),
+        ]
+
+        result = critique_and_refine_post("Very long draft", "expert persona")
+
+        assert result == "Shorter post"
+        assert mock_client.models.generate_content.call_count == 2
+        rewrite_call = mock_client.models.generate_content.call_args_list[1]
+        assert rewrite_call.kwargs['model'] == LLM_MODEL
+        assert "Too long" in rewrite_call.kwargs['contents']
+
+    @patch('agents_lib.content_generator.client')
+    def test_returns_draft_on_llm_error(self, mock_client):
+        """Should fall back to the original draft on API errors."""
+        mock_client.models.generate_content.side_effect = Exception("API Error")
+
+        assert critique_and_refine_post("Original draft", "persona") == "Original draft"
+
+    @patch('agents_lib.content_generator.client')
+    def test_returns_draft_on_invalid_json(self, mock_client):
+        """Should fall back to the original draft when the critique is malformed."""
+        mock_client.models.generate_content.return_value = _response("not json")
+
+        assert critique_and_refine_post("Original draft", "persona") == "Original draft"
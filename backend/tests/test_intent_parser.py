@@ -10,6 +10,7 @@ import json
 
 from agents_lib.intent_parser import (
     agent_intent_parser,
+    agent_intent_router,
     is_greeting_intent,
     is_clarify_intent,
     is_generate_posts_intent,
@@ -307,6 +308,62 @@ class TestAgentIntentParser:
         call_args = mock_client.models.generate_content.call_args
         config = call_args.kwargs['config']
         assert config.response_mime_type == "application/json"
+        assert config.response_schema is not None
+
+
+class TestAgentIntentRouter:
+    """Tests for agent_intent_router (intent + direct reply in one call)."""
+
+    @patch('agents_lib.intent_parser.client')
+    def test_returns_direct_response_for_greeting(self, mock_client):
+        """Should return the drafted reply alongside the greeting intent."""
+        mock_response = Mock()
+        mock_response.text = json.dumps({
+            "intent": "greeting",
+            "persona": DEFAULT_PERSONA,
+            "topic": "",
+            "search_query": "",
+            "visual_style": DEFAULT_VISUAL_STYLE,
+            "response": "Hello! Tell me what you'd like to post about."
+        })
+        mock_client.models.generate_content.return_value = mock_response
+
+        result = agent_intent_router("hello")
+
+        assert result["intent"] == INTENT_GREETING
+        assert result["response"].startswith("Hello!")
+        assert mock_client.models.generate_content.call_count == 1
+
+    @patch('agents_lib.intent_parser.client')
+    def test_requests_structured_output(self, mock_client):
+        """Should constrain the output with a JSON response schema."""
+        mock_response = Mock()
+        mock_response.text = json.dumps({
+            "intent": "generate_posts",
+            "persona": "expert",
+            "topic": "topic",
+            "search_query": "query",
+            "visual_style": "style",
+            "response": ""
+        })
+        mock_client.models.generate_content.return_value = mock_response
+
+        agent_intent_router("test message")
+
+        config = mock_client.models.generate_content.call_args.kwargs['config']
+        assert config.response_mime_type == "application/json"
+        assert config.response_schema is not None
+
+    @patch('agents_lib.intent_parser.client')
+    def test_fallback_on_error_has_empty_response(self, mock_client):
+        """Should fall back to generate_posts with an empty reply on LLM errors."""
+        mock_client.models.generate_content.side_effect = Exception("API down")
+
+        result = agent_intent_router("kubernetes tips")
+
+        assert result["intent"] == INTENT_GENERATE_POSTS
+        assert result["topic"] == "kubernetes tips"
+        assert result["response"] == ""
 
 
 class TestIntentParserEdgeCases:
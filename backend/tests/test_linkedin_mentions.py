@@ -0,0 +1,66 @@
+"""
+Tests for agents_lib/linkedin_mentions.py
+
+Covers priority between names and aliases, first-occurrence-only replacement,
+word boundaries, and text that already contains mention syntax.
+"""
+import pytest
+from unittest.mock import patch
+
+from agents_lib.linkedin_mentions import apply_linkedin_mentions
+
+
+MENTIONS = [
+    {
+        'company_name': 'Amazon Web Services',
+        'organization_urn': 'urn:li:organization:1',
+        'aliases': ['AWS'],
+    },
+    {
+        'company_name': 'Elastic',
+        'organization_urn': 'urn:li:organization:2',
+        'aliases': [],
+    },
+]
+
+
+@pytest.fixture
+def active_mentions():
+    with patch('agents_lib.linkedin_mentions.get_active_linkedin_mentions', return_value=MENTIONS):
+        yield
+
+
+class TestApplyLinkedinMentions:
+    """Tests for apply_linkedin_mentions function."""
+
+    def test_returns_empty_text_unchanged(self, active_mentions):
+        assert apply_linkedin_mentions("") == ""
+
+    def test_returns_text_unchanged_without_mentions(self):
+        with patch('agents_lib.linkedin_mentions.get_active_linkedin_mentions', return_value=[]):
+            assert apply_linkedin_mentions("AWS and Elastic") == "AWS and Elastic"
+
+    def test_replaces_only_first_occurrence(self, active_mentions):
+        result = apply_linkedin_mentions("elastic is great. Elastic scales.")
+        assert result == "@[Elastic](urn:li:organization:2) is great. Elastic scales."
+
+    def test_alias_is_used_when_name_absent(self, active_mentions):
+        result = apply_linkedin_mentions("Running on AWS today")
+        assert result == "Running on @[Amazon Web Services](urn:li:organization:1) today"
+
+    def test_company_name_preferred_over_earlier_alias(self, active_mentions):
+        result = apply_linkedin_mentions("AWS, also known as Amazon Web Services")
+        assert result == "AWS, also known as @[Amazon Web Services](urn:li:organization:1)"
+
+    def test_respects_word_boundaries(self, active_mentions):
+        assert apply_linkedin_mentions("Elasticsearch rocks") == "Elasticsearch rocks"
+
+    def test_skips_existing_mention_syntax(self, active_mentions):
+        assert apply_linkedin_mentions("See [Elastic]") == "See [Elastic]"
+
+    def test_applies_multiple_companies(self, active_mentions):
+        result = apply_linkedin_mentions("Elastic on AWS")
+        assert result == (
+            "@[Elastic](urn:li:organization:2) on "
+            "@[Amazon Web Services](urn:li:organization:1)"
+        )
@@ -0,0 +1,36 @@
+"""Tests for the OAuth state store in auth.py (in-process backend)."""
+import asyncio
+from unittest.mock import patch
+
+from auth import OAuthStateStore
+
+
+class TestOAuthStateStore:
+    """Tests for OAuthStateStore without Redis."""
+
+    def test_pop_returns_stored_payload_once(self):
+        store = OAuthStateStore(ttl=600)
+        asyncio.run(store.put("abc", {"service": "linkedin", "user_id": 7}))
+
+        assert asyncio.run(store.pop("abc")) == {"service": "linkedin", "user_id": 7}
+        # A state can only be consumed once
+        assert asyncio.run(store.pop("abc")) is None
+
+    def test_unknown_state_returns_none(self):
+        store = OAuthStateStore(ttl=600)
+        assert asyncio.run(store.pop("missing")) is None
+
+    def test_expired_state_returns_none(self):
+        store = OAuthStateStore(ttl=600)
+        with patch('auth.time.time', return_value=1000.0):
+            asyncio.run(store.put("abc", {"user_id": 7}))
+        with patch('auth.time.time', return_value=1601.0):
+            assert asyncio.run(store.pop("abc")) is None
+
+    def test_put_prunes_expired_states(self):
+        store = OAuthStateStore(ttl=600)
+        with patch('auth.time.time', return_value=1000.0):
+            asyncio.run(store.put("old", {"user_id": 1}))
+        with patch('auth.time.time', return_value=1601.0):
+            asyncio.run(store.put("new", {"user_id": 2}))
+        assert list(store._local) == ["new"]
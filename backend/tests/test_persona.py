@@ -122,6 +122,7 @@ class TestAnalyzeUserPrompt:
         call_args = mock_client.models.generate_content.call_args
         config = call_args.kwargs['config']
         assert config.response_mime_type == "application/json"
+        assert config.response_schema is not None
 
     @patch('agents_lib.persona.client')
     def test_returns_fallback_on_llm_error(self, mock_client):
@@ -178,6 +179,35 @@ class TestAnalyzeUserPrompt:
         assert "Mario explaining kubernetes" in contents
 
 
+class TestAnalyzeUserPromptCache:
+    """Tests for the persona analysis cache."""
+
+    @patch('agents_lib.persona.client')
+    def test_reuses_analysis_for_same_normalized_prompt(self, mock_client):
+        """Re-saving the same prompt (modulo case/whitespace) skips the LLM call."""
+        mock_response = Mock()
+        mock_response.text = json.dumps({"refined_persona": "persona", "visual_style": "style"})
+        mock_client.models.generate_content.return_value = mock_response
+
+        first = analyze_user_prompt("Mario explains kubernetes")
+        second = analyze_user_prompt("  mario EXPLAINS   kubernetes ")
+
+        assert first == second
+        assert mock_client.models.generate_content.call_count == 1
+
+    @patch('agents_lib.persona.client')
+    def test_similar_prompts_are_analyzed_separately(self, mock_client):
+        """A near-duplicate prompt is a different vision and gets its own analysis."""
+        mock_response = Mock()
+        mock_response.text = json.dumps({"refined_persona": "persona", "visual_style": "style"})
+        mock_client.models.generate_content.return_value = mock_response
+
+        analyze_user_prompt("Mario explains kubernetes")
+        analyze_user_prompt("Mario and Luigi explain k8s")
+
+        assert mock_client.models.generate_content.call_count == 2
+
+
 class TestAnalyzeUserPromptEdgeCases:
     """Tests for edge cases in analyze_user_prompt."""
 
@@ -7,12 +7,19 @@ Covers edge cases: retry logic, URL handling, markdown stripping.
 import pytest
 from unittest.mock import patch, Mock
 import json
+import time
 
 from agents_lib.post_generator import (
     generate_x_post,
     generate_linkedin_post,
+    generate_x_and_linkedin_posts,
+    generate_linkedin_post_stream,
     _generate_x_post_text,
     _generate_linkedin_post_text,
+    _generate_x_and_linkedin_post_texts,
+    _build_avoidance_text,
+    _x_post_instructions,
+    _linkedin_post_instructions,
 )
 
 
@@ -97,6 +104,47 @@ class TestGenerateXPostText:
         assert "FRESH angle" in prompt
 
 
+    @patch('agents_lib.post_generator.client')
+    def test_reuses_cached_text_for_identical_inputs(self, mock_client):
+        """Identical generation requests should hit the LLM only once."""
+        mock_response = Mock()
+        mock_response.text = "Cached post"
+        mock_client.models.generate_content.return_value = mock_response
+
+        args = ("context", "persona", "prompt", "https://example.com", ["topic a"])
+        first = _generate_x_post_text(*args)
+        second = _generate_x_post_text(*args)
+
+        assert first == second == "Cached post"
+        assert mock_client.models.generate_content.call_count == 1
+
+    @patch('agents_lib.post_generator.client')
+    def test_use_cache_false_always_regenerates(self, mock_client):
+        """use_cache=False should neither read nor populate the cache."""
+        mock_response = Mock()
+        mock_response.text = "Fresh post"
+        mock_client.models.generate_content.return_value = mock_response
+
+        args = ("context", "persona", "prompt", "https://example.com", [])
+        _generate_x_post_text(*args, use_cache=False)
+        _generate_x_post_text(*args, use_cache=False)
+        _generate_x_post_text(*args)
+
+        assert mock_client.models.generate_content.call_count == 3
+
+    @patch('agents_lib.post_generator.client')
+    def test_different_recent_topics_bypass_cache(self, mock_client):
+        """Changing recent topics should trigger a fresh generation."""
+        mock_response = Mock()
+        mock_response.text = "Post"
+        mock_client.models.generate_content.return_value = mock_response
+
+        _generate_x_post_text("context", "persona", "prompt", None, ["topic a"])
+        _generate_x_post_text("context", "persona", "prompt", None, ["topic b"])
+
+        assert mock_client.models.generate_content.call_count == 2
+
+
 class TestGenerateXPost:
     """Tests for generate_x_post function."""
 
@@ -148,7 +196,7 @@ class TestGenerateXPost:
         # Should only appear once
         assert post.count("https://example.com") == 1
 
-    @patch('agents_lib.post_generator.time.sleep')
+    @patch('agents_lib.utils.time.sleep')
     @patch('agents_lib.post_generator._generate_x_post_text')
     def test_retries_on_failure(self, mock_generate, mock_sleep):
         """Should retry with exponential backoff on failure."""
@@ -171,6 +219,26 @@ class TestGenerateXPost:
         assert mock_generate.call_count == 3
         assert mock_sleep.call_count == 2  # Sleep before retry 2 and 3
 
+    @patch('agents_lib.utils.time.sleep')
+    @patch('agents_lib.post_generator._generate_x_post_text')
+    def test_stops_retrying_past_deadline(self, mock_generate, mock_sleep):
+        """Should not back off for a retry that would overrun the deadline."""
+        mock_generate.side_effect = Exception("Always fails")
+
+        with pytest.raises(TimeoutError):
+            generate_x_post(
+                search_context="context",
+                refined_persona="persona",
+                user_prompt="prompt",
+                source_url=None,
+                recent_topics=[],
+                max_retries=3,
+                deadline=time.monotonic()
+            )
+
+        assert mock_generate.call_count == 1
+        mock_sleep.assert_not_called()
+
     @patch('agents_lib.post_generator._generate_x_post_text')
     def test_raises_after_all_retries_fail(self, mock_generate):
         """Should raise exception when all retries fail."""
@@ -194,10 +262,12 @@ class TestGenerateLinkedInPostText:
 
     @patch('agents_lib.post_generator.client')
     def test_generates_professional_post(self, mock_client):
-        """Should return generated LinkedIn post text."""
-        mock_response = Mock()
-        mock_response.text = "  Professional insight about observability...  "
-        mock_client.models.generate_content.return_value = mock_response
+        """Should return generated LinkedIn post text assembled from streamed chunks."""
+        mock_client.models.generate_content_stream.return_value = [
+            Mock(text="  Professional insight "),
+            Mock(text=None),
+            Mock(text="about observability...  "),
+        ]
 
         result = _generate_linkedin_post_text(
             search_context="OpenTelemetry best practices",
@@ -206,23 +276,53 @@ class TestGenerateLinkedInPostText:
             recent_topics=[]
         )
 
-        assert "Professional insight" in result
-        assert result == result.strip()
+        assert result == "Professional insight about observability..."
 
     @patch('agents_lib.post_generator.client')
     def test_uses_lower_temperature(self, mock_client):
         """Should use temperature 0.7 for professional tone."""
-        mock_response = Mock()
-        mock_response.text = "Post"
-        mock_client.models.generate_content.return_value = mock_response
+        mock_client.models.generate_content_stream.return_value = [Mock(text="Post")]
 
         _generate_linkedin_post_text("context", "persona", "prompt", [])
 
-        call_args = mock_client.models.generate_content.call_args
+        call_args = mock_client.models.generate_content_stream.call_args
         config = call_args.kwargs['config']
         assert config.temperature == 0.7
 
 
+class TestGenerateLinkedInPostStream:
+    """Tests for generate_linkedin_post_stream generator."""
+
+    @patch('agents_lib.post_generator.apply_linkedin_mentions', side_effect=lambda text: text)
+    @patch('agents_lib.post_generator.client')
+    def test_yields_tokens_then_finalized_post(self, mock_client, mock_mentions):
+        """Should stream raw deltas, then the cleaned post with the URL appended."""
+        mock_client.models.generate_content_stream.return_value = [
+            Mock(text="**Bold** hook"),
+            Mock(text=" and insight"),
+        ]
+
+        events = list(generate_linkedin_post_stream(
+            "context", "persona", "prompt", "https://example.com/article", []
+        ))
+
+        assert events[:2] == [('token', "**Bold** hook"), ('token', " and insight")]
+        event_type, post = events[-1]
+        assert event_type == 'complete'
+        assert "**" not in post
+        assert post.endswith("https://example.com/article")
+        mock_mentions.assert_called_once()
+
+    @patch('agents_lib.post_generator.client')
+    def test_yields_error_on_failure(self, mock_client):
+        """Should yield an error event instead of raising."""
+        mock_client.models.generate_content_stream.side_effect = Exception("API Error")
+
+        events = list(generate_linkedin_post_stream("context", "persona", "prompt", None, []))
+
+        assert events == [('error', "API Error")]
+
+
 class TestGenerateLinkedInPost:
     """Tests for generate_linkedin_post function."""
 
@@ -274,7 +374,7 @@ class TestGenerateLinkedInPost:
         assert "Bold" in post
         assert "italic" in post
 
-    @patch('agents_lib.post_generator.time.sleep')
+    @patch('agents_lib.utils.time.sleep')
     @patch('agents_lib.post_generator._generate_linkedin_post_text')
     def test_retries_on_failure(self, mock_generate, mock_sleep):
         """Should retry with exponential backoff on failure."""
@@ -311,6 +411,96 @@ class TestGenerateLinkedInPost:
             )
 
 
+class TestGenerateXAndLinkedInPosts:
+    """Tests for generate_x_and_linkedin_posts (both posts in one LLM call)."""
+
+    @patch('agents_lib.utils.time.sleep')
+    @patch('agents_lib.post_generator.apply_linkedin_mentions', side_effect=lambda text: text)
+    @patch('agents_lib.post_generator._generate_x_and_linkedin_post_texts')
+    def test_post_processes_both_posts(self, mock_generate, mock_mentions, mock_sleep):
+        """Should append the URL to both posts and strip markdown from LinkedIn."""
+        mock_generate.return_value = ("X content", "**Bold** LinkedIn content")
+
+        x_post, linkedin_post = generate_x_and_linkedin_posts(
+            search_context="context",
+            refined_persona="persona",
+            user_prompt="prompt",
+            source_url="https://example.com/article",
+            recent_topics=[]
+        )
+
+        assert x_post == "X content\n\nhttps://example.com/article"
+        assert "**" not in linkedin_post
+        assert linkedin_post.endswith("https://example.com/article")
+
+    @patch('agents_lib.post_generator.client')
+    def test_requests_structured_pair(self, mock_client):
+        """Should parse both posts from one schema-constrained response."""
+        mock_response = Mock()
+        mock_response.text = json.dumps({"x_post": " X text ", "linkedin_post": " LinkedIn text "})
+        mock_client.models.generate_content.return_value = mock_response
+
+        result = _generate_x_and_linkedin_post_texts("context", "persona", "prompt", None, [])
+
+        assert result == ("X text", "LinkedIn text")
+        assert mock_client.models.generate_content.call_count == 1
+        config = mock_client.models.generate_content.call_args.kwargs['config']
+        assert config.response_mime_type == "application/json"
+        assert config.response_schema is not None
+
+    @patch('agents_lib.post_generator.client')
+    def test_reuses_single_post_prompts_and_x_temperature(self, mock_client):
+        """The combined prompt should embed both tuned prompts and run at the X temperature."""
+        mock_response = Mock()
+        mock_response.text = json.dumps({"x_post": "X text", "linkedin_post": "LinkedIn text"})
+        mock_client.models.generate_content.return_value = mock_response
+
+        _generate_x_and_linkedin_post_texts("context", "persona", "prompt", "https://example.com", ["old topic"])
+
+        kwargs = mock_client.models.generate_content.call_args.kwargs
+        avoidance = _build_avoidance_text(["old topic"])
+        assert _x_post_instructions("persona", 230, avoidance) in kwargs['contents']
+        assert _linkedin_post_instructions("persona", avoidance) in kwargs['contents']
+        assert kwargs['config'].temperature == 0.8
+
+    @patch('agents_lib.post_generator._generate_x_post_text')
+    @patch('agents_lib.post_generator.client')
+    def test_regenerates_over_length_x_post(self, mock_client, mock_generate_x):
+        """An X post over the character budget should be replaced by a standalone generation."""
+        mock_response = Mock()
+        mock_response.text = json.dumps({"x_post": "x" * 231, "linkedin_post": "LinkedIn text"})
+        mock_client.models.generate_content.return_value = mock_response
+        mock_generate_x.return_value = "Short X text"
+
+        result = _generate_x_and_linkedin_post_texts("context", "persona", "prompt", "https://example.com", [])
+
+        assert result == ("Short X text", "LinkedIn text")
+        mock_generate_x.assert_called_once_with("context", "persona", "prompt", "https://example.com", [], True)
+
+    @patch('agents_lib.post_generator._generate_x_post_text')
+    @patch('agents_lib.post_generator.client')
+    def test_keeps_x_post_within_budget(self, mock_client, mock_generate_x):
+        """An X post at the limit should be kept as-is."""
+        mock_response = Mock()
+        mock_response.text = json.dumps({"x_post": "x" * 280, "linkedin_post": "LinkedIn text"})
+        mock_client.models.generate_content.return_value = mock_response
+
+        result = _generate_x_and_linkedin_post_texts("context", "persona", "prompt", None, [])
+
+        assert result == ("x" * 280, "LinkedIn text")
+        mock_generate_x.assert_not_called()
+
+    @patch('agents_lib.post_generator.client')
+    def test_raises_when_a_post_is_empty(self, mock_client):
+        """Should raise so callers fall back to per-platform generation."""
+        mock_response = Mock()
+        mock_response.text = json.dumps({"x_post": "X text", "linkedin_post": ""})
+        mock_client.models.generate_content.return_value = mock_response
+
+        with pytest.raises(ValueError):
+            _generate_x_and_linkedin_post_texts("context", "persona", "prompt", None, [])
+
+
 class TestEdgeCases:
     """Tests for edge cases in post generation."""
 
@@ -8,9 +8,13 @@ import pytest
 from unittest.mock import patch, Mock, MagicMock
 import json
 
+from concurrent.futures import TimeoutError as FuturesTimeoutError
+
 from agents_lib.search import (
     search_trending_topics,
     select_single_topic,
+    TOPIC_SELECTION_SCHEMA,
+    _llm_call_with_timeout,
 )
 
 
@@ -63,7 +67,7 @@ class TestSearchTrendingTopics:
         assert "kubernetes topic" in context  # Fallback includes prompt
         assert urls == []
 
-    @patch('agents_lib.search.time.sleep')
+    @patch('agents_lib.utils.time.sleep')
     @patch('agents_lib.search.validate_and_select_url')
     @patch('agents_lib.search.resolve_redirect_url')
     @patch('agents_lib.search.client')
@@ -98,7 +102,7 @@ class TestSearchTrendingTopics:
         assert mock_sleep.call_count == 2  # Sleep before retry 2 and 3
 
     @patch('agents_lib.search.is_network_error')
-    @patch('agents_lib.search.time.sleep')
+    @patch('agents_lib.utils.time.sleep')
     @patch('agents_lib.search.client')
     def test_handles_network_errors_with_retry(self, mock_client, mock_sleep, mock_is_network):
         """Should retry with backoff on network errors."""
@@ -203,6 +207,10 @@ class TestSelectSingleTopic:
         assert url == "https://example.com/otel"
         assert html is not None
 
+        config = mock_client.models.generate_content.call_args.kwargs['config']
+        assert config.response_schema is TOPIC_SELECTION_SCHEMA
+        assert config.thinking_config.thinking_level == "LOW"
+
     @patch('agents_lib.search.validate_url')
     @patch('agents_lib.search.client')
     def test_selects_url_by_index(self, mock_client, mock_validate):
@@ -253,7 +261,7 @@ class TestSelectSingleTopic:
         # No valid URL selected
         assert url is None
 
-    @patch('agents_lib.search.time.sleep')
+    @patch('agents_lib.utils.time.sleep')
     @patch('agents_lib.search.validate_url')
     @patch('agents_lib.search.client')
     def test_retries_on_broken_url(self, mock_client, mock_validate, mock_sleep):
@@ -353,6 +361,49 @@ class TestSelectSingleTopic:
         assert "kubernetes" in prompt
         assert "AVOID" in prompt
 
+    @patch('agents_lib.search.validate_url')
+    @patch('agents_lib.search.client')
+    def test_dedupes_urls_in_prompt(self, mock_client, mock_validate):
+        """Duplicate source URLs should be listed once so indexes stay aligned."""
+        mock_response = Mock()
+        mock_response.text = json.dumps({
+            "selected_topic": "Topic",
+            "focused_context": "Context",
+            "selected_url_index": 2,
+            "reasoning": "Reason"
+        })
+        mock_client.models.generate_content.return_value = mock_response
+        mock_validate.return_value = (True, None, 200, "https://second.com")
+
+        urls = ["https://first.com", "https://first.com", "https://second.com"]
+        context, url, html = select_single_topic(
+            search_context="Context",
+            source_urls=urls,
+            user_prompt="prompt"
+        )
+
+        prompt = mock_client.models.generate_content.call_args.kwargs['contents']
+        assert prompt.count("https://first.com") == 1
+        assert "2. https://second.com" in prompt
+        assert url == "https://second.com"
+
+    @patch('agents_lib.search.validate_url')
+    @patch('agents_lib.search.client')
+    def test_single_prevalidated_url_skips_llm(self, mock_client, mock_validate):
+        """A single URL with already-fetched HTML should not need an LLM call."""
+        context, url, html = select_single_topic(
+            search_context="Only one article here",
+            source_urls=["https://example.com/only"],
+            user_prompt="prompt",
+            html_content="<html>content</html>"
+        )
+
+        mock_client.models.generate_content.assert_not_called()
+        mock_validate.assert_not_called()
+        assert context == "Only one article here"
+        assert url == "https://example.com/only"
+        assert html == "<html>content</html>"
+
     @patch('agents_lib.search.client')
     def test_handles_empty_urls_list(self, mock_client):
         """Should return None for URL when no URLs available."""
@@ -367,6 +418,27 @@ class TestSelectSingleTopic:
         assert context == "Some context"
 
 
+class TestLlmCallWithTimeout:
+    """Tests for _llm_call_with_timeout."""
+
+    def test_returns_call_result(self):
+        """Should return the value of the wrapped call."""
+        assert _llm_call_with_timeout(lambda: "response", timeout=5) == "response"
+
+    @patch('agents_lib.search._LLM_EXECUTOR')
+    def test_cancels_future_on_timeout(self, mock_executor):
+        """A timed-out call should be cancelled so a queued call never starts."""
+        mock_future = Mock()
+        mock_future.result.side_effect = FuturesTimeoutError()
+        mock_executor.submit.return_value = mock_future
+
+        with pytest.raises(FuturesTimeoutError):
+            _llm_call_with_timeout(lambda: "response", timeout=1)
+
+        mock_future.result.assert_called_once_with(timeout=1)
+        mock_future.cancel.assert_called_once()
+
+
 class TestEdgeCases:
     """Tests for edge cases in search functions."""
 
@@ -457,6 +529,34 @@ class TestEdgeCases:
         assert len(urls) >= 2
         assert mock_resolve.call_count == 2
 
+    @patch('agents_lib.search.resolve_redirect_url')
+    @patch('agents_lib.search.client')
+    def test_resolved_urls_keep_grounding_order(self, mock_client, mock_resolve):
+        """Concurrent redirect resolution should keep URLs in grounding order."""
+        chunks = []
+        for i in range(5):
+            chunk = Mock()
+            chunk.web.uri = f"https://redirect{i}.com"
+            chunks.append(chunk)
+        mock_metadata = Mock()
+        mock_metadata.grounding_chunks = chunks
+        mock_candidate = Mock()
+        mock_candidate.grounding_metadata = mock_metadata
+        mock_response = Mock()
+        mock_response.text = "Results"
+        mock_response.candidates = [mock_candidate]
+        mock_client.models.generate_content.return_value = mock_response
+
+        mock_resolve.side_effect = lambda url: url.replace("redirect", "resolved")
+
+        context, urls, html = search_trending_topics(
+            user_prompt="topic",
+            refined_persona="persona",
+            validate_urls=False
+        )
+
+        assert urls == [f"https://resolved{i}.com" for i in range(5)]
+
     @patch('agents_lib.search.client')
     def test_all_retries_exhausted(self, mock_client):
         """Should return fallback when all retries fail."""
@@ -4,6 +4,7 @@ Tests for agents_lib/social_media.py
 Each test has meaningful assertions that could actually fail.
 Covers edge cases: missing tokens, API errors, image upload failures.
 """
+import orjson
 import pytest
 from unittest.mock import patch, Mock, MagicMock
 from io import BytesIO
@@ -12,7 +13,7 @@ from agents_lib.social_media import (
     post_to_twitter,
     post_to_linkedin,
     _upload_twitter_media,
-    _get_linkedin_author_urn,
+    get_linkedin_author_urn,
     _upload_linkedin_image,
     _build_linkedin_post_data,
 )
@@ -61,9 +62,9 @@ class TestBuildLinkedInPostData:
 
 
 class TestGetLinkedInAuthorUrn:
-    """Tests for _get_linkedin_author_urn helper function."""
+    """Tests for get_linkedin_author_urn helper function."""
 
-    @patch('agents_lib.social_media.requests.get')
+    @patch('agents_lib.social_media._LINKEDIN_SESSION.get')
     def test_returns_author_urn(self, mock_get):
         """Should return correctly formatted author URN."""
         mock_response = Mock()
@@ -71,20 +72,20 @@ class TestGetLinkedInAuthorUrn:
         mock_response.raise_for_status = Mock()
         mock_get.return_value = mock_response
 
-        result = _get_linkedin_author_urn({"Authorization": "Bearer token"})
+        result = get_linkedin_author_urn({"Authorization": "Bearer token"})
 
         assert result == "urn:li:person:abc123xyz"
 
-    @patch('agents_lib.social_media.requests.get')
+    @patch('agents_lib.social_media._LINKEDIN_SESSION.get')
     def test_returns_none_on_api_error(self, mock_get):
         """Should return None when API call fails."""
         mock_get.side_effect = Exception("API error")
 
-        result = _get_linkedin_author_urn({"Authorization": "Bearer token"})
+        result = get_linkedin_author_urn({"Authorization": "Bearer token"})
 
         assert result is None
 
-    @patch('agents_lib.social_media.requests.get')
+    @patch('agents_lib.social_media._LINKEDIN_SESSION.get')
     def test_calls_correct_endpoint(self, mock_get):
         """Should call the correct LinkedIn API endpoint."""
         mock_response = Mock()
@@ -92,13 +93,28 @@ class TestGetLinkedInAuthorUrn:
         mock_response.raise_for_status = Mock()
         mock_get.return_value = mock_response
 
-        _get_linkedin_author_urn({"Authorization": "Bearer token123"})
+        get_linkedin_author_urn({"Authorization": "Bearer token123"})
 
         mock_get.assert_called_once()
         call_url = mock_get.call_args[0][0]
         assert "api.linkedin.com" in call_url
         assert "userinfo" in call_url
 
+    @patch('agents_lib.social_media._LINKEDIN_SESSION.get')
+    def test_caches_urn_per_token(self, mock_get):
+        """Should only call userinfo once per access token."""
+        mock_response = Mock()
+        mock_response.json.return_value = {"sub": "123"}
+        mock_response.raise_for_status = Mock()
+        mock_get.return_value = mock_response
+
+        first = get_linkedin_author_urn({"Authorization": "Bearer token123"})
+        second = get_linkedin_author_urn({"Authorization": "Bearer token123"})
+        get_linkedin_author_urn({"Authorization": "Bearer other"})
+
+        assert first == second == "urn:li:person:123"
+        assert mock_get.call_count == 2
+
 
 class TestUploadTwitterMedia:
     """Tests for _upload_twitter_media helper function."""
@@ -145,8 +161,8 @@ class TestUploadTwitterMedia:
 class TestUploadLinkedInImage:
     """Tests for _upload_linkedin_image helper function (new Images API)."""
 
-    @patch('agents_lib.social_media.requests.put')
-    @patch('agents_lib.social_media.requests.post')
+    @patch('agents_lib.social_media._LINKEDIN_SESSION.put')
+    @patch('agents_lib.social_media._LINKEDIN_SESSION.post')
     def test_returns_image_urn_on_success(self, mock_post, mock_put):
         """Should return image URN on successful upload."""
         # Mock initialize upload response (new Images API format)
@@ -174,7 +190,7 @@ class TestUploadLinkedInImage:
 
         assert result == "urn:li:image:xyz789"
 
-    @patch('agents_lib.social_media.requests.post')
+    @patch('agents_lib.social_media._LINKEDIN_SESSION.post')
     def test_returns_none_on_init_error(self, mock_post):
         """Should return None when initialize upload fails."""
         mock_post.side_effect = Exception("Initialize failed")
@@ -188,8 +204,8 @@ class TestUploadLinkedInImage:
 
         assert result is None
 
-    @patch('agents_lib.social_media.requests.put')
-    @patch('agents_lib.social_media.requests.post')
+    @patch('agents_lib.social_media._LINKEDIN_SESSION.put')
+    @patch('agents_lib.social_media._LINKEDIN_SESSION.post')
     def test_calls_correct_endpoint(self, mock_post, mock_put):
         """Should call the new Images API endpoint."""
         mock_init_response = Mock()
@@ -310,8 +326,8 @@ class TestPostToLinkedIn:
 
         assert result is False
 
-    @patch('agents_lib.social_media.requests.post')
-    @patch('agents_lib.social_media._get_linkedin_author_urn')
+    @patch('agents_lib.social_media._LINKEDIN_SESSION.post')
+    @patch('agents_lib.social_media.get_linkedin_author_urn')
     @patch('agents_lib.social_media.get_oauth_tokens')
     def test_returns_true_on_successful_post(self, mock_get_tokens, mock_get_urn, mock_post):
         """Should return True when post is created successfully."""
@@ -328,7 +344,25 @@ class TestPostToLinkedIn:
 
         assert result is True
 
-    @patch('agents_lib.social_media._get_linkedin_author_urn')
+    @patch('agents_lib.social_media._LINKEDIN_SESSION.post')
+    @patch('agents_lib.social_media.get_linkedin_author_urn')
+    @patch('agents_lib.social_media.get_oauth_tokens')
+    def test_uses_caller_supplied_tokens(self, mock_get_tokens, mock_get_urn, mock_post):
+        """Should not query the database when the caller passes tokens."""
+        mock_get_urn.return_value = "urn:li:person:123"
+
+        mock_response = Mock()
+        mock_response.ok = True
+        mock_response.raise_for_status = Mock()
+        mock_post.return_value = mock_response
+
+        result = post_to_linkedin(user_id=123, post_text="Hello LinkedIn!", tokens={"access_token": "token"})
+
+        assert result is True
+        mock_get_tokens.assert_not_called()
+        assert mock_post.call_args.kwargs["headers"]["Authorization"] == "Bearer token"
+
+    @patch('agents_lib.social_media.get_linkedin_author_urn')
     @patch('agents_lib.social_media.get_oauth_tokens')
     def test_returns_false_when_urn_fetch_fails(self, mock_get_tokens, mock_get_urn):
         """Should return False when author URN cannot be retrieved."""
@@ -339,8 +373,8 @@ class TestPostToLinkedIn:
 
         assert result is False
 
-    @patch('agents_lib.social_media.requests.post')
-    @patch('agents_lib.social_media._get_linkedin_author_urn')
+    @patch('agents_lib.social_media._LINKEDIN_SESSION.post')
+    @patch('agents_lib.social_media.get_linkedin_author_urn')
     @patch('agents_lib.social_media.get_oauth_tokens')
     def test_returns_false_on_api_error(self, mock_get_tokens, mock_get_urn, mock_post):
         """Should return False when LinkedIn API fails."""
@@ -352,9 +386,9 @@ class TestPostToLinkedIn:
 
         assert result is False
 
-    @patch('agents_lib.social_media.requests.post')
+    @patch('agents_lib.social_media._LINKEDIN_SESSION.post')
     @patch('agents_lib.social_media._upload_linkedin_image')
-    @patch('agents_lib.social_media._get_linkedin_author_urn')
+    @patch('agents_lib.social_media.get_linkedin_author_urn')
     @patch('agents_lib.social_media.get_oauth_tokens')
     def test_uploads_image_when_provided(self, mock_get_tokens, mock_get_urn, mock_upload, mock_post):
         """Should upload image when provided."""
@@ -400,8 +434,8 @@ class TestEdgeCases:
 
         assert result is False
 
-    @patch('agents_lib.social_media.requests.post')
-    @patch('agents_lib.social_media._get_linkedin_author_urn')
+    @patch('agents_lib.social_media._LINKEDIN_SESSION.post')
+    @patch('agents_lib.social_media.get_linkedin_author_urn')
     @patch('agents_lib.social_media.get_oauth_tokens')
     def test_linkedin_handles_very_long_post(self, mock_get_tokens, mock_get_urn, mock_post):
         """Should handle very long post text."""
@@ -419,5 +453,5 @@ class TestEdgeCases:
 
         assert result is True
         # Verify the long text was passed through (using new Posts API format)
-        call_json = mock_post.call_args.kwargs['json']
+        call_json = orjson.loads(mock_post.call_args.kwargs['data'])
         assert len(call_json['commentary']) == 5000
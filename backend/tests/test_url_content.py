@@ -0,0 +1,278 @@
+"""
+Tests for agents_lib/url_content.py
+
+Each test has meaningful assertions that could actually fail.
+Covers the streaming event flow, keepalives, per-step errors and posting.
+"""
+import asyncio
+import threading
+import time
+import pytest
+import orjson
+import pybase64
+from unittest.mock import patch, Mock
+
+from agents_lib import url_content
+from agents_lib.url_content import (
+    generate_from_url_stream,
+    post_url_content,
+    _with_keepalives,
+    _submit,
+)
+
+HTML = "<html><head><title>Example Title</title></head><body><p>Body text</p></body></html>"
+FINAL_URL = "https://example.com/article"
+
+
+def collect_events(user_id=1, url="https://example.com/a"):
+    """Run generate_from_url_stream to completion and return the decoded events."""
+    async def run():
+        return [orjson.loads(event) async for event in generate_from_url_stream(user_id, url)]
+    return asyncio.run(run())
+
+
+def statuses(events):
+    return [event["status"] for event in events]
+
+
+@pytest.fixture
+def stream_mocks():
+    """Patch every blocking step of the URL flow with fast successful fakes."""
+    with patch.object(url_content, 'validate_url', return_value=(True, HTML, 200, FINAL_URL)) as validate, \
+         patch.object(url_content, 'get_campaign_cached', return_value=None) as campaign, \
+         patch.object(url_content, 'generate_x_post', return_value=("X post text", "topic")) as x_post, \
+         patch.object(url_content, 'generate_linkedin_post', return_value="LinkedIn post text") as linkedin, \
+         patch.object(url_content, 'generate_image', return_value=b"png-bytes") as image:
+        yield Mock(validate=validate, campaign=campaign, x_post=x_post, linkedin=linkedin, image=image)
+
+
+class TestGenerateFromUrlStream:
+    """Tests for generate_from_url_stream."""
+
+    def test_emits_events_in_order(self, stream_mocks):
+        """Should fetch, announce both posts, then deliver posts, image and complete."""
+        events = collect_events()
+        order = statuses(events)
+
+        assert order[:4] == ["fetching", "content", "generating_x", "generating_linkedin"]
+        assert order[-1] == "complete"
+        assert {"x_post", "linkedin_post", "generating_image", "image"} <= set(order)
+        first_post = min(order.index("x_post"), order.index("linkedin_post"))
+        assert first_post < order.index("generating_image") < order.index("image")
+        assert events[1]["title"] == "Example Title"
+        assert events[-1]["source_url"] == FINAL_URL
+
+    def test_image_event_carries_base64(self, stream_mocks):
+        """Image event should include the base64 payload for the preview."""
+        events = collect_events()
+        image_event = next(e for e in events if e["status"] == "image")
+
+        assert pybase64.b64decode(image_event["image_base64"]) == b"png-bytes"
+
+    def test_image_starts_after_first_post(self, stream_mocks):
+        """Image generation should not wait for the slower of the two posts."""
+        image_started = threading.Event()
+
+        def slow_linkedin(**kwargs):
+            # Only finishes once the image has been kicked off from the X post
+            assert image_started.wait(timeout=5)
+            return "LinkedIn post text"
+
+        def image(**kwargs):
+            image_started.set()
+            return b"png-bytes"
+
+        stream_mocks.linkedin.side_effect = slow_linkedin
+        stream_mocks.image.side_effect = image
+
+        order = statuses(collect_events())
+
+        assert order.index("x_post") < order.index("generating_image") < order.index("linkedin_post")
+        assert stream_mocks.image.call_args.kwargs["post_text"] == "X post text"
+
+    def test_x_failure_emits_error_and_continues(self, stream_mocks):
+        """A failed X post should emit x_post_error while LinkedIn and image still run."""
+        stream_mocks.x_post.side_effect = Exception("X model down")
+
+        events = collect_events()
+        order = statuses(events)
+
+        error = next(e for e in events if e["status"] == "x_post_error")
+        assert error["error"] == "X model down"
+        assert "linkedin_post" in order and "image" in order
+        assert order[-1] == "complete"
+        assert stream_mocks.image.call_args.kwargs["post_text"] == "LinkedIn post text"
+
+    def test_linkedin_failure_emits_error(self, stream_mocks):
+        """A failed LinkedIn post should emit linkedin_post_error."""
+        stream_mocks.linkedin.side_effect = Exception("LinkedIn model down")
+
+        order = statuses(collect_events())
+
+        assert "linkedin_post_error" in order
+        assert "x_post" in order
+        assert order[-1] == "complete"
+
+    def test_image_failure_emits_error(self, stream_mocks):
+        """A raising or empty image step should emit image_error."""
+        stream_mocks.image.side_effect = Exception("Imagen down")
+        assert "image_error" in statuses(collect_events())
+
+        stream_mocks.image.side_effect = None
+        stream_mocks.image.return_value = None
+        order = statuses(collect_events())
+        assert "image_error" in order
+        assert "image" not in order
+
+    def test_no_image_when_both_posts_fail(self, stream_mocks):
+        """Without a post there is nothing to illustrate."""
+        stream_mocks.x_post.side_effect = Exception("down")
+        stream_mocks.linkedin.side_effect = Exception("down")
+
+        order = statuses(collect_events())
+
+        assert "generating_image" not in order
+        stream_mocks.image.assert_not_called()
+        assert order[-1] == "complete"
+
+    def test_invalid_url_emits_error_and_stops(self, stream_mocks):
+        """An unreachable URL should emit a single error event and generate nothing."""
+        stream_mocks.validate.return_value = (False, None, 404, "https://example.com/a")
+
+        events = collect_events()
+
+        assert statuses(events) == ["fetching", "error"]
+        assert "404" in events[-1]["error"]
+        stream_mocks.x_post.assert_not_called()
+        stream_mocks.linkedin.assert_not_called()
+
+    def test_uses_campaign_persona(self, stream_mocks):
+        """Should pass the campaign persona to post generation."""
+        stream_mocks.campaign.return_value = {
+            "refined_persona": "Campaign persona",
+            "visual_style": "Campaign style",
+            "user_prompt": "Campaign prompt",
+        }
+
+        collect_events()
+
+        kwargs = stream_mocks.x_post.call_args.kwargs
+        assert kwargs["refined_persona"] == "Campaign persona"
+        assert kwargs["user_prompt"] == "Campaign prompt"
+        assert stream_mocks.image.call_args.kwargs["visual_style"] == "Campaign style"
+
+    def test_bypasses_post_text_cache(self, stream_mocks):
+        """Generating from the same URL again should produce fresh posts."""
+        collect_events()
+
+        assert stream_mocks.x_post.call_args.kwargs["use_cache"] is False
+        assert stream_mocks.linkedin.call_args.kwargs["use_cache"] is False
+
+
+class TestWithKeepalives:
+    """Tests for _with_keepalives."""
+
+    def test_yields_keepalives_while_step_runs(self):
+        """Should yield keepalive JSON until the step finishes, then the result."""
+        async def run():
+            items = []
+            future = _submit(time.sleep, 0.2)
+            async for item in _with_keepalives({future: "fetch"}, interval=0.02):
+                items.append(item)
+            return future, items
+
+        future, items = asyncio.run(run())
+
+        keepalives = [orjson.loads(item) for item in items if isinstance(item, str)]
+        assert len(keepalives) >= 2
+        assert all(k["status"] == "keepalive" and k["step"] == "Fetching URL" for k in keepalives)
+        assert items[-1] == ("fetch", future)
+
+    def test_waits_on_futures_added_while_iterating(self):
+        """A step added to pending mid-iteration should also be yielded."""
+        async def run():
+            pending = {_submit(lambda: "x"): "x"}
+            keys = []
+            async for item in _with_keepalives(pending, interval=1):
+                if isinstance(item, str):
+                    continue
+                key, _ = item
+                keys.append(key)
+                if key == "x":
+                    pending[_submit(lambda: b"img")] = "image"
+            return keys
+
+        assert asyncio.run(run()) == ["x", "image"]
+
+
+@pytest.fixture
+def post_mocks():
+    """Patch the posting dependencies of post_url_content."""
+    with patch.object(url_content, 'get_campaign_cached', return_value={"exclude_companies": []}), \
+         patch.object(url_content, 'validate_post_content', return_value=(True, None)), \
+         patch.object(url_content, 'get_oauth_tokens', return_value={"access_token": "t"}) as tokens, \
+         patch.object(url_content, 'post_to_twitter', return_value=True) as twitter, \
+         patch.object(url_content, 'post_to_linkedin', return_value=True) as linkedin, \
+         patch.object(url_content, 'save_post_history_batch') as history:
+        yield Mock(tokens=tokens, twitter=twitter, linkedin=linkedin, history=history)
+
+
+class TestPostUrlContent:
+    """Tests for post_url_content."""
+
+    def test_posts_to_both_platforms_and_saves_history_once(self, post_mocks):
+        """Should post to every platform and record them in a single history write."""
+        result = post_url_content(1, "X text", "LinkedIn text", None, ["twitter", "linkedin"])
+
+        assert sorted(result["posted"]) == ["linkedin", "twitter"]
+        assert result["errors"] == {}
+        post_mocks.history.assert_called_once()
+        user_id, rows = post_mocks.history.call_args.args
+        assert user_id == 1
+        assert sorted(row[2] for row in rows) == [["linkedin"], ["twitter"]]
+
+    def test_failed_platform_reported_and_not_saved(self, post_mocks):
+        """Only successful platforms should end up in post history."""
+        post_mocks.linkedin.return_value = False
+
+        result = post_url_content(1, "X text", "LinkedIn text", None, ["twitter", "linkedin"])
+
+        assert result["posted"] == ["twitter"]
+        assert result["errors"] == {"linkedin": "Failed to post"}
+        _, rows = post_mocks.history.call_args.args
+        assert [row[2] for row in rows] == [["twitter"]]
+
+    def test_history_failure_keeps_posted(self, post_mocks):
+        """A history write failure should not turn a successful post into an error."""
+        post_mocks.history.side_effect = Exception("db locked")
+
+        result = post_url_content(1, "X text", None, None, ["twitter"])
+
+        assert result["posted"] == ["twitter"]
+        assert result["errors"] == {}
+
+    def test_missing_tokens_reported(self, post_mocks):
+        """Should report a platform the user hasn't connected."""
+        post_mocks.tokens.return_value = None
+
+        result = post_url_content(1, "X text", None, None, ["twitter"])
+
+        assert result["errors"] == {"twitter": "Not connected to Twitter"}
+        post_mocks.twitter.assert_not_called()
+
+    def test_decodes_uploaded_image(self, post_mocks):
+        """The base64 image from the preview should be posted as raw bytes."""
+        image_base64 = pybase64.b64encode_as_string(b"uploaded-bytes")
+
+        result = post_url_content(1, "X text", "LinkedIn text", image_base64, ["twitter", "linkedin"])
+
+        assert sorted(result["posted"]) == ["linkedin", "twitter"]
+        assert post_mocks.twitter.call_args.args[2] == b"uploaded-bytes"
+        assert post_mocks.linkedin.call_args.args[2] == b"uploaded-bytes"
+
+    def test_posts_without_image(self, post_mocks):
+        """No image_base64 should post text only."""
+        result = post_url_content(1, "X text", None, None, ["twitter"])
+
+        assert result["posted"] == ["twitter"]
+        assert post_mocks.twitter.call_args.args[2] is None
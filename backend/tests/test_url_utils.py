@@ -4,6 +4,7 @@ Tests for agents_lib/url_utils.py
 Each test has meaningful assertions that could actually fail.
 Covers edge cases: null, empty, boundary conditions, error states.
 """
+import time
 import pytest
 from unittest.mock import patch, Mock
 import requests
@@ -12,11 +13,16 @@ from agents_lib.url_utils import (
     clean_url_text,
     is_youtube_url,
     extract_html_title,
+    extract_title_and_text,
+    html_to_text,
     url_seems_relevant_to_topic,
     is_soft_404,
     validate_url,
     validate_and_select_url,
     resolve_redirect_url,
+    SOFT_404_SCAN_CHARS,
+    _passes_head_check,
+    _HTTP_ADAPTER,
 )
 
 
@@ -55,6 +61,11 @@ class TestCleanUrlText:
         assert clean_url_text("https://example.com;") == "https://example.com"
         assert clean_url_text("https://example.com,") == "https://example.com"
 
+    def test_strips_quotes_and_punctuation_together(self):
+        """Quotes and punctuation are stripped in any order."""
+        assert clean_url_text(' "https://example.com". ') == "https://example.com"
+        assert clean_url_text("('https://example.com')") == "https://example.com"
+
     def test_returns_none_for_null_string_literal(self):
         """'null' and 'none' strings should return None."""
         assert clean_url_text("null") is None
@@ -100,6 +111,12 @@ class TestIsYoutubeUrl:
         assert is_youtube_url("not a url at all") is False
         assert is_youtube_url("") is False
 
+    def test_ignores_case_port_and_userinfo(self):
+        """Host matching follows the parsed hostname, not the raw URL text."""
+        assert is_youtube_url("https://WWW.YouTube.com/watch?v=abc123") is True
+        assert is_youtube_url("https://m.youtube.com:443/watch?v=abc123") is True
+        assert is_youtube_url("https://youtube.com.example.com/") is False
+
     def test_handles_url_with_youtube_in_path(self):
         """Should not match youtube in path, only host."""
         assert is_youtube_url("https://example.com/youtube") is False
@@ -130,6 +147,12 @@ class TestExtractHtmlTitle:
         result = extract_html_title(html)
         assert result == "Upper Case Title"
 
+    def test_falls_back_for_mixed_case_closing_tag(self):
+        """A lowercase opening tag with an uppercase closing tag still parses."""
+        html = "<html><head><title>Mixed Case</TITLE></head></html>"
+        result = extract_html_title(html)
+        assert result == "Mixed Case"
+
     def test_handles_title_with_attributes(self):
         """Should handle title tags with attributes."""
         html = '<html><head><title lang="en">Title With Attrs</title></head></html>'
@@ -155,6 +178,61 @@ class TestExtractHtmlTitle:
         assert result == ""
 
 
+class TestHtmlToText:
+    """Tests for html_to_text function."""
+
+    def test_extracts_visible_text(self, sample_html_content):
+        """Should return body text with whitespace collapsed."""
+        result = html_to_text(sample_html_content)
+        assert result.startswith("Understanding Kubernetes Pod Scheduling")
+        assert "  " not in result
+        assert "<p>" not in result
+
+    def test_drops_scripts_and_styles(self):
+        """Should not include script or style contents."""
+        html_content = "<html><head><style>p{color:red}</style></head><body><script>var x=1;</script><p>Hello</p></body></html>"
+        assert html_to_text(html_content) == "Hello"
+
+    def test_applies_limit(self):
+        """Should truncate to the requested number of characters."""
+        html_content = "<html><body><p>" + "word " * 100 + "</p></body></html>"
+        assert len(html_to_text(html_content, limit=50)) == 50
+
+    def test_empty_input(self):
+        """Should return empty string for None or empty HTML."""
+        assert html_to_text(None) == ""
+        assert html_to_text("") == ""
+
+
+class TestExtractTitleAndText:
+    """Tests for extract_title_and_text function."""
+
+    def test_returns_title_and_body_text(self):
+        """Should return the title and the visible body text from one call."""
+        html_content = "<html><head><title>  My &amp; Page\n Title </title></head><body><script>x()</script><p>Hello world</p></body></html>"
+        title, text = extract_title_and_text(html_content)
+        assert title == "My & Page Title"
+        assert text == "Hello world"
+
+    def test_missing_title(self):
+        """Should return an empty title when the page has none."""
+        title, text = extract_title_and_text("<html><body><p>Body only</p></body></html>")
+        assert title == ""
+        assert text == "Body only"
+
+    def test_limit_applies_to_text_only(self):
+        """Should truncate the body text but not the title."""
+        html_content = "<html><head><title>Title</title></head><body><p>" + "word " * 100 + "</p></body></html>"
+        title, text = extract_title_and_text(html_content, limit=20)
+        assert title == "Title"
+        assert len(text) == 20
+
+    def test_empty_input(self):
+        """Should return empty strings for None or empty HTML."""
+        assert extract_title_and_text(None) == ("", "")
+        assert extract_title_and_text("") == ("", "")
+
+
 class TestUrlSeemsRelevantToTopic:
     """Tests for url_seems_relevant_to_topic function."""
 
@@ -252,6 +330,12 @@ class TestIsSoft404:
         result = is_soft_404(html, "https://example.com/kubernetes")
         assert result is False
 
+    def test_ignores_phrases_past_scan_window(self):
+        """Only the head of the page is scanned for 404 phrases."""
+        html = "<html><article>" + "x" * SOFT_404_SCAN_CHARS + "No results found</article></html>"
+        result = is_soft_404(html, "https://example.com/search-tips")
+        assert result is False
+
     def test_detects_suspiciously_short_page(self):
         """Should flag very short pages without article content."""
         html = "<html><body>Loading...</body></html>"
@@ -262,13 +346,14 @@ class TestIsSoft404:
 class TestValidateUrl:
     """Tests for validate_url function."""
 
-    @patch('agents_lib.url_utils.requests.get')
+    @patch('agents_lib.url_utils._HTTP_SESSION.get')
     def test_returns_valid_for_200_status(self, mock_get):
         """Should return valid for HTTP 200 with good content."""
         mock_response = Mock()
         mock_response.status_code = 200
         mock_response.url = "https://example.com/page"
-        mock_response.text = "<html><article>Real content here</article>" + "x" * 6000
+        mock_response.encoding = "utf-8"
+        mock_response.iter_content.return_value = [b"<html><article>Real content here</article>" + b"x" * 6000]
         mock_get.return_value = mock_response
 
         is_valid, html, status, final_url = validate_url("https://example.com/page")
@@ -278,7 +363,57 @@ class TestValidateUrl:
         assert html is not None
         assert final_url == "https://example.com/page"
 
-    @patch('agents_lib.url_utils.requests.get')
+    @patch('agents_lib.url_utils._HTTP_SESSION.get')
+    def test_stops_reading_body_at_max_bytes(self, mock_get):
+        """Should stream the body and stop downloading once max_bytes is reached."""
+        chunks_read = []
+
+        def iter_content(chunk_size):
+            for i in range(10):
+                chunks_read.append(i)
+                yield b"<html><article>" + b"y" * 1000
+
+        mock_response = Mock()
+        mock_response.status_code = 200
+        mock_response.url = "https://example.com/big"
+        mock_response.encoding = "utf-8"
+        mock_response.iter_content.side_effect = iter_content
+        mock_get.return_value = mock_response
+
+        is_valid, html, status, final_url = validate_url("https://example.com/big", max_bytes=2500)
+
+        assert is_valid is True
+        assert len(html) == 2500
+        assert len(chunks_read) == 3
+        assert mock_get.call_args.kwargs["stream"] is True
+        mock_response.close.assert_called_once()
+
+    @patch('agents_lib.url_utils.MAX_HTML_CONTENT_SIZE', 1500)
+    @patch('agents_lib.url_utils._HTTP_SESSION.get')
+    def test_stops_reading_body_once_enough_text_is_decoded(self, mock_get):
+        """Reading stops at MAX_HTML_CONTENT_SIZE chars without waiting for the byte cap."""
+        chunks_read = []
+
+        def iter_content(chunk_size):
+            for i in range(10):
+                chunks_read.append(i)
+                yield "<html><article>é".encode() + b"z" * 1000
+
+        mock_response = Mock()
+        mock_response.status_code = 200
+        mock_response.url = "https://example.com/long"
+        mock_response.encoding = "utf-8"
+        mock_response.iter_content.side_effect = iter_content
+        mock_get.return_value = mock_response
+
+        is_valid, html, status, final_url = validate_url("https://example.com/long")
+
+        assert is_valid is True
+        assert len(html) == 1500
+        assert html.startswith("<html><article>é")
+        assert len(chunks_read) == 2
+
+    @patch('agents_lib.url_utils._HTTP_SESSION.get')
     def test_returns_invalid_for_404_status(self, mock_get):
         """Should return invalid for HTTP 404."""
         mock_response = Mock()
@@ -291,13 +426,14 @@ class TestValidateUrl:
         assert is_valid is False
         assert status == 404
 
-    @patch('agents_lib.url_utils.requests.get')
+    @patch('agents_lib.url_utils._HTTP_SESSION.get')
     def test_returns_invalid_for_soft_404(self, mock_get):
         """Should detect soft 404 and return invalid."""
         mock_response = Mock()
         mock_response.status_code = 200
         mock_response.url = "https://example.com/missing"
-        mock_response.text = "<html><body>Page not found</body></html>"
+        mock_response.encoding = "utf-8"
+        mock_response.iter_content.return_value = [b"<html><body>Page not found</body></html>"]
         mock_get.return_value = mock_response
 
         is_valid, html, status, final_url = validate_url("https://example.com/missing")
@@ -305,7 +441,7 @@ class TestValidateUrl:
         assert is_valid is False
         assert status == 404  # Treated as 404
 
-    @patch('agents_lib.url_utils.requests.get')
+    @patch('agents_lib.url_utils._HTTP_SESSION.get')
     def test_handles_timeout(self, mock_get):
         """Should handle request timeout gracefully."""
         mock_get.side_effect = requests.exceptions.Timeout("Connection timed out")
@@ -316,7 +452,7 @@ class TestValidateUrl:
         assert status is None
         assert html is None
 
-    @patch('agents_lib.url_utils.requests.get')
+    @patch('agents_lib.url_utils._HTTP_SESSION.get')
     def test_handles_connection_error(self, mock_get):
         """Should handle connection errors gracefully."""
         mock_get.side_effect = requests.exceptions.ConnectionError("Failed to connect")
@@ -326,7 +462,29 @@ class TestValidateUrl:
         assert is_valid is False
         assert status is None
 
-    @patch('agents_lib.url_utils.requests.head')
+    @patch('agents_lib.url_utils._HTTP_SESSION.head')
+    def test_caches_valid_and_404_results(self, mock_head):
+        """Repeat validations of a valid or 404 URL shouldn't hit the network again."""
+        ok, missing = Mock(status_code=200, url="https://example.com/ok"), Mock(status_code=404, url="https://example.com/gone")
+        mock_head.side_effect = lambda url, **kwargs: ok if url.endswith("/ok") else missing
+
+        for _ in range(2):
+            assert validate_url("https://example.com/ok", fetch_content=False)[0] is True
+            assert validate_url("https://example.com/gone", fetch_content=False)[2] == 404
+
+        assert mock_head.call_count == 2
+
+    @patch('agents_lib.url_utils._HTTP_SESSION.head')
+    def test_does_not_cache_transient_failures(self, mock_head):
+        """Timeouts must not be cached, so a retry goes back to the network."""
+        mock_head.side_effect = requests.exceptions.Timeout("Request timed out")
+
+        validate_url("https://slow-server.com/page", fetch_content=False)
+        validate_url("https://slow-server.com/page", fetch_content=False)
+
+        assert mock_head.call_count == 2
+
+    @patch('agents_lib.url_utils._HTTP_SESSION.head')
     def test_head_request_when_fetch_content_false(self, mock_head):
         """Should use HEAD request when fetch_content=False."""
         mock_response = Mock()
@@ -348,8 +506,9 @@ class TestValidateUrl:
 class TestValidateAndSelectUrl:
     """Tests for validate_and_select_url function."""
 
+    @patch('agents_lib.url_utils._passes_head_check', return_value=True)
     @patch('agents_lib.url_utils.validate_url')
-    def test_returns_first_valid_url(self, mock_validate):
+    def test_returns_first_valid_url(self, mock_validate, mock_head_check):
         """Should return the first valid URL from the list."""
         mock_validate.side_effect = [
             (False, None, 404, "https://bad.com"),
@@ -365,11 +524,39 @@ class TestValidateAndSelectUrl:
 
         assert url == "https://good.com"
         assert html == "<html>content</html>"
-        # Should stop after finding first valid
+        # Should stop downloading after finding first valid
+        assert mock_validate.call_count == 2
+
+    @patch('agents_lib.url_utils._passes_head_check')
+    @patch('agents_lib.url_utils.validate_url')
+    def test_only_downloads_urls_that_pass_head_check(self, mock_validate, mock_head_check):
+        """Candidates rejected by the HEAD check are never fetched."""
+        mock_head_check.side_effect = lambda url: url != "https://gone.com"
+        mock_validate.return_value = (True, "<html>ok</html>", 200, "https://good.com")
+
+        url, html = validate_and_select_url(["https://gone.com", "https://good.com"])
+
+        assert url == "https://good.com"
+        mock_validate.assert_called_once_with("https://good.com", True)
+
+    @patch('agents_lib.url_utils.validate_url')
+    def test_prefers_list_order_over_completion_order(self, mock_validate):
+        """Without content, an earlier valid URL wins even if a later one finishes first."""
+        def slow_first(url, fetch_content):
+            if url == "https://first.com":
+                time.sleep(0.2)
+            return (True, None, 200, url)
+
+        mock_validate.side_effect = slow_first
+
+        url, html = validate_and_select_url(["https://first.com", "https://second.com"], fetch_content=False)
+
+        assert url == "https://first.com"
         assert mock_validate.call_count == 2
 
+    @patch('agents_lib.url_utils._passes_head_check', return_value=True)
     @patch('agents_lib.url_utils.validate_url')
-    def test_returns_none_when_all_invalid(self, mock_validate):
+    def test_returns_none_when_all_invalid(self, mock_validate, mock_head_check):
         """Should return None, None when all URLs are invalid."""
         mock_validate.return_value = (False, None, 404, "url")
 
@@ -388,10 +575,34 @@ class TestValidateAndSelectUrl:
         assert html is None
 
 
+class TestPassesHeadCheck:
+    """Tests for the HEAD precheck used before downloading candidates."""
+
+    @patch('agents_lib.url_utils._HTTP_SESSION.head')
+    def test_rejects_gone_urls(self, mock_head):
+        mock_head.return_value = Mock(status_code=410, headers={})
+        assert _passes_head_check("https://example.com/gone") is False
+
+    @patch('agents_lib.url_utils._HTTP_SESSION.head')
+    def test_rejects_oversized_bodies(self, mock_head):
+        mock_head.return_value = Mock(status_code=200, headers={"content-length": "50000000"})
+        assert _passes_head_check("https://example.com/report.pdf") is False
+
+    @patch('agents_lib.url_utils._HTTP_SESSION.head')
+    def test_keeps_urls_when_head_is_unsupported(self, mock_head):
+        mock_head.return_value = Mock(status_code=405, headers={})
+        assert _passes_head_check("https://example.com/page") is True
+
+    @patch('agents_lib.url_utils._HTTP_SESSION.head')
+    def test_keeps_urls_when_head_errors(self, mock_head):
+        mock_head.side_effect = requests.exceptions.ConnectionError("reset")
+        assert _passes_head_check("https://example.com/page") is True
+
+
 class TestResolveRedirectUrl:
     """Tests for resolve_redirect_url function."""
 
-    @patch('agents_lib.url_utils.requests.head')
+    @patch('agents_lib.url_utils._HTTP_SESSION.head')
     def test_returns_final_url_after_redirect(self, mock_head):
         """Should return final URL after following redirects."""
         mock_response = Mock()
@@ -402,8 +613,8 @@ class TestResolveRedirectUrl:
 
         assert result == "https://final-destination.com/page"
 
-    @patch('agents_lib.url_utils.requests.head')
-    @patch('agents_lib.url_utils.requests.get')
+    @patch('agents_lib.url_utils._HTTP_SESSION.head')
+    @patch('agents_lib.url_utils._HTTP_SESSION.get')
     def test_falls_back_to_get_when_head_fails(self, mock_get, mock_head):
         """Should fall back to GET if HEAD fails."""
         mock_head.side_effect = Exception("HEAD not supported")
@@ -418,8 +629,8 @@ class TestResolveRedirectUrl:
         assert result == "https://final.com/page"
         mock_get.assert_called_once()
 
-    @patch('agents_lib.url_utils.requests.head')
-    @patch('agents_lib.url_utils.requests.get')
+    @patch('agents_lib.url_utils._HTTP_SESSION.head')
+    @patch('agents_lib.url_utils._HTTP_SESSION.get')
     def test_returns_original_url_on_complete_failure(self, mock_get, mock_head):
         """Should return original URL if both HEAD and GET fail."""
         mock_head.side_effect = Exception("HEAD failed")
@@ -429,7 +640,30 @@ class TestResolveRedirectUrl:
 
         assert result == "https://unreachable.com/link"
 
-    @patch('agents_lib.url_utils.requests.head')
+    @patch('agents_lib.url_utils._HTTP_SESSION.head')
+    @patch('agents_lib.url_utils._HTTP_SESSION.get')
+    def test_grounding_redirects_skip_get_fallback(self, mock_get, mock_head):
+        """Vertex grounding redirect URLs are resolved with HEAD only."""
+        mock_head.side_effect = Exception("HEAD failed")
+        url = "https://vertexaisearch.cloud.google.com/grounding-api-redirect/abc"
+
+        result = resolve_redirect_url(url)
+
+        assert result == url
+        mock_get.assert_not_called()
+
+    @patch('agents_lib.url_utils._HTTP_SESSION.head')
+    def test_caches_resolved_redirects(self, mock_head):
+        """Resolving the same redirect twice should only make one request."""
+        mock_head.return_value = Mock(url="https://final-destination.com/page")
+
+        resolve_redirect_url("https://redirect.com/short")
+        result = resolve_redirect_url("https://redirect.com/short")
+
+        assert result == "https://final-destination.com/page"
+        mock_head.assert_called_once()
+
+    @patch('agents_lib.url_utils._HTTP_SESSION.head')
     def test_returns_original_when_no_redirect(self, mock_head):
         """Should return original URL when there's no redirect."""
         mock_response = Mock()
@@ -439,3 +673,19 @@ class TestResolveRedirectUrl:
         result = resolve_redirect_url("https://example.com/page")
 
         assert result == "https://example.com/page"
+
+
+class TestHttpRetryPolicy:
+    """Tests for the shared session's retry budget."""
+
+    def test_does_not_retry_read_timeouts(self):
+        """A slow page should cost one timeout, not one per retry."""
+        retry = _HTTP_ADAPTER.max_retries
+        assert retry.read == 0
+        assert retry.connect == 1
+
+    def test_retries_transient_statuses(self):
+        """Rate limits and gateway errors are still retried."""
+        retry = _HTTP_ADAPTER.max_retries
+        assert retry.status == 2
+        assert {429, 502, 503, 504} <= set(retry.status_forcelist)
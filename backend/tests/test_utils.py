@@ -3,12 +3,17 @@ import pytest
 import json
 import sys
 import os
+import time
+from unittest.mock import Mock, patch
 
 # Add backend to path for imports
 sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
 
 from agents import is_network_error, emit_agent_event, strip_markdown_formatting
-from agents_lib.utils import sanitize_for_linkedin
+from agents_lib.utils import (
+    sanitize_for_linkedin, parse_json_response, backoff_delay, MAX_BACKOFF,
+    sleep_before_retry, RetryDeadlineExceeded,
+)
 
 
 class TestIsNetworkError:
@@ -117,6 +122,11 @@ class TestStripMarkdownFormatting:
         result = strip_markdown_formatting("Run the `kubectl` command")
         assert result == "Run the kubectl command"
 
+    def test_strips_nested_formatting(self):
+        """Test that nested styles lose every layer."""
+        result = strip_markdown_formatting("***Both*** and **_mixed_** styles")
+        assert result == "Both and mixed styles"
+
     def test_preserves_urls_with_underscores(self):
         """Test that URLs with underscores are preserved."""
         result = strip_markdown_formatting("Visit https://example.com/some_page_here")
@@ -171,3 +181,60 @@ class TestSanitizeForLinkedin:
         assert result.startswith("Learn ES")
         assert result.endswith("queries #data")
         assert "|" not in result
+
+
+class TestParseJsonResponse:
+    """Tests for parse_json_response."""
+
+    def test_prefers_sdk_parsed_payload(self):
+        """Test that an SDK-decoded dict is returned without touching text."""
+        response = Mock()
+        response.parsed = {"is_valid": True}
+        response.text = "not json"
+        assert parse_json_response(response) == {"is_valid": True}
+
+    def test_falls_back_to_text(self):
+        """Test that text is parsed when the SDK did not decode the payload."""
+        response = Mock()
+        response.parsed = None
+        response.text = json.dumps({"topics": ["a", "b"]})
+        assert parse_json_response(response) == {"topics": ["a", "b"]}
+
+    def test_raises_on_invalid_text(self):
+        """Test that malformed text raises so callers use their fallback."""
+        response = Mock()
+        response.parsed = None
+        response.text = "not json"
+        with pytest.raises(ValueError):
+            parse_json_response(response)
+
+
+class TestBackoffDelay:
+    """Tests for backoff_delay."""
+
+    def test_grows_exponentially_with_jitter(self):
+        """Test that each delay is 2**attempt plus less than a second of jitter."""
+        for attempt in range(1, 4):
+            delay = backoff_delay(attempt)
+            assert 2 ** attempt <= delay < 2 ** attempt + 1
+
+    def test_capped_at_max_backoff(self):
+        """Test that large attempts never exceed MAX_BACKOFF."""
+        assert backoff_delay(10) == MAX_BACKOFF
+
+
+class TestSleepBeforeRetry:
+    """Tests for deadline-aware retry sleeps."""
+
+    @patch('agents_lib.utils.time.sleep')
+    def test_sleeps_without_deadline(self, mock_sleep):
+        """Test that the delay is slept when no deadline is given."""
+        sleep_before_retry(2.5)
+        mock_sleep.assert_called_once_with(2.5)
+
+    @patch('agents_lib.utils.time.sleep')
+    def test_raises_instead_of_overrunning_deadline(self, mock_sleep):
+        """Test that a backoff past the deadline raises without sleeping."""
+        with pytest.raises(RetryDeadlineExceeded):
+            sleep_before_retry(5, deadline=time.monotonic() + 1)
+        mock_sleep.assert_not_called()
@@ -0,0 +1,203 @@
+"""
+Tests for agents_lib/video_posting.py
+
+Each test has meaningful assertions that could actually fail.
+Covers the in-memory chunk reader, concurrent LinkedIn chunk uploads and the X upload call.
+"""
+import io
+import time
+import pytest
+import requests
+from unittest.mock import patch, Mock
+
+from agents_lib import video_posting
+from agents_lib.video_posting import (
+    _ByteRangeReader,
+    _put_linkedin_chunk,
+    upload_video_to_linkedin,
+    upload_video_to_twitter,
+)
+
+VIDEO = bytes(range(256)) * 4  # 1024 bytes
+
+
+class TestByteRangeReader:
+    """Tests for _ByteRangeReader."""
+
+    def test_len_is_slice_length(self):
+        """Length should be the size of the byte range, not the whole video."""
+        assert len(_ByteRangeReader(VIDEO, 100, 300)) == 200
+
+    def test_reads_slice_in_blocks(self):
+        """Sized reads should walk the slice and return empty at the end."""
+        reader = _ByteRangeReader(VIDEO, 10, 20)
+
+        assert bytes(reader.read(4)) == VIDEO[10:14]
+        assert reader.tell() == 4
+        assert bytes(reader.read(100)) == VIDEO[14:20]
+        assert reader.tell() == 10
+        assert bytes(reader.read(4)) == b""
+
+    def test_read_all(self):
+        """read() with no size should return the rest of the slice."""
+        reader = _ByteRangeReader(VIDEO, 0, 512)
+        reader.read(12)
+
+        assert bytes(reader.read()) == VIDEO[12:512]
+        assert bytes(_ByteRangeReader(VIDEO, 5, 9).read(None)) == VIDEO[5:9]
+
+    def test_seek_rewinds_for_retry(self):
+        """Seeking back to 0 should replay the same bytes."""
+        reader = _ByteRangeReader(VIDEO, 50, 60)
+        first = bytes(reader.read())
+
+        assert reader.seek(0) == 0
+        assert bytes(reader.read()) == first
+
+    def test_seek_whence_and_clamping(self):
+        """seek should honour whence and stay within the slice."""
+        reader = _ByteRangeReader(VIDEO, 0, 100)
+
+        assert reader.seek(10) == 10
+        assert reader.seek(5, 1) == 15
+        assert reader.seek(-20, 2) == 80
+        assert reader.seek(-500, 1) == 0
+        assert reader.seek(500) == 100
+
+    def test_does_not_copy_video(self):
+        """Reads should be views over the original buffer."""
+        block = _ByteRangeReader(VIDEO, 0, 10).read(10)
+
+        assert isinstance(block, memoryview)
+        assert block.obj is VIDEO
+
+
+class TestPutLinkedInChunk:
+    """Tests for _put_linkedin_chunk."""
+
+    @patch.object(video_posting, '_HTTP_SESSION')
+    def test_puts_byte_range_and_returns_etag(self, mock_session):
+        """Should PUT exactly the instruction's inclusive byte range."""
+        mock_session.put.return_value = Mock(headers={"etag": "etag-1"})
+        instruction = {"uploadUrl": "https://upload.example/1", "firstByte": 100, "lastByte": 199}
+
+        etag = _put_linkedin_chunk("token", VIDEO, 0, 1, instruction)
+
+        assert etag == "etag-1"
+        args, kwargs = mock_session.put.call_args
+        assert args[0] == "https://upload.example/1"
+        assert kwargs["headers"]["Authorization"] == "Bearer token"
+        assert bytes(kwargs["data"].read()) == VIDEO[100:200]
+
+    @patch.object(video_posting, '_HTTP_SESSION')
+    def test_raises_on_http_error(self, mock_session):
+        """A failed PUT should raise so the upload fails."""
+        response = Mock(headers={})
+        response.raise_for_status.side_effect = requests.HTTPError("500")
+        mock_session.put.return_value = response
+
+        with pytest.raises(requests.HTTPError):
+            _put_linkedin_chunk("token", VIDEO, 0, 1, {"uploadUrl": "u", "firstByte": 0, "lastByte": 9})
+
+
+def _linkedin_session(instruction_count: int) -> Mock:
+    """Session whose POSTs answer initializeUpload, finalizeUpload and the post create."""
+    chunk = len(VIDEO) // instruction_count
+    instructions = [
+        {"uploadUrl": f"https://upload.example/{i}", "firstByte": i * chunk, "lastByte": (i + 1) * chunk - 1}
+        for i in range(instruction_count)
+    ]
+    init_response = Mock()
+    init_response.json.return_value = {
+        "value": {"video": "urn:li:video:1", "uploadInstructions": instructions}
+    }
+    session = Mock()
+    session.post.side_effect = [init_response, Mock(), Mock(headers={"x-restli-id": "urn:li:share:9"})]
+    return session
+
+
+@pytest.fixture
+def linkedin_mocks():
+    """Patch tokens, the author lookup and company mentions for upload_video_to_linkedin."""
+    with patch.object(video_posting, 'get_oauth_tokens', return_value={"access_token": "token"}), \
+         patch.object(video_posting, 'get_linkedin_author_urn', return_value="urn:li:person:abc"), \
+         patch.object(video_posting, 'apply_linkedin_mentions', side_effect=lambda text: text):
+        yield
+
+
+class TestUploadVideoToLinkedIn:
+    """Tests for upload_video_to_linkedin."""
+
+    def test_etags_follow_instruction_order(self, linkedin_mocks):
+        """ETags should be finalized in instruction order even if chunks finish out of order."""
+        session = _linkedin_session(4)
+
+        def put_chunk(access_token, video_bytes, i, total_chunks, instruction):
+            time.sleep(0.02 * (total_chunks - i))  # last chunk finishes first
+            return f"etag-{i}"
+
+        with patch.object(video_posting, '_HTTP_SESSION', session), \
+             patch.object(video_posting, '_put_linkedin_chunk', side_effect=put_chunk) as mock_put:
+            success, post_id = upload_video_to_linkedin(1, VIDEO, "Video post")
+
+        assert (success, post_id) == (True, "urn:li:share:9")
+        assert mock_put.call_count == 4
+        finalize = session.post.call_args_list[1].kwargs["json"]["finalizeUploadRequest"]
+        assert finalize["uploadedPartIds"] == ["etag-0", "etag-1", "etag-2", "etag-3"]
+
+    def test_failed_chunk_fails_upload(self, linkedin_mocks):
+        """One failing chunk should fail the upload without finalizing."""
+        session = _linkedin_session(3)
+
+        def put_chunk(access_token, video_bytes, i, total_chunks, instruction):
+            if i == 1:
+                raise requests.HTTPError("503 Service Unavailable")
+            return f"etag-{i}"
+
+        with patch.object(video_posting, '_HTTP_SESSION', session), \
+             patch.object(video_posting, '_put_linkedin_chunk', side_effect=put_chunk):
+            success, error = upload_video_to_linkedin(1, VIDEO, "Video post")
+
+        assert success is False
+        assert "503" in error
+        assert session.post.call_count == 1  # initializeUpload only
+
+    def test_missing_author_fails(self):
+        """Should fail early when the LinkedIn profile can't be fetched."""
+        with patch.object(video_posting, 'get_oauth_tokens', return_value={"access_token": "token"}), \
+             patch.object(video_posting, 'get_linkedin_author_urn', return_value=None), \
+             patch.object(video_posting, '_HTTP_SESSION') as session:
+            success, error = upload_video_to_linkedin(1, VIDEO, "Video post")
+
+        assert (success, error) == (False, "Could not fetch LinkedIn profile")
+        session.post.assert_not_called()
+
+
+class TestUploadVideoToTwitter:
+    """Tests for upload_video_to_twitter."""
+
+    @patch.object(video_posting, 'tweepy')
+    @patch.object(video_posting, 'get_oauth_tokens')
+    def test_chunked_upload_from_memory(self, mock_tokens, mock_tweepy):
+        """Should stream the in-memory video to chunked_upload and tweet the media id."""
+        mock_tokens.return_value = {"access_token": "a", "refresh_token": "s"}
+        api = mock_tweepy.API.return_value
+        api.chunked_upload.return_value = Mock(media_id=42)
+        mock_tweepy.Client.return_value.create_tweet.return_value = Mock(data={"id": "123"})
+
+        success, tweet_id = upload_video_to_twitter(1, VIDEO, "Tweet text", mime_type="video/quicktime")
+
+        assert (success, tweet_id) == (True, "123")
+        kwargs = api.chunked_upload.call_args.kwargs
+        assert kwargs["filename"] == "video.mp4"
+        assert isinstance(kwargs["file"], io.BytesIO)
+        assert kwargs["file"].getvalue() == VIDEO
+        assert kwargs["file_type"] == "video/quicktime"
+        assert kwargs["media_category"] == "tweet_video"
+        assert kwargs["wait_for_async_finalize"] is True
+        mock_tweepy.Client.return_value.create_tweet.assert_called_once_with(text="Tweet text", media_ids=["42"])
+
+    @patch.object(video_posting, 'get_oauth_tokens', return_value=None)
+    def test_not_connected(self, mock_tokens):
+        """Should fail without Twitter tokens."""
+        assert upload_video_to_twitter(1, VIDEO, "Tweet text") == (False, "Twitter not connected")